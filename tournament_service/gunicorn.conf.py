@@ -0,0 +1,71 @@
+"""
+Gunicorn settings for the production server (entrypoint.sh with SERVER_MODE=prod).
+
+Every setting below can be changed through the environment variable next to
+it. By default gunicorn manages uvicorn workers serving the ASGI application,
+which the live leaderboard streams need. With GUNICORN_WORKER_CLASS=gthread
+the WSGI application is served by threaded workers instead (no streams).
+"""
+import gc
+import os
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).upper() == "TRUE"
+
+
+def _cores():
+    # The CPUs this container may run on, not the host's
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.getenv('DJANGO_PORT', '8000')}"
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+wsgi_app = (
+    "tournament_service.wsgi:application"
+    if worker_class == "gthread"
+    else "tournament_service.asgi:application"
+)
+workers = _env_int("GUNICORN_WORKERS", 2 * _cores() + 1)
+# Threads per worker; only used by the gthread worker class
+threads = _env_int("GUNICORN_THREADS", 4)
+
+# Import the application once in the master so workers share its memory pages
+preload_app = _env_bool("GUNICORN_PRELOAD", "TRUE")
+
+# Recycle workers after a number of requests (jittered, so they do not restart
+# together) to cap slow memory growth
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# Seconds before an unresponsive worker is killed, seconds a worker gets to
+# finish its requests on shutdown or recycling, and seconds idle client
+# connections are kept open
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+accesslog = "-" if _env_bool("GUNICORN_ACCESS_LOG", "FALSE") else None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def pre_fork(server, worker):
+    # Objects that exist in the master are never freed; keeping the collector
+    # away from them stops it from touching (and so copying) their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Never share a database connection with the master or a sibling
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,181 @@
+"""
+`Idempotency-Key` support for write endpoints.
+
+The first request with a given key is executed and its response (status,
+body and the headers the view set, such as Location) stored for
+`IDEMPOTENCY_KEY_TTL` seconds. Retries with the same key and payload are
+answered from the store without running the view again; a concurrent retry
+waits for the first request to finish instead of executing in parallel.
+
+While it runs, a request holds its key for `IDEMPOTENCY_LOCK_TIMEOUT` seconds
+only. A worker that dies in the middle cannot release the key, so once that
+lease has expired a retry takes the key over and executes the request itself.
+Results are only stored, and keys only released, by the request that holds
+the lease.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    HEADER,
+    str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Unique key of this request. Retries with the same key return the stored "
+        "response of the first request instead of executing it again."
+    ),
+)
+
+
+def request_fingerprint(request) -> str:
+    """Hash of the request payload; key order and whitespace do not matter."""
+    payload = json.dumps(request.data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _lease():
+    return timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+
+
+def _claim(key: str, scope: str, fingerprint: str):
+    """Insert the in-progress marker of a key. Returns None if the key is taken."""
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                key=key,
+                scope=scope,
+                request_fingerprint=fingerprint,
+                expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                locked_until=_lease(),
+            )
+    except IntegrityError:
+        return None
+
+
+def _take_over(record: IdempotencyKey):
+    """Take the lease of a key whose request is presumed dead. Returns None if another retry was faster."""
+    locked_until = _lease()
+    taken = IdempotencyKey.objects.filter(
+        pk=record.pk, status_code__isnull=True, locked_until=record.locked_until
+    ).update(locked_until=locked_until)
+    if not taken:
+        return None
+    record.locked_until = locked_until
+    return record
+
+
+def _held(record: IdempotencyKey):
+    """The key's row, as long as `record`'s request still holds its lease."""
+    return IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True, locked_until=record.locked_until)
+
+
+def _replay(record: IdempotencyKey) -> Response:
+    headers = {**(record.response_headers or {}), REPLAYED_HEADER: "true"}
+    return Response(record.response_body, status=record.status_code, headers=headers)
+
+
+def _store(record: IdempotencyKey, status_code: int, body, headers=None):
+    _held(record).update(
+        status_code=status_code, response_body=body, response_headers=headers or {}, locked_until=None
+    )
+
+
+def run_idempotent(request, handler) -> Response:
+    """
+    Execute `handler()` at most once per `Idempotency-Key` of the request.
+
+    Responses below 500 (including errors raised as DRF exceptions) are
+    stored; server errors release the key so that the client can retry.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > 255:
+        return Response({"detail": f"{HEADER} must be between 1 and 255 characters."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    scope = f"{request.method} {request.path}"
+    fingerprint = request_fingerprint(request)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+    while (record := _claim(key, scope, fingerprint)) is None:
+        existing = IdempotencyKey.objects.filter(key=key, scope=scope).first()
+        if existing is None:
+            # Released by a failed request in the meantime
+            continue
+        if existing.expires_at <= timezone.now():
+            existing.delete()
+            continue
+        if existing.request_fingerprint != fingerprint:
+            return Response(
+                {"detail": f"This {HEADER} was already used with a different payload."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if existing.status_code is not None:
+            return _replay(existing)
+        if existing.locked_until is None or existing.locked_until <= timezone.now():
+            if (record := _take_over(existing)) is not None:
+                break
+            continue
+        if time.monotonic() >= deadline:
+            return Response(
+                {"detail": f"A request with this {HEADER} is still being processed."},
+                status=status.HTTP_409_CONFLICT,
+                headers={"Retry-After": "1"},
+            )
+        time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+    try:
+        response = handler()
+    except APIException as exc:
+        if exc.status_code >= 500:
+            _held(record).delete()
+        else:
+            # Same body as DRF's exception handler produces
+            body = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            _store(record, exc.status_code, body)
+        raise
+    except BaseException:
+        _held(record).delete()
+        raise
+
+    if response.status_code >= 500:
+        _held(record).delete()
+    else:
+        # Only what the view set: the renderer adds Content-Type and the like afterwards
+        _store(record, response.status_code, response.data, dict(response.headers))
+    return response
+
+
+def idempotent(view_func):
+    """
+    Make a function based view honour `Idempotency-Key`.
+    Place it below `@api_view` so that `request` is a DRF request.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        return run_idempotent(request, lambda: view_func(request, *args, **kwargs))
+    return wrapper
+
+
+class IdempotentCreateMixin:
+    """Make a viewset's `create` action honour `Idempotency-Key`."""
+
+    def create(self, request, *args, **kwargs):
+        return run_idempotent(request, lambda: super(IdempotentCreateMixin, self).create(request, *args, **kwargs))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from idempotency.models import IdempotencyKey
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Delete stored idempotency keys whose TTL has expired."
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            # Delete in batches to keep transactions and locks short
+            ids = list(
+                IdempotencyKey.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:BATCH_SIZE]
+            )
+            if not ids:
+                break
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
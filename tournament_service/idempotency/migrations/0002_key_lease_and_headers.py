@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("idempotency", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="locked_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="response_headers",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    The outcome of a write request sent with an `Idempotency-Key` header.
+
+    A row without `status_code` marks a request that is still being processed,
+    until `locked_until`; after that the request is presumed dead and a retry
+    takes the key over.
+    """
+    key = models.CharField(max_length=255)
+    # HTTP method and path the key was used for, e.g. "POST /api/players/"
+    scope = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Headers set by the view (e.g. Location), replayed with the body
+    response_headers = models.JSONField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "scope"], name="unique_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} [{self.key}]"
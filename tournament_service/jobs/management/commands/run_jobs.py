@@ -0,0 +1,65 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.worker import Worker, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the queued background jobs (rating recomputes, standings rebuilds, purges, "
+        "exports) in --concurrency threads. Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help=f"Jobs run at the same time (default {settings.JOB_WORKER_CONCURRENCY}).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help=f"Seconds to wait while no job is due (default {settings.JOB_POLL_INTERVAL}).",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=7,
+            help="Delete finished jobs older than this many days (default 7).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due one after another in this thread, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        if options["once"]:
+            counts = run_pending()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Jobs succeeded: {counts['succeeded']}, retried: {counts['retried']}, "
+                    f"failed: {counts['failed']}."
+                )
+            )
+            return
+
+        worker = Worker(options["concurrency"], options["poll_interval"], options["keep_days"], stdout=self.stdout)
+
+        def stop(signum, frame):
+            # Running jobs are finished, no new ones are claimed
+            self.stdout.write("Stopping after the running jobs.")
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f"Running jobs in {options['concurrency']} threads.")
+        worker.run()
+        self.stdout.write(self.style.SUCCESS("Stopped."))
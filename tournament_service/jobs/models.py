@@ -0,0 +1,53 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(models.Model):
+    """
+    A background job, run by the `run_jobs` worker (see worker.py).
+
+    `kind` names a handler registered with `jobs.registry.job` and `params`
+    holds its keyword arguments. A job that raised is queued again with
+    `run_after` pushed back until it has used up `max_attempts`.
+    """
+    kind = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Not claimed before this time (retry backoff)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Set by the worker running the job, which refreshes `heartbeat_at` while it runs
+    worker = models.CharField(max_length=100, blank=True, default="")
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Traceback of the last failed attempt
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's queue: only the jobs waiting to run are indexed
+            models.Index(
+                fields=["run_after", "id"], condition=models.Q(status=JobStatus.QUEUED), name="job_queued_idx"
+            ),
+            models.Index(
+                fields=["heartbeat_at"], condition=models.Q(status=JobStatus.RUNNING), name="job_running_idx"
+            ),
+            models.Index(fields=["kind", "-id"], name="job_kind_idx"),
+            # Old finished jobs are purged by the worker
+            models.Index(fields=["finished_at"], name="job_finished_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,54 @@
+"""
+Job kinds and how to enqueue them.
+
+Apps declare the jobs they offer in a `jobs.py` module (imported when the
+jobs app is ready) by decorating a function with `@job("<kind>")`. The
+function's keyword arguments are the job's parameters; it runs in the
+`run_jobs` worker and returns a JSON serializable result, or raises to fail
+the attempt.
+"""
+import inspect
+from io import StringIO
+
+from django.core.management import call_command
+
+from .models import Job
+
+handlers = {}
+
+
+def job(kind: str, max_attempts: int = 3):
+    """Register the decorated function as the handler of `kind` jobs."""
+    def decorator(func):
+        if kind in handlers:
+            raise ValueError(f"Job kind {kind!r} is already registered.")
+        func.max_attempts = max_attempts
+        handlers[kind] = func
+        return func
+    return decorator
+
+
+def check_params(kind: str, params: dict):
+    """Raise ValueError unless `params` can be passed to the handler of `kind`."""
+    if kind not in handlers:
+        raise ValueError(f"Unknown job kind {kind!r}; expected one of: {', '.join(sorted(handlers))}.")
+    try:
+        inspect.signature(handlers[kind]).bind(**params)
+    except TypeError as exc:
+        raise ValueError(f"Invalid parameters for {kind}: {exc}.") from None
+
+
+def enqueue(kind: str, params: dict | None = None, run_after=None) -> Job:
+    """Validate the parameters and queue a `kind` job."""
+    params = params or {}
+    check_params(kind, params)
+    fields = {"run_after": run_after} if run_after is not None else {}
+    return Job.objects.create(kind=kind, params=params, max_attempts=handlers[kind].max_attempts, **fields)
+
+
+def run_command(name: str, **options) -> dict:
+    """Run a management command and return what it printed, for handlers that wrap one."""
+    out = StringIO()
+    options = {key: value for key, value in options.items() if value is not None}
+    call_command(name, stdout=out, no_color=True, **options)
+    return {"output": out.getvalue().splitlines()}
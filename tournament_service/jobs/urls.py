@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import job_detail, jobs
+
+urlpatterns = [
+    path("jobs/", jobs, name="job-list"),
+    path("jobs/<int:job_id>/", job_detail, name="job-detail"),
+]
@@ -0,0 +1,103 @@
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from idempotency.decorators import IDEMPOTENCY_KEY_PARAMETER, run_idempotent
+
+from .models import Job, JobStatus
+from .registry import enqueue
+from .serializers import JobSerializer
+
+
+@extend_schema(
+    methods=["GET"],
+    parameters=[
+        OpenApiParameter("status", str, enum=JobStatus.values, description="Only return jobs with this status."),
+        OpenApiParameter("kind", str, description="Only return jobs of this kind."),
+        OpenApiParameter("limit", int, description="Number of jobs to return (default 100, max 1000)."),
+        OpenApiParameter("offset", int, description="Number of jobs to skip."),
+    ],
+    responses={200: JobSerializer(many=True), 400: None},
+    summary="List background jobs",
+    description="Background jobs, newest first.",
+)
+@extend_schema(
+    methods=["POST"],
+    request=JobSerializer,
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    responses={202: JobSerializer, 400: None},
+    summary="Queue a background job",
+    description=(
+        "Queue a job for the `run_jobs` worker and answer 202 with the URL to poll (`Location`). "
+        "`params` are the keyword arguments of the job kind: `recompute_ratings`, "
+        "`rebuild_player_stats`, `rebuild_standings` (tournament, snapshot, verify), "
+        "`checkpoint_standings` (tournament), `purge_tournaments` (days, status, chunk_size), `archive_finished_tournaments` (days) "
+        "and `export_state`."
+    ),
+)
+@api_view(["GET", "POST"])
+def jobs(request):
+    """
+    URL:
+      GET  /api/jobs/?status=<status>&kind=<kind>&limit=<n>&offset=<n>
+      POST /api/jobs/ {"kind": <kind>, "params": {...}}
+    """
+    if request.method == "POST":
+        return run_idempotent(request, lambda: _create_job(request))
+
+    try:
+        limit = min(int(request.query_params.get("limit", 100)), 1000)
+        offset = int(request.query_params.get("offset", 0))
+    except ValueError:
+        return Response({"detail": "limit and offset must be integers."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if limit < 0 or offset < 0:
+        return Response({"detail": "limit and offset must not be negative."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = Job.objects.order_by("-id")
+    if "status" in request.query_params:
+        if request.query_params["status"] not in JobStatus.values:
+            return Response({"detail": f"status must be one of: {', '.join(JobStatus.values)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset = queryset.filter(status=request.query_params["status"])
+    if "kind" in request.query_params:
+        queryset = queryset.filter(kind=request.query_params["kind"])
+    return Response(JobSerializer(queryset[offset:offset + limit], many=True).data)
+
+
+def _create_job(request):
+    # 1. Validate input
+    serializer = JobSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    # 2. The kind must be registered and accept the parameters
+    try:
+        job = enqueue(serializer.validated_data["kind"], serializer.validated_data.get("params", {}))
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = JobSerializer(job).data
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["status_url"]})
+
+
+@extend_schema(
+    responses={200: JobSerializer, 404: None},
+    summary="Get a background job",
+    description=(
+        "State of a job: `queued` (again after a failed attempt, not before `run_after`), `running`, "
+        "`succeeded` (with its `result`) or `failed` (with the traceback of the last attempt in `error`)."
+    ),
+)
+@api_view(["GET"])
+def job_detail(request, job_id: int):
+    """
+    URL:
+      GET /api/jobs/<job_id>/
+    """
+    try:
+        job = Job.objects.get(id=job_id)
+    except Job.DoesNotExist:
+        return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(JobSerializer(job).data, status=status.HTTP_200_OK)
@@ -0,0 +1,218 @@
+"""
+The job worker behind `manage.py run_jobs`.
+
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED on the queued jobs
+whose `run_after` has passed, oldest first: the claiming transaction only
+flips the job to `running` and commits, so any number of worker threads and
+processes share the queue without blocking each other or running a job twice.
+The handler then runs outside of that transaction.
+
+A job that raises is queued again `JOB_RETRY_BACKOFF * 2 ** (attempts - 1)`
+seconds later (at most `JOB_RETRY_BACKOFF_MAX`) until it has used up its
+attempts, and is failed with the traceback after that. While jobs run, their
+worker refreshes `heartbeat_at` every `JOB_HEARTBEAT_INTERVAL` seconds; running
+jobs whose heartbeat is older than `JOB_STALE_AFTER` belonged to a worker that
+died and are taken back by the next idle worker, counting as a failed attempt.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, JobStatus
+from .registry import handlers
+
+logger = logging.getLogger(__name__)
+
+# Seconds between deletions of old finished jobs
+PURGE_INTERVAL = 3600
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the attempt after `attempts` failed ones."""
+    return min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOB_RETRY_BACKOFF_MAX)
+
+
+def claim(worker: str) -> Job | None:
+    """Mark the next due job as running by `worker` and return it, or None."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=JobStatus.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.worker = worker
+        job.started_at = job.heartbeat_at = now
+        job.finished_at = None
+        job.save(update_fields=["status", "attempts", "worker", "started_at", "heartbeat_at", "finished_at"])
+    return job
+
+
+def run(job: Job) -> JobStatus:
+    """Run a claimed job and record the outcome of the attempt."""
+    handler = handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler is registered for {job.kind!r} jobs.")
+        result = handler(**job.params)
+    except Exception:
+        logger.warning("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts, exc_info=True)
+        _discard_broken_connection()
+        return _fail(job, traceback.format_exc())
+    job.status, job.result, job.error, job.finished_at = JobStatus.SUCCEEDED, result, "", timezone.now()
+    _save_outcome(job, ["status", "result", "error", "finished_at"])
+    return job.status
+
+
+def _discard_broken_connection():
+    # After an error the connection may be dead (e.g. the database restarted);
+    # Django reconnects on the next query. Left alone inside a transaction,
+    # which is for its owner to roll back.
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def _fail(job, error):
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        job.status, job.run_after = JobStatus.QUEUED, now + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status, job.finished_at = JobStatus.FAILED, now
+    job.error = error
+    _save_outcome(job, ["status", "run_after", "finished_at", "error"])
+    return job.status
+
+
+def _save_outcome(job, fields):
+    # Only while the attempt is still ours: a job whose heartbeat went stale may
+    # have been taken back and claimed again in the meantime
+    updated = Job.objects.filter(
+        id=job.id, status=JobStatus.RUNNING, worker=job.worker, attempts=job.attempts
+    ).update(**{field: getattr(job, field) for field in fields})
+    if not updated:
+        logger.warning("Job %s (%s) was taken back before attempt %s finished", job.id, job.kind, job.attempts)
+
+
+def requeue_stale() -> int:
+    """Take back running jobs whose worker stopped sending heartbeats."""
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=JobStatus.RUNNING, heartbeat_at__lt=now - timedelta(seconds=settings.JOB_STALE_AFTER)
+    )
+    error = "The worker running this attempt stopped responding."
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=JobStatus.FAILED, finished_at=now, error=error
+    )
+    requeued = stale.update(status=JobStatus.QUEUED, run_after=now, error=error)
+    return failed + requeued
+
+
+def run_pending(worker: str | None = None) -> dict:
+    """
+    Run the jobs that are due, one after another, until none are left.
+    Returns the number of attempts that succeeded, will be retried and failed.
+    """
+    worker = worker or worker_name()
+    counts = {"succeeded": 0, "retried": 0, "failed": 0}
+    requeue_stale()
+    while (job := claim(worker)) is not None:
+        outcome = run(job)
+        counts["retried" if outcome == JobStatus.QUEUED else outcome.value] += 1
+    return counts
+
+
+def purge_finished(before) -> int:
+    """Delete succeeded and failed jobs that finished before `before`."""
+    deleted, _ = Job.objects.filter(finished_at__lt=before).delete()
+    return deleted
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Worker:
+    """
+    Run jobs in `concurrency` threads until `stop()` is called. The calling
+    thread sends the heartbeats of the jobs running in all of them.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float, keep_days: int, stdout=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.keep_days = keep_days
+        self.stdout = stdout
+        self.name = worker_name()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self._loop, args=(f"{self.name}:{index}",), name=f"job-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        purged_at = None
+        try:
+            while any(thread.is_alive() for thread in threads):
+                self._stopping.wait(settings.JOB_HEARTBEAT_INTERVAL)
+                self._heartbeat()
+                if purged_at is None or time.monotonic() - purged_at > PURGE_INTERVAL:
+                    purge_finished(timezone.now() - timedelta(days=self.keep_days))
+                    purged_at = time.monotonic()
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join()
+            connection.close()
+
+    def _heartbeat(self):
+        with self._lock:
+            job_ids = list(self._running.values())
+        if job_ids:
+            Job.objects.filter(id__in=job_ids, status=JobStatus.RUNNING).update(heartbeat_at=timezone.now())
+
+    def _loop(self, name):
+        try:
+            while not self._stopping.is_set():
+                try:
+                    job = claim(name)
+                    if job is None:
+                        requeue_stale()
+                        self._stopping.wait(self.poll_interval)
+                        continue
+                except Exception:
+                    logger.warning("Job worker %s could not claim a job", name, exc_info=True)
+                    _discard_broken_connection()
+                    self._stopping.wait(self.poll_interval)
+                    continue
+                with self._lock:
+                    self._running[name] = job.id
+                try:
+                    outcome = run(job)
+                finally:
+                    with self._lock:
+                        del self._running[name]
+                if self.stdout is not None:
+                    self.stdout.write(f"Job {job.id} ({job.kind}) attempt {job.attempts}: {outcome}.")
+        finally:
+            connection.close()
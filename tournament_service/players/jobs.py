@@ -0,0 +1,17 @@
+"""Background jobs of the players app, run by `manage.py run_jobs`."""
+from jobs.registry import job
+
+from .ratings import recompute_all
+from .stats import rebuild_all
+
+
+@job("recompute_ratings")
+def recompute_ratings():
+    """Replay every game to recompute all Elo ratings (see recompute_ratings)."""
+    return {"games": recompute_all()}
+
+
+@job("rebuild_player_stats")
+def rebuild_player_stats():
+    """Recompute all career statistics from the games (see rebuild_player_stats)."""
+    return {"players": rebuild_all()}
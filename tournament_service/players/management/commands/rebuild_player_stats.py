@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from players.stats import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recompute all player career statistics from the recorded games."
+
+    def handle(self, *args, **options):
+        rows = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt career statistics for {rows} players."))
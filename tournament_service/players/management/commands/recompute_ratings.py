@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from players.ratings import recompute_all
+
+
+class Command(BaseCommand):
+    help = "Recompute all player Elo ratings by replaying every game in chronological order."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        games = recompute_all()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Replayed {games} games in {elapsed:.2f}s."))
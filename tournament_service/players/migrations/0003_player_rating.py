@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("players", "0002_playerstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="rated_games",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="rating",
+            field=models.FloatField(default=1500.0),
+        ),
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(fields=["-rating", "id"], name="player_rating_idx"),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+PREFIX_INDEX = "player_name_prefix_idx"
+TRIGRAM_INDEX = "player_name_trgm_idx"
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    PostgreSQL only: a B-tree on UPPER(name) in the "C" collation for prefix
+    matches, and a pg_trgm GIN index for fuzzy matches when the extension is
+    available. Built concurrently so that existing tables stay writable.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("players", "Player")._meta.db_table)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {PREFIX_INDEX} ON {table} ((UPPER("name") COLLATE "C"), "id")'
+        )
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")
+        if not cursor.fetchone()[0]:
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {TRIGRAM_INDEX} ON {table} USING gin ("name" gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {TRIGRAM_INDEX}")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {PREFIX_INDEX}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("players", "0003_player_rating"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
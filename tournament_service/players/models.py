@@ -1,7 +1,38 @@
 from django.db import models
 
+DEFAULT_RATING = 1500.0
+
+
 class Player(models.Model):
     name = models.CharField(max_length=100)
+    rating = models.FloatField(default=DEFAULT_RATING)
+    rated_games = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-rating", "id"], name="player_rating_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class PlayerStats(models.Model):
+    """
+    Career rollup of a player's results across all tournaments.
+
+    Maintained incrementally by `add_game_result` and recomputed in bulk by
+    the `rebuild_player_stats` management command.
+    """
+    player = models.OneToOneField(
+        Player, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    points = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    games_played = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"Stats for player {self.player_id}"
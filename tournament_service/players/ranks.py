@@ -0,0 +1,144 @@
+"""
+Rank of a single player, computed in the database.
+
+A player's rank is shared by players that are equal on all of the ranking's
+keys, its dense rank counts the distinct keys above it, and its place in the
+listing breaks ties like the listing does. Only the entries placed at most
+`window` places above or below the player are returned, so answering "what's
+my rank?" does not send the whole ranking to the client.
+
+The global ranking orders players by rating, like GET /api/players/rankings/,
+and is never numbered as a whole: the players around the given one are read
+with two keyset scans of the player_rating_idx index (`window` rows each way)
+and the ranks of that slice follow from counts of the ratings above it, again
+answered from the index. The ranking within a tournament is in
+tournaments/ranks.py; it is aggregated from the tournament's games anyway and
+numbered with window functions (`rank_around`).
+"""
+from django.db import connection
+
+from .models import Player
+
+RATING_RANK_FIELDS = ("rank", "dense_rank", "id", "name", "rating", "rated_games")
+# Most entries returned above and below the player
+MAX_WINDOW = 100
+
+
+def _entries(rows, fields):
+    """Split ranked rows with a `distance` from the player into {"player", "above", "below"}."""
+    if not rows:
+        return None
+    entries = {"player": None, "above": [], "below": []}
+    for row in rows:
+        entry = {field: row[field] for field in fields}
+        if row["distance"] < 0:
+            entries["above"].append(entry)
+        elif row["distance"] > 0:
+            entries["below"].append(entry)
+        else:
+            entries["player"] = entry
+    return entries
+
+
+def _fetch(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def rank_around(ranking, order, tiebreak, params, player_id: int, window: int, fields, ctes=()):
+    """
+    The entry of `player_id` in a ranking with the entries placed at most
+    `window` places above and below it, as {"player", "above", "below"}, or
+    None if the player is not ranked.
+
+    `ranking` is a SELECT with a player_id column and one row per player,
+    preceded by the `ctes` (name, SELECT) pairs; `params` are the parameters
+    of both. `order` is the SQL ORDER BY list ranks are based on and
+    `tiebreak` the columns that order rows of the same rank in the listing.
+    Entries have the given `fields` of the ranking's columns, `rank` and
+    `dense_rank`. The whole ranking is numbered, so this is meant for
+    rankings of a bounded size.
+    """
+    with_clause = "".join(f"{name} AS ({sql}), " for name, sql in ctes)
+    sql = f"""
+        WITH {with_clause}ranked AS (
+            SELECT r.*,
+                   RANK() OVER (ORDER BY {order}) AS rank,
+                   DENSE_RANK() OVER (ORDER BY {order}) AS dense_rank,
+                   ROW_NUMBER() OVER (ORDER BY {order}, {tiebreak}) AS position
+            FROM ({ranking}) r
+        ),
+        me AS (SELECT MIN(position) AS position FROM ranked WHERE player_id = %s)
+        SELECT r.*, r.position - (SELECT position FROM me) AS distance
+        FROM ranked r
+        WHERE r.position BETWEEN (SELECT position FROM me) - %s AND (SELECT position FROM me) + %s
+        ORDER BY r.position
+    """
+    return _entries(_fetch(sql, [*params, player_id, window, window]), fields)
+
+
+def rating_rank(player_id: int, window: int):
+    """
+    Rank of a player in the global rating ranking with the players around it
+    (see `rank_around`); players with the same rating share their rank and
+    are listed by id.
+
+    One statement: the player's rating and id bound two keyset scans of
+    `window` rows above and below it. Within that slice ranks are numbered
+    with window functions and offset by counts taken at the top of the slice:
+    the players rated higher than it (its rank, unless the tie continues
+    above the slice), the distinct ratings above it (its dense rank) and the
+    players tied with it but listed before it (its place in the listing).
+    """
+    table = connection.ops.quote_name(Player._meta.db_table)
+    # The bounds are scalar subqueries rather than joins so that they are
+    # evaluated once and become index conditions of the scans
+    sql = f"""
+        WITH me AS (SELECT id, rating FROM {table} WHERE id = %s),
+        above AS (
+            SELECT p.id, p.name, p.rating, p.rated_games
+            FROM {table} p
+            WHERE p.rating >= (SELECT rating FROM me)
+              AND (p.rating > (SELECT rating FROM me) OR p.id < (SELECT id FROM me))
+            ORDER BY p.rating, p.id DESC
+            LIMIT %s
+        ),
+        below AS (
+            SELECT p.id, p.name, p.rating, p.rated_games
+            FROM {table} p
+            WHERE p.rating <= (SELECT rating FROM me)
+              AND (p.rating < (SELECT rating FROM me) OR p.id > (SELECT id FROM me))
+            ORDER BY p.rating DESC, p.id
+            LIMIT %s
+        ),
+        slice AS (
+            SELECT * FROM above
+            UNION ALL SELECT p.id, p.name, p.rating, p.rated_games FROM {table} p WHERE p.id = (SELECT id FROM me)
+            UNION ALL SELECT * FROM below
+        ),
+        ranked AS (
+            SELECT s.*,
+                   RANK() OVER (ORDER BY rating DESC) AS slice_rank,
+                   DENSE_RANK() OVER (ORDER BY rating DESC) AS slice_dense_rank,
+                   ROW_NUMBER() OVER (ORDER BY rating DESC, id) AS position
+            FROM slice s
+        ),
+        top AS (SELECT id, rating FROM ranked WHERE position = 1),
+        counts AS (
+            SELECT COUNT(*) AS higher, COUNT(DISTINCT rating) AS higher_ratings,
+                   (SELECT COUNT(*) FROM {table}
+                    WHERE rating = (SELECT rating FROM top) AND id < (SELECT id FROM top)) AS tied_before
+            FROM {table}
+            WHERE rating > (SELECT rating FROM top)
+        )
+        SELECT r.id, r.name, r.rating, r.rated_games,
+               CASE WHEN r.slice_rank = 1 THEN c.higher + 1
+                    ELSE c.higher + c.tied_before + r.slice_rank END AS rank,
+               c.higher_ratings + r.slice_dense_rank AS dense_rank,
+               r.position - (SELECT position FROM ranked WHERE id = (SELECT id FROM me)) AS distance
+        FROM ranked r, counts c
+        ORDER BY r.position
+    """
+    return _entries(_fetch(sql, [player_id, window, window]), RATING_RANK_FIELDS)
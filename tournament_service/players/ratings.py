@@ -0,0 +1,176 @@
+import heapq
+from itertools import batched
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import DEFAULT_RATING, Player
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    """Probability-like expected score of `rating` against `opponent_rating`."""
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / 400.0))
+
+
+def _home_result(home_score: int, away_score: int) -> float:
+    """Actual score of the home side: 1 for a win, 0.5 for a draw, 0 for a loss."""
+    if home_score > away_score:
+        return 1.0
+    if home_score < away_score:
+        return 0.0
+    return 0.5
+
+
+def record_game(home_player_id: int, away_player_id: int, home_score: int, away_score: int):
+    """
+    Update both players' Elo ratings for a single game.
+
+    Both rows are locked for the duration of the surrounding transaction so that
+    concurrent results involving the same player are applied one after another.
+    """
+    record_games([(home_player_id, away_player_id, home_score, away_score)])
+
+
+def record_games(rows):
+    """
+    Update the Elo ratings of the players of several games, given as
+    (home_player_id, away_player_id, home_score, away_score) rows in the order
+    they were played.
+
+    All players are locked (in id order) for the duration of the surrounding
+    transaction, rated in memory and written back with one statement.
+    """
+    player_ids = sorted({player_id for row in rows for player_id in row[:2]})
+    ratings, counts = {}, {}
+    for player_id, rating, rated_games in (
+        Player.objects.select_for_update()
+        .filter(id__in=player_ids)
+        .order_by("id")
+        .values_list("id", "rating", "rated_games")
+    ):
+        ratings[player_id], counts[player_id] = rating, rated_games
+
+    for home_player_id, away_player_id, home_score, away_score in rows:
+        home_rating, away_rating = ratings[home_player_id], ratings[away_player_id]
+        delta = settings.ELO_K_FACTOR * (
+            _home_result(home_score, away_score) - expected_score(home_rating, away_rating)
+        )
+        ratings[home_player_id] = home_rating + delta
+        ratings[away_player_id] = away_rating - delta
+        counts[home_player_id] += 1
+        counts[away_player_id] += 1
+
+    _write_ratings(
+        np.array(player_ids, dtype=np.int64),
+        np.array([ratings[i] for i in player_ids], dtype=np.float64),
+        np.array([counts[i] for i in player_ids], dtype=np.int64),
+    )
+
+
+def _game_rows():
+    """
+    Stream (home_player_id, away_player_id, home_score, away_score) in chronological
+    order, merging the games table with the archive (archived games keep their id).
+    """
+    from tournaments.models import ArchivedGame, Game
+
+    def ordered(model):
+        return (
+            model.objects.order_by("id")
+            .values_list(
+                "id",
+                "home_participant__player_id",
+                "away_participant__player_id",
+                "home_score",
+                "away_score",
+            )
+            .iterator(chunk_size=settings.ELO_RECOMPUTE_CHUNK_SIZE)
+        )
+
+    return (row[1:] for row in heapq.merge(ordered(Game), ordered(ArchivedGame)))
+
+
+def replay(rows, size: int, k_factor: float):
+    """
+    Replay game rows into fresh rating and game-count arrays indexed by player id.
+
+    Elo is order dependent, so the rating recurrence runs game by game; each
+    chunk of rows is decoded and counted with array operations.
+    """
+    ratings = np.full(size, DEFAULT_RATING, dtype=np.float64)
+    counts = np.zeros(size, dtype=np.int64)
+
+    for chunk in batched(rows, settings.ELO_RECOMPUTE_CHUNK_SIZE):
+        block = np.array(chunk, dtype=np.int64)
+        home, away = block[:, 0], block[:, 1]
+
+        # Players created after the arrays were sized
+        top = int(max(home.max(), away.max())) + 1
+        if top > len(ratings):
+            ratings = np.concatenate([ratings, np.full(top - len(ratings), DEFAULT_RATING)])
+            counts = np.concatenate([counts, np.zeros(top - len(counts), dtype=np.int64)])
+
+        results = (np.sign(block[:, 2] - block[:, 3]) + 1) / 2.0
+
+        np.add.at(counts, home, 1)
+        np.add.at(counts, away, 1)
+
+        for h, a, s in zip(home.tolist(), away.tolist(), results.tolist()):
+            rh, ra = ratings[h], ratings[a]
+            delta = k_factor * (s - 1.0 / (1.0 + 10.0 ** ((ra - rh) / 400.0)))
+            ratings[h] = rh + delta
+            ratings[a] = ra - delta
+
+    return ratings, counts
+
+
+def _write_ratings(player_ids, ratings, counts):
+    """Persist ratings and game counts in bulk statements of ELO_RECOMPUTE_CHUNK_SIZE rows."""
+    chunk_size = settings.ELO_RECOMPUTE_CHUNK_SIZE
+    table = connection.ops.quote_name(Player._meta.db_table)
+
+    for start in range(0, len(player_ids), chunk_size):
+        ids = player_ids[start:start + chunk_size].tolist()
+        values = ratings[start:start + chunk_size].tolist()
+        games = counts[start:start + chunk_size].tolist()
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {table} AS p
+                    SET rating = v.rating, rated_games = v.rated_games
+                    FROM unnest(%s::bigint[], %s::float8[], %s::integer[])
+                        AS v(id, rating, rated_games)
+                    WHERE p.id = v.id
+                    """,
+                    [ids, values, games],
+                )
+        else:
+            Player.objects.bulk_update(
+                [
+                    Player(id=i, rating=r, rated_games=g)
+                    for i, r, g in zip(ids, values, games)
+                ],
+                ["rating", "rated_games"],
+            )
+
+
+def recompute_all() -> int:
+    """
+    Recompute every player's rating by replaying the full game history.
+
+    Returns the number of games replayed.
+    """
+    max_id = Player.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+
+    with transaction.atomic():
+        ratings, counts = replay(_game_rows(), max_id + 1, settings.ELO_K_FACTOR)
+
+        Player.objects.update(rating=DEFAULT_RATING, rated_games=0)
+        rated = np.flatnonzero(counts)
+        _write_ratings(rated, ratings[rated], counts[rated])
+
+    return int(counts.sum() // 2)
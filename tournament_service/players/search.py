@@ -0,0 +1,72 @@
+"""
+Player name search.
+
+On PostgreSQL, prefix matches are served by a B-tree index on UPPER(name) in
+the "C" collation (see migration 0004), which also returns them in index order
+so short queries stop after the first page. Queries of at least
+TRIGRAM_MIN_LENGTH characters additionally match names containing a similar
+word through a pg_trgm GIN index and are ordered by relevance. Ranking by
+similarity needs every candidate, so the candidates are bounded first: the
+first SEARCH_CANDIDATES prefix matches in index order and any
+SEARCH_CANDIDATES names the trigram index finds similar. Results past that
+many rows are not served. Other backends (and databases without pg_trgm)
+fall back to a case-insensitive substring scan.
+"""
+from functools import cache
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Collate, Upper
+
+from .models import Player
+
+# Trigram matching needs at least one full trigram to be selective
+TRIGRAM_MIN_LENGTH = 3
+# Prefix and similar names each ranked by the fuzzy search at most
+SEARCH_CANDIDATES = 500
+
+
+@cache
+def _has_trigram(alias: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        return cursor.fetchone()[0]
+
+
+def _relevance(query: str):
+    """0 for an exact match, 1 for a prefix match, 2 for anything else."""
+    return Case(
+        When(name__iexact=query, then=Value(0)),
+        When(name__istartswith=query, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+
+def search_players(query: str):
+    """Return a queryset of players whose name matches `query`, most relevant first."""
+    if connection.vendor != "postgresql":
+        return (
+            Player.objects.filter(name__icontains=query)
+            .annotate(relevance=_relevance(query))
+            .order_by("relevance", "name", "id")
+        )
+
+    # Matches the expression of the prefix index
+    search_key = Collate(Upper("name"), "C")
+    players = Player.objects.annotate(search_key=search_key)
+    prefix = Q(search_key__startswith=query.upper())
+
+    if len(query) < TRIGRAM_MIN_LENGTH or not _has_trigram(connection.alias):
+        # Exact matches sort first: they are the shortest name with the prefix
+        return players.filter(prefix).order_by("search_key", "id")
+
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    prefix_ids = players.filter(prefix).order_by("search_key", "id").values("id")[:SEARCH_CANDIDATES]
+    similar_ids = Player.objects.filter(name__trigram_word_similar=query).values("id")[:SEARCH_CANDIDATES]
+    return (
+        players.filter(Q(id__in=prefix_ids) | Q(id__in=similar_ids))
+        .annotate(relevance=_relevance(query), similarity=TrigramWordSimilarity(query, "name"))
+        .order_by("relevance", "-similarity", "search_key", "id")
+    )
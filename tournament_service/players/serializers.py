@@ -1,7 +1,40 @@
 from rest_framework import serializers
-from .models import Player
+from .models import Player, PlayerStats
 
 class PlayerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Player
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+        read_only_fields = ["rating", "rated_games"]
+
+
+class PlayerRankingSerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField()
+
+    class Meta:
+        model = Player
+        fields = ["rank", "id", "name", "rating", "rated_games"]
+
+
+class PlayerRankEntrySerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    dense_rank = serializers.IntegerField()
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    rating = serializers.FloatField()
+    rated_games = serializers.IntegerField()
+
+
+class PlayerRankSerializer(serializers.Serializer):
+    player = PlayerRankEntrySerializer()
+    above = PlayerRankEntrySerializer(many=True)
+    below = PlayerRankEntrySerializer(many=True)
+
+
+class PlayerStatsSerializer(serializers.ModelSerializer):
+    player_id = serializers.IntegerField(source="player.id")
+    player_name = serializers.CharField(source="player.name")
+
+    class Meta:
+        model = PlayerStats
+        fields = ["player_id", "player_name", "points", "wins", "draws", "losses", "games_played"]
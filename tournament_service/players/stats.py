@@ -0,0 +1,185 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Player, PlayerStats
+
+
+def _outcome(own_score: int, other_score: int):
+    """Return (points, wins, draws, losses) for one side of a game."""
+    if own_score > other_score:
+        return 2, 1, 0, 0
+    if own_score < other_score:
+        return 0, 0, 0, 1
+    return 1, 0, 1, 0
+
+
+def record_game(home_player_id: int, away_player_id: int, home_score: int, away_score: int):
+    """
+    Incrementally apply one game result to both players' career rollups.
+
+    Costs two queries regardless of how many games the players have played:
+    one to make sure both rows exist, one UPDATE with F-expressions.
+    """
+    record_games([(home_player_id, away_player_id, home_score, away_score)])
+
+
+def record_games(rows):
+    """
+    Apply several game results, given as (home_player_id, away_player_id,
+    home_score, away_score) rows, with the same two queries as `record_game`.
+    """
+    totals = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for home_player_id, away_player_id, home_score, away_score in rows:
+        for player_id, outcome in (
+            (home_player_id, _outcome(home_score, away_score)),
+            (away_player_id, _outcome(away_score, home_score)),
+        ):
+            total = totals[player_id]
+            for index, value in enumerate(outcome):
+                total[index] += value
+            total[4] += 1
+
+    PlayerStats.objects.bulk_create(
+        [PlayerStats(player_id=player_id) for player_id in sorted(totals)],
+        ignore_conflicts=True,
+    )
+    _add_totals(totals)
+
+
+def remove_games(games) -> int:
+    """
+    Take games that are about to be deleted back out of their players'
+    rollups. `games` are querysets of games (live or archived); the totals are
+    summed up per player in the database, one query per queryset and side.
+    Returns the number of players whose rollup changed.
+    """
+    totals = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for queryset in games:
+        for own, other in (("home", "away"), ("away", "home")):
+            won = Q(**{f"{own}_score__gt": F(f"{other}_score")})
+            drawn = Q(**{f"{own}_score": F(f"{other}_score")})
+            lost = Q(**{f"{own}_score__lt": F(f"{other}_score")})
+            rows = (
+                queryset.order_by()
+                .values_list(f"{own}_participant__player_id")
+                .annotate(
+                    points=Sum(Case(When(won, then=Value(2)), When(drawn, then=Value(1)), default=Value(0))),
+                    wins=Count("pk", filter=won),
+                    draws=Count("pk", filter=drawn),
+                    losses=Count("pk", filter=lost),
+                    games_played=Count("pk"),
+                )
+            )
+            for player_id, *values in rows:
+                total = totals[player_id]
+                for index, value in enumerate(values):
+                    total[index] -= value
+    if totals:
+        # Locked in id order first, like record_games does through the ratings
+        list(Player.objects.select_for_update().filter(id__in=list(totals)).order_by("id").values_list("id"))
+        _add_totals(totals)
+    return len(totals)
+
+
+def _add_totals(totals):
+    """
+    Add {player_id: [points, wins, draws, losses, games_played]} to existing
+    rollup rows. Games written behind the API's back were never counted, so
+    taking them out stops at zero.
+    """
+    if connection.vendor == "postgresql":
+        # One row per player instead of a CASE branch per player
+        table = connection.ops.quote_name(PlayerStats._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS s
+                SET points = GREATEST(s.points + v.points, 0), wins = GREATEST(s.wins + v.wins, 0),
+                    draws = GREATEST(s.draws + v.draws, 0), losses = GREATEST(s.losses + v.losses, 0),
+                    games_played = GREATEST(s.games_played + v.games_played, 0),
+                    updated_at = %s
+                FROM unnest(%s::bigint[], %s::integer[], %s::integer[], %s::integer[], %s::integer[],
+                            %s::integer[]) AS v(player_id, points, wins, draws, losses, games_played)
+                WHERE s.player_id = v.player_id
+                """,
+                [timezone.now(), list(totals), *([total[index] for total in totals.values()] for index in range(5))],
+            )
+        return
+
+    def delta(index):
+        return Case(
+            *(When(player_id=player_id, then=Value(total[index])) for player_id, total in totals.items()),
+            default=Value(0),
+        )
+
+    PlayerStats.objects.filter(player_id__in=list(totals)).update(
+        points=Greatest(F("points") + delta(0), 0),
+        wins=Greatest(F("wins") + delta(1), 0),
+        draws=Greatest(F("draws") + delta(2), 0),
+        losses=Greatest(F("losses") + delta(3), 0),
+        games_played=Greatest(F("games_played") + delta(4), 0),
+        updated_at=timezone.now(),
+    )
+
+
+def rebuild_all():
+    """
+    Recompute every player's rollup from the games table (and its archive) in
+    a single INSERT ... SELECT. Returns the number of rollup rows written.
+    """
+    from tournaments.models import ArchivedGame, Game, TournamentParticipant
+
+    qn = connection.ops.quote_name
+    stats_table = qn(PlayerStats._meta.db_table)
+    player_table = qn(Player._meta.db_table)
+    game_table = qn(Game._meta.db_table)
+    archived_game_table = qn(ArchivedGame._meta.db_table)
+    participant_table = qn(TournamentParticipant._meta.db_table)
+
+    # Hot and archived games alike
+    columns = "home_participant_id, away_participant_id, home_score, away_score"
+    games = f"(SELECT {columns} FROM {game_table} UNION ALL SELECT {columns} FROM {archived_game_table})"
+
+    # One row per (player, game) from the player's point of view.
+    side = """
+        SELECT tp.player_id AS player_id,
+               CASE WHEN g.{own} > g.{other} THEN 2
+                    WHEN g.{own} = g.{other} THEN 1 ELSE 0 END AS points,
+               CASE WHEN g.{own} > g.{other} THEN 1 ELSE 0 END AS win,
+               CASE WHEN g.{own} = g.{other} THEN 1 ELSE 0 END AS draw,
+               CASE WHEN g.{own} < g.{other} THEN 1 ELSE 0 END AS loss
+        FROM {game} g
+        JOIN {participant} tp ON tp.id = g.{participant_column}
+    """
+    home_side = side.format(
+        own="home_score", other="away_score", game=games,
+        participant=participant_table, participant_column="home_participant_id",
+    )
+    away_side = side.format(
+        own="away_score", other="home_score", game=games,
+        participant=participant_table, participant_column="away_participant_id",
+    )
+
+    sql = f"""
+        INSERT INTO {stats_table}
+            (player_id, points, wins, draws, losses, games_played, updated_at)
+        SELECT p.id,
+               COALESCE(SUM(r.points), 0),
+               COALESCE(SUM(r.win), 0),
+               COALESCE(SUM(r.draw), 0),
+               COALESCE(SUM(r.loss), 0),
+               COUNT(r.player_id),
+               %s
+        FROM {player_table} p
+        LEFT JOIN ({home_side} UNION ALL {away_side}) r ON r.player_id = p.id
+        GROUP BY p.id
+    """
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {stats_table}")
+        cursor.execute(sql, [timezone.now()])
+        return cursor.rowcount
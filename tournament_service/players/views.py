@@ -1,10 +1,17 @@
-from rest_framework import viewsets
-from drf_spectacular.utils import extend_schema
-from .models import Player
-from .serializers import PlayerSerializer
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from idempotency.decorators import IDEMPOTENCY_KEY_PARAMETER, IdempotentCreateMixin
+from tournaments.deletion import delete_players
+from .models import Player, PlayerStats
+from .ranks import MAX_WINDOW, rating_rank
+from .search import search_players
+from .serializers import PlayerSerializer, PlayerStatsSerializer, PlayerRankingSerializer, PlayerRankSerializer
 
 
-class PlayerViewSet(viewsets.ModelViewSet):
+@extend_schema_view(create=extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER]))
+class PlayerViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing players.
     
@@ -12,3 +19,142 @@ class PlayerViewSet(viewsets.ModelViewSet):
     """
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "stats":
+            queryset = queryset.select_related("stats")
+        return queryset
+
+    def perform_destroy(self, instance):
+        # One DELETE per dependent table instead of Django's in-memory cascade
+        delete_players([instance.pk])
+
+    @extend_schema(
+        responses={200: PlayerStatsSerializer, 404: None},
+        summary="Get a player's career statistics",
+        description="Lifetime points, wins, draws and losses of a player across all tournaments.",
+    )
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """
+        Return the player's career rollup.
+
+        URL:
+          GET /api/players/<id>/stats/
+        """
+        player = self.get_object()
+        try:
+            player_stats = player.stats
+        except PlayerStats.DoesNotExist:
+            # Player has not played any game yet
+            player_stats = PlayerStats(player=player)
+        return Response(PlayerStatsSerializer(player_stats).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("limit", int, description="Number of players to return (default 100, max 1000)."),
+            OpenApiParameter("offset", int, description="Number of players to skip."),
+        ],
+        responses={200: PlayerRankingSerializer(many=True), 400: None},
+        summary="Get the global player ranking",
+        description="All players sorted by Elo rating, highest first.",
+    )
+    @action(detail=False, methods=["get"])
+    def rankings(self, request):
+        """
+        Return players ordered by rating.
+
+        URL:
+          GET /api/players/rankings/?limit=<n>&offset=<n>
+        """
+        try:
+            limit = min(int(request.query_params.get("limit", 100)), 1000)
+            offset = int(request.query_params.get("offset", 0))
+        except ValueError:
+            return Response({"detail": "limit and offset must be integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if limit < 0 or offset < 0:
+            return Response({"detail": "limit and offset must not be negative."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        players = Player.objects.order_by("-rating", "id")[offset:offset + limit]
+        for rank, player in enumerate(players, start=offset + 1):
+            player.rank = rank
+        return Response(PlayerRankingSerializer(players, many=True).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "window", int, description=f"Players to return above and below (default 2, max {MAX_WINDOW})."
+            ),
+        ],
+        responses={200: PlayerRankSerializer, 400: None, 404: None},
+        summary="Get a player's rank in the global ranking",
+        description=(
+            "The player's rank by rating with the players directly above and below. Players with the same "
+            "rating share a rank (`rank` counts the players ahead, `dense_rank` the distinct ratings ahead) "
+            "and are listed by id, like in the rankings."
+        ),
+    )
+    @action(detail=True, methods=["get"])
+    def rank(self, request, pk=None):
+        """
+        Return the player's rank and the players around it.
+
+        URL:
+          GET /api/players/<id>/rank/?window=<n>
+        """
+        try:
+            window = int(request.query_params.get("window", 2))
+        except ValueError:
+            return Response({"detail": "window must be an integer."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= window <= MAX_WINDOW:
+            return Response({"detail": f"window must be between 0 and {MAX_WINDOW}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            ranked = rating_rank(int(pk), window)
+        except ValueError:
+            ranked = None
+        if ranked is None:
+            return Response({"detail": "Player not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(PlayerRankSerializer(ranked).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Name or part of a name to search for."),
+            OpenApiParameter("limit", int, description="Number of players to return (default 20, max 100)."),
+            OpenApiParameter("offset", int, description="Number of players to skip."),
+        ],
+        responses={200: PlayerSerializer(many=True), 400: None},
+        summary="Search players by name",
+        description=(
+            "Players whose name starts with `q` (case-insensitive), followed by names "
+            "containing a similar word, ordered by relevance."
+        ),
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Return players matching a name query, most relevant first.
+
+        URL:
+          GET /api/players/search/?q=<text>&limit=<n>&offset=<n>
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"detail": "q must not be empty."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), 100)
+            offset = int(request.query_params.get("offset", 0))
+        except ValueError:
+            return Response({"detail": "limit and offset must be integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if limit < 0 or offset < 0:
+            return Response({"detail": "limit and offset must not be negative."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        players = search_players(query)[offset:offset + limit]
+        return Response(PlayerSerializer(players, many=True).data)
@@ -0,0 +1,75 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class BatchStatusTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("tournament-batch-status")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+
+    def _create_tournament(self, name, games):
+        """Three participants; the first `games` pairings are won by the home side."""
+        tournament = Tournament.objects.create(name=name)
+        participants = [
+            TournamentParticipant.objects.create(tournament=tournament, player=player) for player in self.players
+        ]
+        for home, away in [(0, 1), (0, 2), (1, 2)][:games]:
+            Game.objects.create(tournament=tournament, home_participant=participants[home],
+                                away_participant=participants[away], home_score=2, away_score=0)
+        return tournament
+
+    def _ids(self, tournaments):
+        return ",".join(str(t.id) for t in tournaments)
+
+    @pytest.mark.order(78)
+    def test_matches_single_status_with_constant_queries(self):
+        tournaments = [self._create_tournament(f"Cup {i}", games=i % 4) for i in range(6)]
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"ids": self._ids(tournaments[:2])})
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"ids": self._ids(tournaments)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["not_found"], [])
+        for tournament in tournaments:
+            single = self.client.get(reverse("tournament-status", kwargs={"tournament_id": tournament.id}))
+            self.assertEqual(response.data["results"][tournament.id], single.data)
+
+    @pytest.mark.order(79)
+    def test_selection_frozen_and_missing_tournaments(self):
+        open_cup = self._create_tournament("Open", games=1)
+        finished = Tournament.objects.create(name="Finished")
+        participant_ids = [
+            self.client.post(reverse("add-participant", kwargs={"tournament_id": finished.id}),
+                             {"player_id": player.id}, format="json").data["id"]
+            for player in self.players[:2]
+        ]
+        self.client.post(
+            reverse("add-game", kwargs={"tournament_id": finished.id}),
+            {"home_participant": participant_ids[0], "away_participant": participant_ids[1],
+             "winner": self.players[1].id},
+            format="json",
+        )
+
+        response = self.client.get(
+            self.url, {"ids": f"{open_cup.id},9999,{finished.id}", "top": 1, "fields": "player_name,points"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["not_found"], [9999])
+        self.assertEqual(response.data["results"][open_cup.id]["leaderboard"], [{"player_name": "Alice", "points": 2}])
+        self.assertEqual(response.data["results"][finished.id]["status"], "finished")
+        self.assertEqual(response.data["results"][finished.id]["leaderboard"], [{"player_name": "Bob", "points": 2}])
+
+    @pytest.mark.order(80)
+    def test_invalid_ids(self):
+        for params in ({}, {"ids": "1,x"}, {"ids": ",".join(map(str, range(1, 102)))},
+                       {"ids": "1", "around_player": 1}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
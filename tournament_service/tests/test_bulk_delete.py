@@ -0,0 +1,219 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import (
+    Tournament, TournamentParticipant, Game, GameEvent, StandingsSnapshot, FinalStandings, ArchivedGame,
+)
+from jobs.models import Job
+from jobs.registry import enqueue
+from players.models import DEFAULT_RATING, Player, PlayerStats
+
+
+class BulkDeleteTests(APITestCase):
+    def _create_tournament(self, name, players):
+        """Create a tournament through the API where every pairing has been played."""
+        tournament_id = self.client.post(reverse("tournament-list"), {"name": name}, format="json").data["id"]
+        participant_ids = [
+            self.client.post(
+                reverse("add-participant", kwargs={"tournament_id": tournament_id}),
+                {"player_id": player.id},
+                format="json",
+            ).data["id"]
+            for player in players
+        ]
+        for i, home in enumerate(participant_ids):
+            for away in participant_ids[i + 1:]:
+                self.client.post(
+                    reverse("add-game", kwargs={"tournament_id": tournament_id}),
+                    {"home_participant": home, "away_participant": away, "winner": None},
+                    format="json",
+                )
+        return Tournament.objects.get(id=tournament_id)
+
+    def _players(self, *names):
+        return [Player.objects.create(name=name) for name in names]
+
+    def _delete_tournament(self, tournament):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse("tournament-detail", kwargs={"pk": tournament.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        return len(queries)
+
+    @pytest.mark.order(75)
+    def test_tournament_delete_removes_all_dependent_rows(self):
+        small = self._create_tournament("Small", self._players("A", "B"))
+        large = self._create_tournament("Large", self._players("C", "D", "E", "F", "G"))
+        kept = self._create_tournament("Kept", self._players("H", "I", "J"))
+        StandingsSnapshot.objects.create(tournament=large, last_event_id=0)
+        ArchivedGame.objects.create(
+            id=10**9, tournament=large, home_participant=large.participants.first(),
+            away_participant=large.participants.last(), home_score=1, away_score=1, sequence=100,
+            played_at=timezone.now(), archived_at=timezone.now(),
+        )
+
+        # Both deletions find the ratings replay they need already queued
+        enqueue("recompute_ratings")
+        small_queries = self._delete_tournament(small)
+        large_queries = self._delete_tournament(large)
+        self.assertEqual(Job.objects.filter(kind="recompute_ratings").count(), 1)
+
+        # The number of statements does not grow with the size of the tournament
+        self.assertEqual(small_queries, large_queries)
+        for model in (TournamentParticipant, Game, GameEvent, FinalStandings):
+            self.assertEqual(set(model.objects.values_list("tournament_id", flat=True)), {kept.id}, model)
+        self.assertFalse(StandingsSnapshot.objects.exists())
+        self.assertFalse(ArchivedGame.objects.exists())
+        self.assertEqual(Player.objects.count(), 10)
+
+    @pytest.mark.order(76)
+    def test_player_delete_repairs_tournaments(self):
+        alice, bob, charlie = self._players("Alice", "Bob", "Charlie")
+        tournament = self._create_tournament("Open", [alice, bob])
+        other = Tournament.objects.create(name="Other")
+        for player in (alice, bob, charlie):
+            self.client.post(reverse("add-participant", kwargs={"tournament_id": other.id}),
+                             {"player_id": player.id}, format="json")
+        revision = Tournament.objects.get(id=other.id).revision
+
+        response = self.client.delete(reverse("player-detail", kwargs={"pk": charlie.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        other.refresh_from_db()
+        self.assertEqual(other.participants_count, 2)
+        self.assertGreater(other.revision, revision)
+        self.assertFalse(PlayerStats.objects.filter(player_id=charlie.id).exists())
+
+        response = self.client.delete(reverse("player-detail", kwargs={"pk": alice.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        tournament.refresh_from_db()
+        self.assertEqual((tournament.participants_count, tournament.games_played), (1, 0))
+        self.assertFalse(Game.objects.filter(tournament=tournament).exists())
+        self.assertEqual(list(Player.objects.values_list("name", flat=True)), ["Bob"])
+        call_command("repair_tournament_counters", "--check", stdout=StringIO())
+
+    @pytest.mark.order(113)
+    def test_deleted_games_are_taken_out_of_stats_and_ratings(self):
+        alice, bob, charlie = self._players("Alice", "Bob", "Charlie")
+        tournament = self._create_tournament("Gone", [alice, bob])
+        self._create_tournament("Kept", [bob, charlie])
+        Game.objects.filter(tournament=tournament).update(home_score=2, away_score=0)
+        call_command("rebuild_player_stats", stdout=StringIO())
+        call_command("recompute_ratings", stdout=StringIO())
+        self.assertNotEqual(Player.objects.get(id=alice.id).rating, DEFAULT_RATING)
+
+        self._delete_tournament(tournament)
+        stats = PlayerStats.objects.get(player_id=alice.id)
+        self.assertEqual((stats.points, stats.wins, stats.games_played), (0, 0, 0))
+        stats = PlayerStats.objects.get(player_id=bob.id)
+        self.assertEqual((stats.points, stats.losses, stats.draws, stats.games_played), (1, 0, 1, 1))
+
+        # Ratings are replayed by the queued job
+        call_command("run_jobs", "--once", stdout=StringIO())
+        self.assertEqual(Player.objects.get(id=alice.id).rating, DEFAULT_RATING)
+        self.assertEqual(Player.objects.get(id=alice.id).rated_games, 0)
+        self.assertEqual(Player.objects.get(id=bob.id).rated_games, 1)
+
+        # Deleting a player takes their games out of their opponents' stats
+        self.client.delete(reverse("player-detail", kwargs={"pk": charlie.id}))
+        stats = PlayerStats.objects.get(player_id=bob.id)
+        self.assertEqual((stats.points, stats.games_played), (0, 0))
+
+    @pytest.mark.order(114)
+    def test_player_delete_thaws_frozen_tournaments(self):
+        alice, bob, charlie, dave = self._players("Alice", "Bob", "Charlie", "Dave")
+        pair = self._create_tournament("Pair", [alice, bob])
+        trio = self._create_tournament("Trio", [alice, charlie, dave])
+        self.assertIsNotNone(pair.frozen_at)
+        self.assertIsNotNone(trio.frozen_at)
+
+        response = self.client.delete(reverse("player-detail", kwargs={"pk": alice.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        # One participant left: back in planning and open for new participants and games
+        pair.refresh_from_db()
+        self.assertIsNone(pair.frozen_at)
+        self.assertFalse(FinalStandings.objects.filter(tournament=pair).exists())
+        response = self.client.get(reverse("tournament-status", kwargs={"tournament_id": pair.id}))
+        self.assertEqual(response.data["status"], "in_planning")
+        self.assertEqual([entry["player_name"] for entry in response.data["leaderboard"]], ["Bob"])
+        participant = self.client.post(
+            reverse("add-participant", kwargs={"tournament_id": pair.id}), {"player_id": charlie.id}, format="json"
+        )
+        self.assertEqual(participant.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(
+            reverse("add-game", kwargs={"tournament_id": pair.id}),
+            {
+                "home_participant": TournamentParticipant.objects.get(tournament=pair, player=bob).id,
+                "away_participant": participant.data["id"],
+                "winner": None,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # The remaining games still complete the tournament: frozen again without Alice
+        trio.refresh_from_db()
+        self.assertIsNotNone(trio.frozen_at)
+        response = self.client.get(reverse("tournament-status", kwargs={"tournament_id": trio.id}))
+        self.assertEqual(response.data["status"], "finished")
+        self.assertEqual(
+            sorted(entry["player_name"] for entry in response.data["leaderboard"]), ["Charlie", "Dave"]
+        )
+
+    @pytest.mark.order(120)
+    def test_event_log_matches_the_games_after_deletions(self):
+        alice, bob, charlie, dave = self._players("Alice", "Bob", "Charlie", "Dave")
+        open_ = Tournament.objects.create(name="Open")
+        participants = [
+            self.client.post(
+                reverse("add-participant", kwargs={"tournament_id": open_.id}), {"player_id": player.id}, format="json"
+            ).data["id"]
+            for player in (alice, bob, charlie)
+        ]
+        for home, away in ((0, 1), (1, 2)):
+            self.client.post(
+                reverse("add-game", kwargs={"tournament_id": open_.id}),
+                {"home_participant": participants[home], "away_participant": participants[away], "winner": None},
+                format="json",
+            )
+        gone = self._create_tournament("Gone", [bob, dave])
+        call_command("rebuild_standings", "--snapshot", stdout=StringIO())
+
+        response = self.client.delete(reverse("player-detail", kwargs={"pk": alice.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(GameEvent.objects.filter(tournament=open_).count(), 1)
+        snapshot = StandingsSnapshot.objects.get(tournament=open_)
+        self.assertEqual(snapshot.standings, [[bob.id, 1, 0, 1, 0, 1], [charlie.id, 1, 0, 1, 0, 1]])
+        call_command("rebuild_standings", "--verify", stdout=StringIO())
+
+        self._delete_tournament(gone)
+        call_command("rebuild_standings", "--verify", stdout=StringIO())
+
+        # The last game of a tournament leaves neither events nor snapshots
+        self.client.delete(reverse("player-detail", kwargs={"pk": charlie.id}))
+        self.assertFalse(GameEvent.objects.exists())
+        self.assertFalse(StandingsSnapshot.objects.exists())
+        call_command("rebuild_standings", "--verify", stdout=StringIO())
+
+    @pytest.mark.order(77)
+    def test_purge_command(self):
+        old = [self._create_tournament(f"Old {i}", self._players(f"P{i}", f"Q{i}")) for i in range(3)]
+        recent = self._create_tournament("Recent", self._players("R", "S"))
+        Tournament.objects.filter(id__in=[t.id for t in old]).update(created_at=timezone.now() - timedelta(days=400))
+
+        out = StringIO()
+        call_command("purge_tournaments", "--days", "365", "--chunk-size", "2", stdout=out)
+
+        self.assertIn("Purged 3 tournaments", out.getvalue())
+        self.assertIn("Deleted 2 tournaments so far", out.getvalue())
+        self.assertEqual(list(Tournament.objects.values_list("id", flat=True)), [recent.id])
+        self.assertEqual(set(Game.objects.values_list("tournament_id", flat=True)), {recent.id})
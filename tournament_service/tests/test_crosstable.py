@@ -0,0 +1,81 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class CrosstableTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.create(name="Crosstable Cup")
+        self.participants = [
+            TournamentParticipant.objects.create(
+                tournament=self.tournament, player=Player.objects.create(name=name)
+            )
+            for name in ("Alice", "Bob", "Charlie")
+        ]
+
+    def _url(self, tournament_id=None):
+        return reverse("tournament-crosstable", kwargs={"tournament_id": tournament_id or self.tournament.id})
+
+    def _add_game(self, home, away, home_score, away_score):
+        return Game.objects.create(
+            tournament=self.tournament,
+            home_participant=self.participants[home],
+            away_participant=self.participants[away],
+            home_score=home_score,
+            away_score=away_score,
+        )
+
+    @pytest.mark.order(37)
+    def test_crosstable_not_found(self):
+        response = self.client.get(self._url(9999))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @pytest.mark.order(38)
+    def test_crosstable_compact_grid(self):
+        self._add_game(0, 1, 2, 0)  # Alice beats Bob
+        self._add_game(2, 1, 1, 1)  # Charlie draws Bob
+
+        response = self.client.get(self._url())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["size"], 3)
+        self.assertEqual(
+            [p["player_name"] for p in response.data["participants"]], ["Alice", "Bob", "Charlie"]
+        )
+        # Row-major: row i holds what participant i scored against each column
+        self.assertEqual(
+            response.data["results"],
+            [
+                None, 2, None,
+                0, None, 1,
+                None, 1, None,
+            ],
+        )
+
+    @pytest.mark.order(39)
+    def test_crosstable_cached_per_revision(self):
+        first = self.client.get(self._url())
+        etag = first["ETag"]
+
+        # Unchanged tournament: conditional request is answered without a body
+        not_modified = self.client.get(self._url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Cached payload is served with a single query (the revision lookup)
+        with self.assertNumQueries(1):
+            self.client.get(self._url())
+
+        # Recording a game bumps the revision and invalidates the cache
+        self._add_game(0, 2, 0, 2)
+        changed = self.client.get(self._url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertGreater(changed.data["revision"], first.data["revision"])
+        self.assertEqual(changed.data["results"][2], 0)
+        self.assertEqual(changed.data["results"][6], 2)
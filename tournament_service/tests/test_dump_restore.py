@@ -0,0 +1,190 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player, PlayerStats
+from tournaments.deletion import delete_players, delete_tournaments
+from tournaments.dumps import dump_state, restore_state
+from tournaments.models import FinalStandings, Game, GameEvent, Tournament, TournamentParticipant
+
+
+class DumpRestoreTests(APITestCase):
+    def _create_tournament(self, name, player_names, games):
+        """Create a tournament through the API and play the first `games` pairings (home wins)."""
+        tournament_id = self.client.post(reverse("tournament-list"), {"name": name}, format="json").data["id"]
+        participants = []
+        for player_name in player_names:
+            player = Player.objects.create(name=player_name)
+            response = self.client.post(
+                reverse("add-participant", kwargs={"tournament_id": tournament_id}),
+                {"player_id": player.id},
+                format="json",
+            )
+            participants.append((response.data["id"], player.id))
+        pairings = [(home, away) for i, home in enumerate(participants) for away in participants[i + 1:]]
+        for home, away in pairings[:games]:
+            response = self.client.post(
+                reverse("add-game", kwargs={"tournament_id": tournament_id}),
+                {"home_participant": home[0], "away_participant": away[0], "winner": home[1]},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return tournament_id
+
+    def _setup_data(self):
+        self._create_tournament("Finished", ["Alice", "Bob", "Charlie"], games=3)
+        self._create_tournament("Running", ["Dave", "Eve", "Frank"], games=1)
+        Tournament.objects.create(name="Empty", tiebreak_order="")
+
+    def _statuses(self, tournament_ids):
+        """Status payloads by tournament name, without the database ids."""
+        statuses = {}
+        for tournament_id in tournament_ids:
+            payload = self.client.get(reverse("tournament-status", kwargs={"tournament_id": tournament_id})).data
+            payload.pop("tournament_id")
+            for entry in payload["leaderboard"]:
+                entry.pop("player_id")
+            statuses[payload["tournament_name"]] = payload
+        return statuses
+
+    def _dump(self):
+        archive = io.BytesIO()
+        manifest = dump_state(archive)
+        archive.seek(0)
+        return archive, manifest
+
+    @pytest.mark.order(81)
+    def test_dump_and_restore_into_empty_database(self):
+        self._setup_data()
+        before = self._statuses(Tournament.objects.values_list("id", flat=True))
+        archive, manifest = self._dump()
+        self.assertEqual(
+            {table["name"]: table["rows"] for table in manifest["tables"]},
+            {"players": 6, "tournaments": 3, "participants": 6, "games": 4, "archived_games": 0, "game_events": 4},
+        )
+
+        delete_tournaments(Tournament.objects.values_list("id", flat=True))
+        delete_players(Player.objects.values_list("id", flat=True))
+        result = restore_state(archive)
+
+        self.assertEqual(result["rows"]["games"], 4)
+        after = self._statuses(Tournament.objects.values_list("id", flat=True))
+        self.assertEqual(after, before)
+        self.assertEqual(Tournament.objects.get(name="Empty").tiebreak_order, "")
+
+        # Derived rows are rebuilt
+        finished = Tournament.objects.get(name="Finished")
+        self.assertIsNotNone(finished.frozen_at)
+        self.assertTrue(FinalStandings.objects.filter(tournament=finished).exists())
+        self.assertEqual(PlayerStats.objects.get(player__name="Alice").wins, 2)
+
+        # New rows get fresh ids after the restored ones
+        running = Tournament.objects.get(name="Running")
+        participants = list(running.participants.order_by("id").values_list("id", flat=True))
+        response = self.client.post(
+            reverse("add-game", kwargs={"tournament_id": running.id}),
+            {"home_participant": participants[0], "away_participant": participants[2], "winner": None},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @pytest.mark.order(82)
+    def test_restore_into_non_empty_database_remaps_ids(self):
+        self._setup_data()
+        before = self._statuses(Tournament.objects.values_list("id", flat=True))
+        existing = {model: set(model.objects.values_list("id", flat=True))
+                    for model in (Player, Tournament, TournamentParticipant, Game, GameEvent)}
+        archive, _ = self._dump()
+
+        restore_state(archive)
+
+        restored = {model: set(model.objects.values_list("id", flat=True)) - ids for model, ids in existing.items()}
+        for model, ids in restored.items():
+            self.assertEqual(len(ids), len(existing[model]), model)
+
+        # Restored rows only reference restored rows
+        participants = TournamentParticipant.objects.filter(id__in=restored[TournamentParticipant])
+        self.assertTrue(set(participants.values_list("player_id", flat=True)) <= restored[Player])
+        self.assertTrue(set(participants.values_list("tournament_id", flat=True)) <= restored[Tournament])
+        for game in Game.objects.filter(id__in=restored[Game]):
+            self.assertIn(game.home_participant_id, restored[TournamentParticipant])
+            self.assertIn(game.away_participant_id, restored[TournamentParticipant])
+        events = GameEvent.objects.filter(id__in=restored[GameEvent])
+        self.assertEqual(set(events.values_list("game_id", flat=True)), restored[Game])
+        self.assertTrue(set(events.values_list("home_player_id", flat=True)) <= restored[Player])
+
+        # The original tournaments are untouched and the copies report the same standings
+        self.assertEqual(self._statuses(existing[Tournament]), before)
+        self.assertEqual(self._statuses(restored[Tournament]), before)
+        self.assertEqual(FinalStandings.objects.count(), 2)
+        self.assertEqual(PlayerStats.objects.filter(player__name="Alice").values_list("wins", flat=True)[1], 2)
+
+    @pytest.mark.order(83)
+    def test_commands_round_trip_and_reject_invalid_archives(self):
+        self._setup_data()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.tar.gz")
+            out = io.StringIO()
+            call_command("dump_state", path, stdout=out)
+            self.assertIn("Dumped 23 rows", out.getvalue())
+
+            out = io.StringIO()
+            call_command("restore_state", path, stdout=out)
+            self.assertIn("Restored 23 rows", out.getvalue())
+            self.assertIn("Ids shifted by", out.getvalue())
+            self.assertEqual(Tournament.objects.count(), 6)
+
+            invalid = os.path.join(directory, "invalid.tar.gz")
+            with open(invalid, "wb") as fileobj:
+                fileobj.write(b"not an archive")
+            with self.assertRaises(CommandError):
+                call_command("restore_state", invalid, stdout=io.StringIO())
+            with self.assertRaises(CommandError):
+                call_command("restore_state", os.path.join(directory, "missing.tar.gz"), stdout=io.StringIO())
+        self.assertEqual(Tournament.objects.count(), 6)
+
+    @pytest.mark.order(119)
+    @unittest.skipUnless(connection.vendor == "postgresql", "COPY is used on PostgreSQL")
+    def test_restore_into_fresh_database_keeps_ids_and_checks_references(self):
+        self._setup_data()
+        before = self._statuses(Tournament.objects.values_list("id", flat=True))
+        ids = {model: set(model.objects.values_list("id", flat=True))
+               for model in (Player, Tournament, TournamentParticipant, Game, GameEvent)}
+        archive, _ = self._dump()
+
+        tables = ", ".join(connection.ops.quote_name(model._meta.db_table) for model in ids)
+        with connection.cursor() as cursor:
+            # Checks deferred by the test's transaction would block the TRUNCATE
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        result = restore_state(archive)
+
+        self.assertEqual(set(result["offsets"].values()), {0})
+        self.assertEqual({model: set(model.objects.values_list("id", flat=True)) for model in ids}, ids)
+        self.assertEqual(self._statuses(ids[Tournament]), before)
+
+        # Foreign keys are checked once the rows are in
+        archive.seek(0)
+        broken = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="r|gz") as source, tarfile.open(fileobj=broken, mode="w|gz") as tar:
+            for member in source:
+                data = source.extractfile(member).read()
+                if member.name == "players.csv":
+                    data = data.splitlines(keepends=True)[0]
+                    member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+        broken.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        with self.assertRaises(IntegrityError):
+            restore_state(broken)
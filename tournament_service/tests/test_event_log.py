@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game, GameEvent, StandingsSnapshot
+from tournaments.replay import rebuild_standings, take_snapshot
+from players.models import Player
+
+
+class GameEventLogTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Log Cup")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=player)
+            for player in self.players
+        ]
+
+    def _post_game(self, home, away, winner):
+        url = reverse("add-game", kwargs={"tournament_id": self.tournament.id})
+        payload = {
+            "home_participant": self.participants[home].id,
+            "away_participant": self.participants[away].id,
+            "winner": None if winner is None else self.players[winner].id,
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response
+
+    def _rebuild(self, *args):
+        out = StringIO()
+        call_command("rebuild_standings", *args, stdout=out)
+        return out.getvalue()
+
+    @pytest.mark.order(40)
+    def test_recording_a_game_appends_an_event(self):
+        response = self._post_game(0, 1, 0)
+
+        event = GameEvent.objects.get()
+        self.assertEqual(event.game_id, response.data["id"])
+        self.assertEqual(event.tournament_id, self.tournament.id)
+        self.assertEqual((event.home_player_id, event.away_player_id), (self.players[0].id, self.players[1].id))
+        self.assertEqual((event.home_score, event.away_score), (2, 0))
+
+    @pytest.mark.order(41)
+    def test_rebuild_from_events(self):
+        self._post_game(0, 1, 0)  # Alice beats Bob
+        self._post_game(1, 2, None)  # Bob draws Charlie
+
+        standings, last_event_id = rebuild_standings(self.tournament.id)
+
+        alice, bob, charlie = (p.id for p in self.players)
+        self.assertEqual(standings[alice], [2, 1, 0, 0, 1])
+        self.assertEqual(standings[bob], [1, 0, 1, 1, 2])
+        self.assertEqual(standings[charlie], [1, 0, 1, 0, 1])
+        self.assertEqual(last_event_id, GameEvent.objects.latest("id").id)
+
+    @pytest.mark.order(42)
+    def test_rebuild_starts_from_latest_snapshot(self):
+        """
+        Only events after the snapshot are replayed on top of it.
+        """
+        self._post_game(0, 1, 0)
+        standings, last_event_id = rebuild_standings(self.tournament.id)
+        take_snapshot(self.tournament.id, standings, last_event_id)
+
+        self._post_game(2, 0, 2)  # Charlie beats Alice
+
+        alice, bob, charlie = (p.id for p in self.players)
+        with self.assertNumQueries(2):
+            standings, _ = rebuild_standings(self.tournament.id)
+        self.assertEqual(standings[alice], [2, 1, 0, 1, 2])
+        self.assertEqual(standings[bob], [0, 0, 0, 1, 1])
+        self.assertEqual(standings[charlie], [2, 1, 0, 0, 1])
+
+    @pytest.mark.order(43)
+    def test_rebuild_command_snapshots_and_verifies(self):
+        other = Tournament.objects.create(name="Other Cup")
+        dave = TournamentParticipant.objects.create(tournament=other, player=Player.objects.create(name="Dave"))
+        eve = TournamentParticipant.objects.create(tournament=other, player=Player.objects.create(name="Eve"))
+        self.client.post(
+            reverse("add-game", kwargs={"tournament_id": other.id}),
+            {"home_participant": dave.id, "away_participant": eve.id, "winner": None},
+            format="json",
+        )
+        self._post_game(0, 1, 1)
+
+        output = self._rebuild("--snapshot", "--verify")
+        self.assertIn("Rebuilt standings of 2 tournaments", output)
+        self.assertEqual(StandingsSnapshot.objects.count(), 2)
+
+        # Nothing new since the snapshots: no further snapshots are written
+        self._rebuild("--snapshot")
+        self.assertEqual(StandingsSnapshot.objects.count(), 2)
+
+        # A game removed behind the log's back is reported
+        Game.objects.filter(tournament=other).delete()
+        with self.assertRaises(CommandError):
+            self._rebuild("--verify")
@@ -0,0 +1,199 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments import services
+from tournaments.models import Tournament, TournamentParticipant, Game, ArchivedGame, FinalStandings
+from players.models import Player, PlayerStats
+
+
+class FinishedTournamentFreezingTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Freeze Cup")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+        self.participant_ids = [self._add_participant(player).data["id"] for player in self.players]
+        self.status_url = reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})
+
+    def _add_participant(self, player):
+        return self.client.post(
+            reverse("add-participant", kwargs={"tournament_id": self.tournament.id}),
+            {"player_id": player.id},
+            format="json",
+        )
+
+    def _add_game(self, home, away, winner):
+        return self.client.post(
+            reverse("add-game", kwargs={"tournament_id": self.tournament.id}),
+            {
+                "home_participant": self.participant_ids[home],
+                "away_participant": self.participant_ids[away],
+                "winner": None if winner is None else self.players[winner].id,
+            },
+            format="json",
+        )
+
+    def _finish(self):
+        self._add_game(0, 1, 0)  # Alice beats Bob
+        self._add_game(0, 2, None)  # Alice draws Charlie
+        self._add_game(1, 2, 2)  # Charlie beats Bob
+
+    @pytest.mark.order(66)
+    def test_last_game_freezes_the_standings(self):
+        self._add_game(0, 1, 0)
+        self.tournament.refresh_from_db()
+        self.assertIsNone(self.tournament.frozen_at)
+        live = self.client.get(self.status_url).data
+
+        self._add_game(0, 2, None)
+        self._add_game(1, 2, 2)
+
+        self.tournament.refresh_from_db()
+        self.assertIsNotNone(self.tournament.frozen_at)
+        final = FinalStandings.objects.get(tournament=self.tournament)
+        self.assertEqual(final.status["status"], "finished")
+        self.assertEqual(live["status"], "started")
+
+        # Served from the snapshot, plus one query for the current player names
+        with self.assertNumQueries(2):
+            response = self.client.get(self.status_url, {"top": 2, "fields": "rank,player_name,points"})
+        self.assertEqual(
+            response.data["leaderboard"],
+            [{"rank": 1, "player_name": "Alice", "points": 3}, {"rank": 2, "player_name": "Charlie", "points": 3}],
+        )
+        self.assertEqual(response.data["games_played"], 3)
+
+    @pytest.mark.order(67)
+    def test_writes_to_a_frozen_tournament_are_rejected(self):
+        self._finish()
+
+        late = Player.objects.create(name="Dave")
+        response = self._add_participant(late)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("frozen", response.data["detail"])
+
+        response = self._add_game(1, 0, 1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("frozen", response.data["detail"])
+
+        detail_url = reverse("tournament-detail", kwargs={"pk": self.tournament.id})
+        response = self.client.patch(detail_url, {"tiebreak_order": "wins"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Renaming does not touch the standings and is still allowed
+        response = self.client.patch(detail_url, {"name": "Freeze Cup 2025"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.status_url).data["tournament_name"], "Freeze Cup 2025")
+
+    @pytest.mark.order(121)
+    def test_enrolment_rechecks_the_tournament_under_the_lock(self):
+        self._add_game(0, 1, 0)
+        self._add_game(0, 2, None)
+        enroll = services.enroll_participant
+
+        def final_game_first(tournament, player):
+            # The view has found the tournament open; the last game freezes it now
+            self._add_game(1, 2, 2)
+            return enroll(tournament, player)
+
+        with mock.patch("tournaments.views.enroll_participant", side_effect=final_game_first):
+            response = self._add_participant(Player.objects.create(name="Dave"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("frozen", response.data["detail"])
+        self.tournament.refresh_from_db()
+        self.assertIsNotNone(self.tournament.frozen_at)
+        self.assertEqual(self.tournament.participants_count, 3)
+        payload = self.client.get(self.status_url).data
+        self.assertEqual((payload["status"], len(payload["leaderboard"])), ("finished", 3))
+
+        # Concurrent enrolments cannot exceed the maximum either
+        open_ = Tournament.objects.create(name="Open Cup")
+        for player in (*self.players, Player.objects.create(name="Eve")):
+            services.enroll_participant(open_, player)
+        late = Player.objects.create(name="Frank")
+
+        def fifth_joins_first(tournament, player):
+            enroll(tournament, Player.objects.create(name="Grace"))
+            return enroll(tournament, player)
+
+        url = reverse("add-participant", kwargs={"tournament_id": open_.id})
+        with mock.patch("tournaments.views.enroll_participant", side_effect=fifth_joins_first):
+            response = self.client.post(url, {"player_id": late.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("maximum of 5", response.data["detail"])
+        self.assertEqual(TournamentParticipant.objects.filter(tournament=open_).count(), 5)
+
+    @pytest.mark.order(68)
+    def test_frozen_standings_ignore_later_row_changes(self):
+        self._finish()
+        frozen = self.client.get(self.status_url).data
+
+        Game.objects.filter(tournament=self.tournament).delete()
+
+        self.assertEqual(self.client.get(self.status_url).data, frozen)
+
+    @pytest.mark.order(125)
+    def test_frozen_standings_show_current_names(self):
+        self._finish()
+        self.players[0].name = "Alicia"
+        self.players[0].save()
+        self.tournament.name = "Renamed Cup"
+        self.tournament.save()
+
+        payload = self.client.get(self.status_url, {"top": 1}).data
+        self.assertEqual(payload["tournament_name"], "Renamed Cup")
+        self.assertEqual(payload["leaderboard"][0]["player_name"], "Alicia")
+        batch_url = reverse("tournament-batch-status")
+        payload = self.client.get(batch_url, {"ids": str(self.tournament.id)}).data["results"][self.tournament.id]
+        self.assertEqual([entry["player_name"] for entry in payload["leaderboard"]], ["Alicia", "Charlie", "Bob"])
+        # The stored snapshot is left as it was
+        final = FinalStandings.objects.get(tournament=self.tournament)
+        self.assertEqual(final.status["leaderboard"][0]["player_name"], "Alice")
+
+    @pytest.mark.order(69)
+    def test_archive_command(self):
+        self._finish()
+        crosstable_url = reverse("tournament-crosstable", kwargs={"tournament_id": self.tournament.id})
+        crosstable = self.client.get(crosstable_url).data
+        ratings = dict(Player.objects.values_list("id", "rating"))
+        stats = list(PlayerStats.objects.order_by("player_id").values_list("player_id", "points", "games_played"))
+
+        # A tournament finished behind the API's back is frozen first
+        other = Tournament.objects.create(name="Imported Cup")
+        pa = TournamentParticipant.objects.create(tournament=other, player=self.players[0])
+        pb = TournamentParticipant.objects.create(tournament=other, player=self.players[1])
+        Game.objects.create(tournament=other, home_participant=pa, away_participant=pb, home_score=1, away_score=1)
+        call_command("repair_tournament_counters", stdout=StringIO())
+
+        out = StringIO()
+        call_command("archive_finished_tournaments", stdout=out)
+        self.assertIn("Froze 1 finished tournaments", out.getvalue())
+        self.assertIn("Archived 0 games", out.getvalue())
+
+        Tournament.objects.update(frozen_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        call_command("archive_finished_tournaments", stdout=out)
+        self.assertIn("Archived 4 games of 2 tournaments", out.getvalue())
+        self.assertFalse(Game.objects.exists())
+        self.assertEqual(ArchivedGame.objects.filter(tournament=self.tournament).count(), 3)
+
+        # Everything derived from the games still sees the archived ones
+        self.assertEqual(self.client.get(crosstable_url).data, crosstable)
+        call_command("repair_tournament_counters", "--check", stdout=StringIO())
+
+        # Drop the imported game, which the incremental figures never saw
+        ArchivedGame.objects.filter(tournament=other).delete()
+        call_command("recompute_ratings", stdout=StringIO())
+        call_command("rebuild_player_stats", stdout=StringIO())
+        for player_id, rating in Player.objects.values_list("id", "rating"):
+            self.assertAlmostEqual(rating, ratings[player_id])
+        self.assertEqual(
+            list(PlayerStats.objects.order_by("player_id").values_list("player_id", "points", "games_played")),
+            stats,
+        )
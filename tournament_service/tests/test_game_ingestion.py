@@ -0,0 +1,216 @@
+import threading
+import unittest
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player, PlayerStats
+from players.ratings import recompute_all
+from players.stats import rebuild_all
+from tournaments import services
+from tournaments.ingest import ingest_batch
+from tournaments.models import (
+    Game,
+    GameEvent,
+    QueuedGameResult,
+    QueuedGameStatus,
+    Tournament,
+    TournamentParticipant,
+)
+
+ASYNC = {"Prefer": "respond-async"}
+
+
+class GameIngestionTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Finals")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=player) for player in self.players
+        ]
+        self.url = reverse("add-game", kwargs={"tournament_id": self.tournament.id})
+
+    def _queue(self, home, away, winner):
+        return self.client.post(
+            self.url,
+            {
+                "home_participant": self.participants[home].id,
+                "away_participant": self.participants[away].id,
+                "winner": None if winner is None else self.players[winner].id,
+            },
+            format="json",
+            headers=ASYNC,
+        )
+
+    def _ingest(self):
+        out = StringIO()
+        call_command("ingest_game_results", "--once", stdout=out)
+        return out.getvalue()
+
+    @pytest.mark.order(98)
+    def test_queued_result_is_acknowledged_with_a_status_url(self):
+        response = self._queue(0, 1, 0)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], QueuedGameStatus.QUEUED)
+        self.assertEqual(response["Location"], response.data["status_url"])
+        self.assertFalse(Game.objects.exists())
+
+        queued = self.client.get(response.data["status_url"])
+        self.assertEqual(queued.status_code, status.HTTP_200_OK)
+        self.assertEqual(queued.data["status"], QueuedGameStatus.QUEUED)
+        self.assertIsNone(queued.data["game_id"])
+
+        # Results that cannot be valid are refused right away
+        response = self.client.post(
+            self.url,
+            {"home_participant": self.participants[0].id, "away_participant": 0, "winner": None},
+            format="json",
+            headers=ASYNC,
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self._queue(0, 1, 2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Winner must be one of the participants", response.data["detail"])
+        self.assertEqual(QueuedGameResult.objects.count(), 1)
+
+        other = Tournament.objects.create(name="Other")
+        missing = reverse("queued-game", kwargs={"tournament_id": other.id, "queued_id": queued.data["id"]})
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+    @pytest.mark.order(99)
+    def test_worker_records_the_queue_and_rejects_invalid_results(self):
+        first = self._queue(0, 1, 0).data
+        duplicate = self._queue(1, 0, None).data
+        second = self._queue(0, 2, None).data
+
+        output = self._ingest()
+        self.assertIn("Recorded 2 and rejected 1 results.", output)
+
+        first = self.client.get(first["status_url"]).data
+        self.assertEqual(first["status"], QueuedGameStatus.RECORDED)
+        game = Game.objects.get(id=first["game_id"])
+        self.assertEqual((game.home_score, game.away_score), (2, 0))
+        self.assertEqual(self.client.get(second["status_url"]).data["status"], QueuedGameStatus.RECORDED)
+
+        duplicate = self.client.get(duplicate["status_url"]).data
+        self.assertEqual(duplicate["status"], QueuedGameStatus.REJECTED)
+        self.assertIn("already exists", duplicate["detail"])
+        self.assertIsNotNone(duplicate["processed_at"])
+
+        # Recorded like a synchronous result
+        self.assertEqual(GameEvent.objects.filter(tournament=self.tournament).count(), 2)
+        self.tournament.refresh_from_db()
+        self.assertEqual((self.tournament.games_played, self.tournament.revision), (2, 4))
+        ratings = dict(Player.objects.values_list("id", "rating"))
+        stats = list(PlayerStats.objects.order_by("player_id").values_list("player_id", "points", "games_played"))
+        recompute_all()
+        rebuild_all()
+        for player_id, rating in Player.objects.values_list("id", "rating"):
+            self.assertAlmostEqual(ratings[player_id], rating)
+        self.assertEqual(
+            list(PlayerStats.objects.order_by("player_id").values_list("player_id", "points", "games_played")), stats
+        )
+        response = self.client.get(reverse("tournament-status", kwargs={"tournament_id": self.tournament.id}))
+        self.assertEqual(response.data["games_played"], 2)
+        self.assertEqual(response.data["leaderboard"][0]["player_name"], "Alice")
+
+    @pytest.mark.order(100)
+    def test_results_after_the_last_game_are_rejected(self):
+        for home, away in ((0, 1), (0, 2), (1, 2)):
+            self._queue(home, away, None)
+        late = self._queue(2, 1, None).data
+
+        counts = ingest_batch(10)
+        self.assertEqual(counts, {QueuedGameStatus.RECORDED: 3, QueuedGameStatus.REJECTED: 1})
+        self.tournament.refresh_from_db()
+        self.assertIsNotNone(self.tournament.frozen_at)
+        self.assertIn("frozen", self.client.get(late["status_url"]).data["detail"])
+
+        # Queueing for a frozen tournament is refused as well
+        self.assertEqual(self._queue(2, 1, None).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ingest_batch(10), {QueuedGameStatus.RECORDED: 0, QueuedGameStatus.REJECTED: 0})
+
+    @pytest.mark.order(117)
+    def test_pairing_recorded_by_the_worker_in_the_meantime_is_rejected(self):
+        self._queue(0, 1, 0)
+        checked = services.validate_game_result
+
+        def worker_records_first(*args, **kwargs):
+            result = checked(*args, **kwargs)
+            self.assertEqual(ingest_batch(10)[QueuedGameStatus.RECORDED], 1)
+            return result
+
+        payload = {
+            "home_participant": self.participants[1].id,
+            "away_participant": self.participants[0].id,
+            "winner": None,
+        }
+        with mock.patch("tournaments.views.validate_game_result", side_effect=worker_records_first):
+            response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already exists", response.data["detail"])
+        self.assertEqual(Game.objects.count(), 1)
+        self.assertEqual(GameEvent.objects.count(), 1)
+        self.assertEqual(PlayerStats.objects.get(player=self.players[1]).games_played, 1)
+
+        # Nor is anything recorded for a tournament frozen in the meantime
+        Tournament.objects.filter(pk=self.tournament.pk).update(frozen_at=timezone.now())
+        game = Game(
+            tournament=self.tournament,
+            home_participant=self.participants[1],
+            away_participant=self.participants[2],
+            home_score=1,
+            away_score=1,
+        )
+        with self.assertRaisesMessage(services.GameRejected, "frozen"):
+            services.record_games([game])
+        self.assertEqual(Game.objects.count(), 1)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "SKIP LOCKED is tested on PostgreSQL")
+class ConcurrentIngestionTests(TransactionTestCase):
+    @pytest.mark.order(101)
+    def test_workers_skip_results_claimed_by_others(self):
+        tournament = Tournament.objects.create(name="Finals")
+        players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+        participants = [TournamentParticipant.objects.create(tournament=tournament, player=p) for p in players]
+        queued = [
+            QueuedGameResult.objects.create(
+                tournament=tournament,
+                home_participant_id=participants[home].id,
+                away_participant_id=participants[away].id,
+                winner=None,
+            )
+            for home, away in ((0, 1), (0, 2), (1, 2))
+        ]
+
+        claimed, release = threading.Event(), threading.Event()
+
+        def other_worker():
+            # Holds the oldest result like a worker in the middle of its batch
+            with transaction.atomic():
+                list(QueuedGameResult.objects.select_for_update().filter(id=queued[0].id))
+                claimed.set()
+                release.wait(5)
+            connection.close()
+
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        try:
+            self.assertTrue(claimed.wait(5))
+            self.assertEqual(ingest_batch(10), {QueuedGameStatus.RECORDED: 2, QueuedGameStatus.REJECTED: 0})
+        finally:
+            release.set()
+            thread.join()
+
+        statuses = dict(QueuedGameResult.objects.values_list("id", "status"))
+        self.assertEqual(statuses[queued[0].id], QueuedGameStatus.QUEUED)
+        self.assertEqual(ingest_batch(10)[QueuedGameStatus.RECORDED], 1)
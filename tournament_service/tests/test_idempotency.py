@@ -0,0 +1,191 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from idempotency.decorators import request_fingerprint
+from idempotency.models import IdempotencyKey
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Retry Cup")
+        # Three players, so that a single game does not finish the tournament
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=player)
+            for player in self.players
+        ]
+        self.games_url = reverse("add-game", kwargs={"tournament_id": self.tournament.id})
+
+    def _post_game(self, key, winner=None, home=0, away=1):
+        payload = {
+            "home_participant": self.participants[home].id,
+            "away_participant": self.participants[away].id,
+            "winner": winner,
+        }
+        headers = {"Idempotency-Key": key} if key is not None else {}
+        return self.client.post(self.games_url, payload, format="json", headers=headers)
+
+    @pytest.mark.order(57)
+    def test_retry_is_answered_from_the_store(self):
+        first = self._post_game("game-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", first)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self._post_game("game-1")
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Game.objects.count(), 1)
+        self.assertFalse([q for q in queries if "tournaments_" in q["sql"] or "players_" in q["sql"]])
+
+        # Without a key the request runs the full validation chain again
+        self.assertEqual(self._post_game(None).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @pytest.mark.order(58)
+    def test_key_reused_with_different_payload(self):
+        self._post_game("game-2")
+        response = self._post_game("game-2", winner=self.players[0].id)
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Game.objects.get().home_score, 1)
+
+    @pytest.mark.order(59)
+    def test_client_errors_and_viewset_creates_are_stored(self):
+        first = self._post_game("self-play", home=0, away=0)
+        retry = self._post_game("self-play", home=0, away=0)
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.json(), first.json())
+
+        # Serializer errors raised as exceptions are stored as well
+        invalid = self._post_game("invalid", winner="nobody")
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._post_game("invalid", winner="nobody").json(), invalid.json())
+
+        url = reverse("player-list")
+        responses = [
+            self.client.post(url, {"name": "Dave"}, format="json", headers={"Idempotency-Key": "new-player"})
+            for _ in range(2)
+        ]
+        self.assertEqual([r.status_code for r in responses], [201, 201])
+        self.assertEqual(responses[0].data["id"], responses[1].data["id"])
+        self.assertEqual(Player.objects.filter(name="Dave").count(), 1)
+
+        # Keys are scoped per endpoint
+        response = self.client.post(
+            reverse("tournament-list"), {"name": "Dave"}, format="json", headers={"Idempotency-Key": "new-player"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def _in_progress(self, key):
+        payload = {
+            "home_participant": self.participants[0].id,
+            "away_participant": self.participants[1].id,
+            "winner": None,
+        }
+        request = mock.Mock(data=payload)
+        return IdempotencyKey.objects.create(
+            key=key,
+            scope=f"POST {self.games_url}",
+            request_fingerprint=request_fingerprint(request),
+            expires_at=timezone.now() + timedelta(hours=1),
+            locked_until=timezone.now() + timedelta(minutes=1),
+        )
+
+    @pytest.mark.order(60)
+    def test_concurrent_duplicate_waits_for_the_first_request(self):
+        record = self._in_progress("game-3")
+
+        def first_request_finishes(seconds):
+            record.status_code = 201
+            record.response_body = {"id": 123}
+            record.save()
+
+        with mock.patch("idempotency.decorators.time.sleep", side_effect=first_request_finishes) as sleep:
+            response = self._post_game("game-3")
+
+        sleep.assert_called_once()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), {"id": 123})
+        self.assertFalse(Game.objects.exists())
+
+        self._in_progress("game-4")
+        with override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0):
+            response = self._post_game("game-4")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Game.objects.exists())
+
+    @pytest.mark.order(61)
+    def test_expired_keys(self):
+        self._post_game("game-5")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+        self.assertIn("Deleted 1 expired", out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        # An expired key executes the request again
+        Game.objects.all().delete()
+        self._post_game("game-5")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        Game.objects.all().delete()
+        response = self._post_game("game-5")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Game.objects.count(), 1)
+
+    @pytest.mark.order(115)
+    def test_retry_takes_over_a_key_whose_lease_expired(self):
+        # The request holding the key died without releasing it
+        record = self._in_progress("game-6")
+        IdempotencyKey.objects.filter(pk=record.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        with mock.patch("idempotency.decorators.time.sleep") as sleep:
+            response = self._post_game("game-6")
+        sleep.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Game.objects.count(), 1)
+
+        record.refresh_from_db()
+        self.assertEqual(record.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(record.locked_until)
+        self.assertEqual(self._post_game("game-6")["Idempotent-Replayed"], "true")
+
+        # A late result of the dead request does not overwrite the stored one
+        late = IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True)
+        self.assertEqual(late.update(status_code=500), 0)
+
+    @pytest.mark.order(116)
+    def test_replay_keeps_the_response_headers(self):
+        payload = {
+            "home_participant": self.participants[0].id,
+            "away_participant": self.participants[1].id,
+            "winner": None,
+        }
+        headers = {"Idempotency-Key": "queued-game", "Prefer": "respond-async"}
+        first = self.client.post(self.games_url, payload, format="json", headers=headers)
+        retry = self.client.post(self.games_url, payload, format="json", headers=headers)
+
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry["Location"], first["Location"])
+        self.assertEqual(retry.json(), first.json())
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jobs.models import Job, JobStatus
+from jobs.registry import enqueue
+from jobs.worker import Worker, claim, requeue_stale, retry_delay, run
+from players.models import Player
+from tournaments.models import Tournament, TournamentParticipant
+from tournaments.services import record_game
+
+
+class JobTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("job-list")
+
+    def _run_jobs(self):
+        out = StringIO()
+        call_command("run_jobs", "--once", stdout=out)
+        return out.getvalue()
+
+    def _make_due(self, job):
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+
+    @pytest.mark.order(102)
+    def test_jobs_are_queued_and_listed(self):
+        response = self.client.post(self.url, {"kind": "rebuild_standings", "params": {"verify": True}}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], JobStatus.QUEUED)
+        self.assertEqual(response["Location"], response.data["status_url"])
+        self.assertEqual(self.client.get(response.data["status_url"]).data["params"], {"verify": True})
+
+        response = self.client.post(self.url, {"kind": "reticulate_splines"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Unknown job kind", response.data["detail"])
+        response = self.client.post(self.url, {"kind": "purge_tournaments", "params": {"weeks": 2}}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Invalid parameters for purge_tournaments", response.data["detail"])
+        response = self.client.post(self.url, {"kind": "purge_tournaments", "params": [30]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.post(self.url, {"kind": "recompute_ratings"}, format="json")
+        self.assertEqual(Job.objects.count(), 2)
+        kinds = [job["kind"] for job in self.client.get(self.url).data]
+        self.assertEqual(kinds, ["recompute_ratings", "rebuild_standings"])
+        self.assertEqual(len(self.client.get(self.url, {"kind": "recompute_ratings"}).data), 1)
+        self.assertEqual(self.client.get(self.url, {"status": JobStatus.FAILED}).data, [])
+        self.assertEqual(self.client.get(self.url, {"status": "lost"}).status_code, status.HTTP_400_BAD_REQUEST)
+        missing = reverse("job-detail", kwargs={"job_id": 0})
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+    @pytest.mark.order(103)
+    def test_worker_runs_due_jobs(self):
+        alice, bob = Player.objects.create(name="Alice"), Player.objects.create(name="Bob")
+        tournament = Tournament.objects.create(name="Finals")
+        home, away = (TournamentParticipant.objects.create(tournament=tournament, player=p) for p in (alice, bob))
+        record_game(tournament, home, away, 2, 0)
+        Player.objects.update(rating=1000, rated_games=0)
+
+        ratings = enqueue("recompute_ratings")
+        standings = enqueue("rebuild_standings", {"tournament": tournament.id, "verify": True})
+        later = enqueue("recompute_ratings", run_after=timezone.now() + timedelta(hours=1))
+
+        self.assertIn("Jobs succeeded: 2, retried: 0, failed: 0.", self._run_jobs())
+        ratings.refresh_from_db()
+        self.assertEqual((ratings.status, ratings.attempts, ratings.result), (JobStatus.SUCCEEDED, 1, {"games": 1}))
+        self.assertIsNotNone(ratings.finished_at)
+        alice.refresh_from_db()
+        self.assertGreater(alice.rating, 1000)
+
+        standings = self.client.get(reverse("job-detail", kwargs={"job_id": standings.id})).data
+        self.assertEqual(standings["status"], JobStatus.SUCCEEDED)
+        self.assertIn("Rebuilt standings of 1 tournaments", standings["result"]["output"][-1])
+        self.assertEqual(Job.objects.get(id=later.id).status, JobStatus.QUEUED)
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(JOB_EXPORT_DIR=directory):
+            export = enqueue("export_state")
+            self._run_jobs()
+            export.refresh_from_db()
+            self.assertEqual(export.status, JobStatus.SUCCEEDED)
+            self.assertTrue(os.path.exists(export.result["path"]))
+            rows = {table["name"]: table["rows"] for table in export.result["tables"]}
+            self.assertEqual(rows["games"], 1)
+
+    @pytest.mark.order(104)
+    def test_failed_attempts_are_retried_with_backoff(self):
+        job = enqueue("rebuild_standings", {"tournament": 0})
+        self.assertEqual(job.max_attempts, 3)
+
+        self.assertIn("retried: 1", self._run_jobs())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+        self.assertIn("Tournament 0 does not exist.", job.error)
+        self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), retry_delay(1), delta=5)
+        # Not due yet
+        self.assertIn("retried: 0", self._run_jobs())
+
+        self._make_due(job)
+        self._run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertGreater(job.run_after - job.started_at, timedelta(seconds=retry_delay(1)))
+
+        self._make_due(job)
+        self.assertIn("failed: 1", self._run_jobs())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+
+    @pytest.mark.order(105)
+    @override_settings(JOB_STALE_AFTER=60)
+    def test_jobs_of_dead_workers_are_taken_back(self):
+        first, last = enqueue("recompute_ratings"), enqueue("rebuild_player_stats")
+        dead = claim("dead-worker")
+        claim("dead-worker")
+        stale = timezone.now() - timedelta(seconds=120)
+        Job.objects.filter(id=first.id).update(heartbeat_at=stale)
+        Job.objects.filter(id=last.id).update(heartbeat_at=stale, max_attempts=1)
+        running = enqueue("recompute_ratings")
+        claim("live-worker")
+
+        self.assertEqual(requeue_stale(), 2)
+        statuses = dict(Job.objects.values_list("id", "status"))
+        self.assertEqual(statuses, {first.id: JobStatus.QUEUED, last.id: JobStatus.FAILED,
+                                    running.id: JobStatus.RUNNING})
+        self.assertIn("stopped responding", Job.objects.get(id=last.id).error)
+
+        self.assertIn("succeeded: 1", self._run_jobs())
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (JobStatus.SUCCEEDED, 2))
+
+        # The dead worker's late outcome does not overwrite the new attempt
+        self.assertEqual(dead.id, first.id)
+        run(dead)
+        self.assertEqual(Job.objects.get(id=first.id).finished_at, first.finished_at)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "SKIP LOCKED is tested on PostgreSQL")
+class ConcurrentJobTests(TransactionTestCase):
+    @pytest.mark.order(106)
+    def test_workers_share_the_queue(self):
+        jobs = [enqueue("rebuild_player_stats") for _ in range(4)]
+
+        claimed, release = threading.Event(), threading.Event()
+
+        def other_worker():
+            # Holds the oldest job like a worker in the middle of claiming it
+            with transaction.atomic():
+                list(Job.objects.select_for_update().filter(id=jobs[0].id))
+                claimed.set()
+                release.wait(5)
+            connection.close()
+
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        try:
+            self.assertTrue(claimed.wait(5))
+            self.assertEqual(claim("worker").id, jobs[1].id)
+        finally:
+            release.set()
+            thread.join()
+        Job.objects.filter(id=jobs[1].id).update(status=JobStatus.QUEUED)
+
+        worker = Worker(concurrency=2, poll_interval=0.05, keep_days=7)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            deadline = time.monotonic() + 10
+            while Job.objects.exclude(status=JobStatus.SUCCEEDED).exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            worker.stop()
+            thread.join()
+        self.assertEqual(set(Job.objects.values_list("status", flat=True)), {JobStatus.SUCCEEDED})
+        attempts = dict(Job.objects.values_list("id", "attempts"))
+        self.assertEqual([attempts[job.id] for job in jobs], [1, 2, 1, 1])
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.live import LeaderboardHub, load_leaderboard
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+def parse_event(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class LiveLeaderboardTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Live Cup")
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=Player.objects.create(name=name))
+            for name in ("Alice", "Bob")
+        ]
+        self.loads = 0
+
+        def counting_loader(tournament_id):
+            self.loads += 1
+            return load_leaderboard(tournament_id)
+
+        self.hub = LeaderboardHub(loader=counting_loader)
+
+    def _add_game(self):
+        Game.objects.create(
+            tournament=self.tournament,
+            home_participant=self.participants[0],
+            away_participant=self.participants[1],
+            home_score=0,
+            away_score=2,
+        )
+
+    @pytest.mark.order(44)
+    async def test_full_leaderboard_then_diff(self):
+        stream = self.hub.subscribe(self.tournament.id)
+
+        event, data = parse_event(await anext(stream))
+        self.assertEqual(event, "leaderboard")
+        self.assertEqual(data["status"], "in_planning")
+        self.assertEqual(len(data["leaderboard"]), 2)
+
+        await sync_to_async(self._add_game)()
+        self.hub.publish(self.tournament.id)
+
+        event, data = parse_event(await asyncio.wait_for(anext(stream), timeout=5))
+        self.assertEqual(event, "diff")
+        self.assertEqual(data["status"], "finished")
+        self.assertEqual(data["order"], [self.participants[1].player_id, self.participants[0].player_id])
+        self.assertEqual({e["player_name"] for e in data["changed"]}, {"Alice", "Bob"})
+        await stream.aclose()
+
+    @pytest.mark.order(45)
+    async def test_one_computation_fans_out_to_all_clients(self):
+        streams = [self.hub.subscribe(self.tournament.id) for _ in range(5)]
+        for stream in streams:
+            event, _ = parse_event(await anext(stream))
+            self.assertEqual(event, "leaderboard")
+        self.assertEqual(self.loads, 1)
+
+        await sync_to_async(self._add_game)()
+        self.hub.publish(self.tournament.id)
+        for stream in streams:
+            event, _ = parse_event(await asyncio.wait_for(anext(stream), timeout=5))
+            self.assertEqual(event, "diff")
+        self.assertEqual(self.loads, 2)
+
+        for stream in streams:
+            await stream.aclose()
+
+    @pytest.mark.order(46)
+    def test_publish_without_subscribers_is_free(self):
+        with self.assertNumQueries(0):
+            self.hub.publish(self.tournament.id)
+        self.assertEqual(self.loads, 0)
+
+    @pytest.mark.order(47)
+    def test_stream_endpoint(self):
+        response = self.client.get(reverse("tournament-stream", kwargs={"tournament_id": 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(reverse("tournament-stream", kwargs={"tournament_id": self.tournament.id}))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @pytest.mark.order(48)
+    async def test_stream_endpoint_sends_leaderboard(self):
+        url = reverse("tournament-stream", kwargs={"tournament_id": self.tournament.id})
+        response = await self.async_client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = response.streaming_content
+        event, data = parse_event((await anext(content)).decode())
+        self.assertEqual(event, "leaderboard")
+        self.assertEqual(data["tournament_id"], self.tournament.id)
+        await content.aclose()
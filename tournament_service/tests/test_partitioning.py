@@ -0,0 +1,72 @@
+import unittest
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from tournaments.partitioning import is_partitioned, partition_count
+from players.models import Player
+
+
+class GamePartitioningTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Partition Cup")
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=Player.objects.create(name=name))
+            for name in ("Alice", "Bob", "Charlie")
+        ]
+
+    def _post_game(self, home, away):
+        return self.client.post(
+            reverse("add-game", kwargs={"tournament_id": self.tournament.id}),
+            {"home_participant": self.participants[home].id, "away_participant": self.participants[away].id,
+             "winner": None},
+            format="json",
+        )
+
+    @pytest.mark.order(70)
+    @unittest.skipUnless(connection.vendor == "postgresql", "Partitioning requires PostgreSQL")
+    def test_models_work_on_a_partitioned_table(self):
+        first_id = self._post_game(0, 1).data["id"]
+
+        call_command("partition_games", "--partitions", "4", stdout=StringIO())
+        self.assertTrue(is_partitioned())
+        self.assertEqual(partition_count(), 4)
+        with self.assertRaises(CommandError):
+            call_command("partition_games", stdout=StringIO())
+
+        # Ids continue from the old sequence and the rows were moved over
+        response = self._post_game(0, 2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(response.data["id"], first_id)
+        self.assertEqual(Game.objects.filter(tournament=self.tournament).count(), 2)
+        status_response = self.client.get(reverse("tournament-status", kwargs={"tournament_id": self.tournament.id}))
+        self.assertEqual(status_response.data["games_played"], 2)
+        # Games are still numbered uniquely per tournament
+        first = Game.objects.get(id=first_id)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Game.objects.create(tournament=self.tournament, home_participant=first.home_participant,
+                                away_participant=first.away_participant, home_score=1, away_score=1,
+                                sequence=first.sequence, played_at=first.played_at)
+
+        call_command("partition_games", "--revert", stdout=StringIO())
+        self.assertFalse(is_partitioned())
+        self.assertEqual(self._post_game(1, 2).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Game.objects.count(), 3)
+
+        self.tournament.delete()
+        self.assertFalse(Game.objects.exists())
+
+    @pytest.mark.order(71)
+    @unittest.skipIf(connection.vendor == "postgresql", "Only relevant for other backends")
+    def test_requires_postgres(self):
+        with self.assertRaises(CommandError):
+            call_command("partition_games", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("benchmark_game_partitioning", stdout=StringIO())
@@ -0,0 +1,75 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player
+from players.search import _has_trigram
+
+
+class PlayerSearchTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("player-search")
+        for name in ("Alice", "Ali", "alina", "Bob Alison", "Charlie", "Malik"):
+            Player.objects.create(name=name)
+
+    def _search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [player["name"] for player in response.data]
+
+    @pytest.mark.order(72)
+    def test_prefix_matches_first(self):
+        names = self._search(q="ali")
+
+        # Exact match, then the other prefix matches
+        self.assertEqual(names[:3], ["Ali", "Alice", "alina"])
+        self.assertNotIn("Charlie", names)
+
+    @pytest.mark.order(73)
+    def test_pagination(self):
+        self.assertEqual(self._search(q="al", limit=2), ["Ali", "Alice"])
+        self.assertEqual(self._search(q="al", limit=2, offset=2)[:1], ["alina"])
+
+    @pytest.mark.order(74)
+    def test_invalid_query(self):
+        for params in ({}, {"q": "  "}, {"q": "ali", "limit": "x"}, {"q": "ali", "offset": -1}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class FuzzyPlayerSearchTests(APITestCase):
+    def setUp(self):
+        if connection.vendor != "postgresql" or not _has_trigram(connection.alias):
+            self.skipTest("Fuzzy search needs PostgreSQL with pg_trgm")
+        self.url = reverse("player-search")
+        for name in ("Carl", "Karl", "Carla Smith", "Magnus Carlsen", "Hikaru Nakamura", "Fabiano Caruana"):
+            Player.objects.create(name=name)
+
+    def _search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [player["name"] for player in response.data]
+
+    @pytest.mark.order(122)
+    def test_misspelled_and_reordered_names_are_found(self):
+        self.assertEqual(self._search(q="Nakamra"), ["Hikaru Nakamura"])
+        self.assertEqual(self._search(q="carlsen magnus"), ["Magnus Carlsen"])
+        self.assertEqual(self._search(q="Caruana Fabiano"), ["Fabiano Caruana"])
+        # Not similar enough to any word
+        self.assertEqual(self._search(q="Kasparov"), [])
+        self.assertNotIn("Hikaru Nakamura", self._search(q="Carlsen"))
+
+    @pytest.mark.order(123)
+    def test_relevance_order_and_bounded_candidates(self):
+        # Exact, then prefix, then similar word; "Karl" shares too few trigrams
+        self.assertEqual(self._search(q="carl"), ["Carl", "Carla Smith", "Magnus Carlsen"])
+
+        # One prefix match in index order and one of the similar names
+        with mock.patch("players.search.SEARCH_CANDIDATES", 1):
+            names = self._search(q="carl")
+        self.assertEqual(names[0], "Carl")
+        self.assertLessEqual(len(names), 2)
@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player, PlayerStats
+
+
+class PlayerStatsTests(APITestCase):
+    def _create_player(self, name):
+        return Player.objects.create(name=name)
+
+    def _create_participant(self, tournament, player):
+        return TournamentParticipant.objects.create(tournament=tournament, player=player)
+
+    def _stats_url(self, player_id: int):
+        return reverse("player-stats", kwargs={"pk": player_id})
+
+    def _post_game(self, tournament, home, away, winner):
+        url = reverse("add-game", kwargs={"tournament_id": tournament.id})
+        payload = {"home_participant": home.id, "away_participant": away.id, "winner": winner}
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @pytest.mark.order(24)
+    def test_stats_without_games_are_zero(self):
+        player = self._create_player("Alice")
+
+        response = self.client.get(self._stats_url(player.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["player_name"], "Alice")
+        self.assertEqual(response.data["points"], 0)
+        self.assertEqual(response.data["games_played"], 0)
+
+    @pytest.mark.order(25)
+    def test_stats_not_found(self):
+        response = self.client.get(self._stats_url(9999))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @pytest.mark.order(26)
+    def test_stats_accumulate_across_tournaments(self):
+        """
+        Recording games through the API updates the rollup of both players,
+        across every tournament they take part in.
+        """
+        alice = self._create_player("Alice")
+        bob = self._create_player("Bob")
+
+        cup = Tournament.objects.create(name="Cup")
+        league = Tournament.objects.create(name="League")
+
+        a1, b1 = self._create_participant(cup, alice), self._create_participant(cup, bob)
+        a2, b2 = self._create_participant(league, alice), self._create_participant(league, bob)
+
+        self._post_game(cup, a1, b1, alice.id)  # Alice wins
+        self._post_game(league, b2, a2, None)  # draw
+
+        alice_stats = self.client.get(self._stats_url(alice.id)).data
+        self.assertEqual(alice_stats["points"], 3)
+        self.assertEqual(alice_stats["wins"], 1)
+        self.assertEqual(alice_stats["draws"], 1)
+        self.assertEqual(alice_stats["losses"], 0)
+        self.assertEqual(alice_stats["games_played"], 2)
+
+        bob_stats = self.client.get(self._stats_url(bob.id)).data
+        self.assertEqual(bob_stats["points"], 1)
+        self.assertEqual(bob_stats["wins"], 0)
+        self.assertEqual(bob_stats["draws"], 1)
+        self.assertEqual(bob_stats["losses"], 1)
+        self.assertEqual(bob_stats["games_played"], 2)
+
+    @pytest.mark.order(27)
+    def test_rebuild_command_recomputes_rollups(self):
+        """
+        Games written directly to the table are picked up by the rebuild command,
+        and stale rollups are overwritten.
+        """
+        alice = self._create_player("Alice")
+        bob = self._create_player("Bob")
+        carol = self._create_player("Carol")
+        t = Tournament.objects.create(name="Rebuild Cup")
+        pa = self._create_participant(t, alice)
+        pb = self._create_participant(t, bob)
+        pc = self._create_participant(t, carol)
+
+        Game.objects.create(tournament=t, home_participant=pa, away_participant=pb, home_score=2, away_score=0)
+        Game.objects.create(tournament=t, home_participant=pc, away_participant=pa, home_score=2, away_score=0)
+        PlayerStats.objects.create(player=bob, points=99, games_played=99)
+
+        call_command("rebuild_player_stats", stdout=StringIO())
+
+        self.assertEqual(PlayerStats.objects.count(), 3)
+        alice_stats = PlayerStats.objects.get(player=alice)
+        self.assertEqual((alice_stats.points, alice_stats.wins, alice_stats.losses), (2, 1, 1))
+        bob_stats = PlayerStats.objects.get(player=bob)
+        self.assertEqual((bob_stats.points, bob_stats.losses, bob_stats.games_played), (0, 1, 1))
+        carol_stats = PlayerStats.objects.get(player=carol)
+        self.assertEqual((carol_stats.points, carol_stats.wins, carol_stats.games_played), (2, 1, 1))
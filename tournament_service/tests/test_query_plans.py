@@ -0,0 +1,134 @@
+import json
+import unittest
+from itertools import combinations
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player
+from tournaments.models import Game, Tournament, TournamentParticipant, TournamentStatus
+
+PLAYERS_PER_TOURNAMENT = 5
+SEED_TOURNAMENTS = 400
+# Tables whose sequential scans grow with the whole data set rather than with one tournament
+WATCHED_TABLES = (Game._meta.db_table, TournamentParticipant._meta.db_table)
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "Query plans are checked on PostgreSQL")
+class QueryPlanTests(APITestCase):
+    """
+    Capture the statements of the hot endpoints against a seeded database and
+    check their EXPLAIN plans: neither the games nor the participants table
+    may be read with a sequential scan once it holds more than
+    EXPLAIN_SEQ_SCAN_MAX_ROWS rows.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        players = Player.objects.bulk_create(
+            [Player(name=f"Seed player {i}") for i in range(SEED_TOURNAMENTS * PLAYERS_PER_TOURNAMENT)]
+        )
+        tournaments = Tournament.objects.bulk_create(
+            [Tournament(name=f"Seed {i}", status=TournamentStatus.STARTED) for i in range(SEED_TOURNAMENTS)]
+        )
+        participants = TournamentParticipant.objects.bulk_create(
+            [
+                TournamentParticipant(tournament=tournament, player=player)
+                for i, tournament in enumerate(tournaments)
+                for player in players[i * PLAYERS_PER_TOURNAMENT:(i + 1) * PLAYERS_PER_TOURNAMENT]
+            ]
+        )
+        games = []
+        now = timezone.now()
+        for i, tournament in enumerate(tournaments):
+            field = participants[i * PLAYERS_PER_TOURNAMENT:(i + 1) * PLAYERS_PER_TOURNAMENT]
+            # Leave the last pairing open so every tournament can still take a game
+            for sequence, (home, away) in enumerate(list(combinations(field, 2))[:-1], start=1):
+                games.append(Game(tournament=tournament, home_participant=home, away_participant=away,
+                                  home_score=1, away_score=1, sequence=sequence, played_at=now))
+        Game.objects.bulk_create(games)
+
+        # Counters as the API would have maintained them
+        for tournament in tournaments:
+            tournament.participants_count = PLAYERS_PER_TOURNAMENT
+            tournament.games_played = PLAYERS_PER_TOURNAMENT * (PLAYERS_PER_TOURNAMENT - 1) // 2 - 1
+        Tournament.objects.bulk_update(tournaments, ["participants_count", "games_played"])
+
+        with connection.cursor() as cursor:
+            for model in (Player, Tournament, TournamentParticipant, Game):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+        cls.tournament = tournaments[SEED_TOURNAMENTS // 2]
+        cls.participants = participants[
+            SEED_TOURNAMENTS // 2 * PLAYERS_PER_TOURNAMENT:(SEED_TOURNAMENTS // 2 + 1) * PLAYERS_PER_TOURNAMENT
+        ]
+
+    def _table_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class WHERE relname IN %s", [WATCHED_TABLES]
+            )
+            return {name: max(rows, 0) for name, rows in cursor.fetchall()}
+
+    def _assert_no_large_seq_scans(self, queries):
+        """Fail with the offending statements when a plan seq-scans a large watched table."""
+        table_rows = self._table_rows()
+        offenders = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query["sql"]
+                if not sql.lstrip().upper().startswith(EXPLAINABLE):
+                    continue
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                for node in _plan_nodes(plan[0]["Plan"]):
+                    relation = node.get("Relation Name")
+                    if (
+                        node["Node Type"] == "Seq Scan"
+                        and relation in WATCHED_TABLES
+                        and table_rows.get(relation, 0) > settings.EXPLAIN_SEQ_SCAN_MAX_ROWS
+                    ):
+                        offenders.append(f"Seq Scan on {relation} ({table_rows[relation]:.0f} rows): {sql}")
+        self.assertFalse(offenders, "\n".join(offenders))
+
+    @pytest.mark.order(84)
+    def test_status_plans_use_indexes(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("tournament-status", kwargs={"tournament_id": self.tournament.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["games_played"], 9)
+        self._assert_no_large_seq_scans(queries.captured_queries)
+
+    @pytest.mark.order(85)
+    def test_add_game_plans_use_indexes(self):
+        home, away = self.participants[-2], self.participants[-1]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("add-game", kwargs={"tournament_id": self.tournament.id}),
+                {"home_participant": home.id, "away_participant": away.id, "winner": None},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self._assert_no_large_seq_scans(queries.captured_queries)
+
+    @pytest.mark.order(86)
+    def test_unindexed_query_is_reported(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Game.objects.filter(home_score=1, away_score=1))
+        with self.assertRaisesMessage(AssertionError, f"Seq Scan on {Game._meta.db_table}"):
+            self._assert_no_large_seq_scans(queries.captured_queries)
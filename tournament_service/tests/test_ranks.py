@@ -0,0 +1,172 @@
+from io import StringIO
+from itertools import combinations
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player
+from tournaments.models import Game, Tournament, TournamentParticipant
+
+NAMES = ("Alice", "Bob", "Charlie", "Dave", "Eve", "Frank")
+# (home, away, winner) by index into NAMES, None is a draw: leaves players
+# tied on points with and without a tiebreaker to separate them
+RESULTS = [
+    (0, 1, 0), (2, 3, None), (4, 5, 5), (0, 2, None), (1, 3, 3),
+    (4, 0, None), (5, 1, 1), (2, 4, 2), (3, 5, None), (1, 2, 2),
+]
+
+
+def _key(entry, tiebreak_order):
+    return (entry["points"], *(entry[name] for name in tiebreak_order))
+
+
+class GlobalRankTests(APITestCase):
+    def _rank(self, player, **params):
+        return self.client.get(reverse("player-rank", kwargs={"pk": player.id}), params)
+
+    @pytest.mark.order(110)
+    def test_rank_by_rating_with_the_players_around(self):
+        ratings = {"Top": 1700, "Second": 1600, "Tied A": 1550, "Tied B": 1550, "Middle": 1500, "Last": 1400}
+        players = {name: Player.objects.create(name=name, rating=rating) for name, rating in ratings.items()}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._rank(players["Tied B"], window=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            response.data["player"],
+            {"rank": 3, "dense_rank": 3, "id": players["Tied B"].id, "name": "Tied B", "rating": 1550.0,
+             "rated_games": 0},
+        )
+        self.assertEqual([entry["name"] for entry in response.data["above"]], ["Tied A"])
+        self.assertEqual([(e["name"], e["rank"], e["dense_rank"]) for e in response.data["below"]], [("Middle", 5, 4)])
+
+        # The same order as the rankings, which number players one by one
+        rankings = self.client.get(reverse("player-rankings")).data
+        response = self._rank(players["Top"], window=10)
+        listed = [response.data["player"], *response.data["below"]]
+        self.assertEqual(response.data["above"], [])
+        self.assertEqual([entry["id"] for entry in listed], [entry["id"] for entry in rankings])
+        self.assertEqual([entry["rank"] for entry in listed], [1, 2, 3, 3, 5, 6])
+
+        response = self._rank(players["Last"], window=0)
+        self.assertEqual((response.data["player"]["rank"], response.data["above"]), (6, []))
+
+        for params in ({"window": "two"}, {"window": -1}, {"window": 101}):
+            self.assertEqual(self._rank(players["Top"], **params).status_code, status.HTTP_400_BAD_REQUEST)
+        missing = reverse("player-rank", kwargs={"pk": 0})
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+    @pytest.mark.order(118)
+    def test_ranks_of_a_slice_inside_long_ties(self):
+        # Ties longer than the window, so that slices start and end inside them
+        ratings = [1600, 1600, 1600, 1600, 1550, 1500, 1500, 1500, 1500, 1500, 1450]
+        players = [Player.objects.create(name=f"Player {i}", rating=rating) for i, rating in enumerate(ratings)]
+        listing = sorted(players, key=lambda player: (-player.rating, player.id))
+        for position, player in enumerate(listing):
+            for window in (0, 1, 2):
+                response = self._rank(player, window=window)
+                listed = [*response.data["above"], response.data["player"], *response.data["below"]]
+                expected = listing[max(position - window, 0):position + window + 1]
+                self.assertEqual([entry["id"] for entry in listed], [p.id for p in expected])
+                for entry in listed:
+                    self.assertEqual(entry["rank"], 1 + sum(rating > entry["rating"] for rating in ratings))
+                    self.assertEqual(entry["dense_rank"], 1 + len({r for r in ratings if r > entry["rating"]}))
+
+
+class TournamentRankTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Ranked Cup")
+        self.players = [Player.objects.create(name=name) for name in NAMES]
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=player) for player in self.players
+        ]
+        Tournament.objects.filter(pk=self.tournament.pk).repair_counters()
+        for home, away, winner in RESULTS:
+            self._post_game(home, away, winner)
+
+    def _post_game(self, home, away, winner):
+        response = self.client.post(
+            reverse("add-game", kwargs={"tournament_id": self.tournament.id}),
+            {
+                "home_participant": self.participants[home].id,
+                "away_participant": self.participants[away].id,
+                "winner": None if winner is None else self.players[winner].id,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def _rank(self, player_id, tournament_id=None, **params):
+        if tournament_id is None:
+            tournament_id = self.tournament.id
+        url = reverse("tournament-player-rank", kwargs={"tournament_id": tournament_id, "player_id": player_id})
+        return self.client.get(url, params)
+
+    def _assert_matches_leaderboard(self, window=1):
+        status_data = self.client.get(reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})).data
+        leaderboard, tiebreak_order = status_data["leaderboard"], status_data["tiebreak_order"]
+        keys = [_key(entry, tiebreak_order) for entry in leaderboard]
+        for position, entry in enumerate(leaderboard):
+            response = self._rank(entry["player_id"], window=window)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ranked = response.data
+            listed = [*ranked["above"], ranked["player"], *ranked["below"]]
+            expected = leaderboard[max(position - window, 0):position + window + 1]
+            self.assertEqual([e["player_id"] for e in listed], [e["player_id"] for e in expected])
+
+            player = dict(ranked["player"])
+            rank, dense_rank = player.pop("rank"), player.pop("dense_rank")
+            self.assertEqual(player, {field: value for field, value in entry.items() if field != "rank"})
+            key = keys[position]
+            self.assertEqual(rank, 1 + sum(other > key for other in keys))
+            self.assertEqual(dense_rank, 1 + len({other for other in keys if other > key}))
+        return leaderboard
+
+    @pytest.mark.order(111)
+    def test_rank_matches_the_leaderboard_for_every_tiebreak_order(self):
+        # Listed by code point whatever the database's locale: "Zoe" before "bob" and "Émile"
+        for index, name in ((1, "bob"), (3, "Zoe"), (4, "Émile")):
+            Player.objects.filter(pk=self.players[index].pk).update(name=name)
+        for tiebreak_order in ("head_to_head,sonneborn_berger,wins", "wins", "sonneborn_berger,head_to_head", ""):
+            self.tournament.tiebreak_order = tiebreak_order
+            self.tournament.save()
+            leaderboard = self._assert_matches_leaderboard()
+
+        # Without tiebreakers, players on the same points share their rank
+        points = [entry["points"] for entry in leaderboard]
+        self.assertLess(len(set(points)), len(points))
+
+        with CaptureQueriesContext(connection) as queries:
+            self._rank(self.players[0].id, window=0)
+        # Tournament and ranking
+        self.assertEqual(len(queries), 2)
+
+    @pytest.mark.order(112)
+    def test_rank_of_finished_and_archived_tournaments(self):
+        Player.objects.filter(pk=self.players[5].pk).update(name="Aaron")
+        played = {frozenset((home, away)) for home, away, _ in RESULTS}
+        for home, away in combinations(range(len(NAMES)), 2):
+            if frozenset((home, away)) not in played:
+                self._post_game(home, away, None if (home + away) % 3 == 0 else home)
+        self.tournament.refresh_from_db()
+        self.assertIsNotNone(self.tournament.frozen_at)
+        before = self._assert_matches_leaderboard(window=2)
+
+        call_command("archive_finished_tournaments", "--days", "0", stdout=StringIO())
+        self.assertFalse(Game.objects.filter(tournament=self.tournament).exists())
+        self.assertEqual(self._assert_matches_leaderboard(window=2), before)
+
+        outsider = Player.objects.create(name="Outsider")
+        response = self._rank(outsider.id)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn("not a participant", response.data["detail"])
+        self.assertEqual(self._rank(self.players[0].id, tournament_id=0).status_code, status.HTTP_404_NOT_FOUND)
+        for window in ("x", -1, 101):
+            response = self._rank(self.players[0].id, window=window)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
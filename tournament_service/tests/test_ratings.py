@@ -0,0 +1,113 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class PlayerRatingTests(APITestCase):
+    def _create_player(self, name):
+        return Player.objects.create(name=name)
+
+    def _create_participant(self, tournament, player):
+        return TournamentParticipant.objects.create(tournament=tournament, player=player)
+
+    def _post_game(self, tournament, home, away, winner):
+        url = reverse("add-game", kwargs={"tournament_id": tournament.id})
+        payload = {"home_participant": home.id, "away_participant": away.id, "winner": winner}
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @pytest.mark.order(28)
+    def test_new_player_has_default_rating(self):
+        response = self.client.post(reverse("player-list"), {"name": "Alice", "rating": 3000}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["rating"], 1500.0)
+        self.assertEqual(response.data["rated_games"], 0)
+
+    @pytest.mark.order(29)
+    def test_game_result_updates_both_ratings(self):
+        """
+        Between equally rated players the winner gains K/2 and the loser drops K/2.
+        """
+        alice = self._create_player("Alice")
+        bob = self._create_player("Bob")
+        t = Tournament.objects.create(name="Elo Cup")
+        pa = self._create_participant(t, alice)
+        pb = self._create_participant(t, bob)
+
+        self._post_game(t, pa, pb, bob.id)
+
+        alice.refresh_from_db()
+        bob.refresh_from_db()
+        self.assertAlmostEqual(alice.rating, 1484.0)
+        self.assertAlmostEqual(bob.rating, 1516.0)
+        self.assertEqual(alice.rated_games, 1)
+        self.assertEqual(bob.rated_games, 1)
+
+    @pytest.mark.order(30)
+    def test_rankings_sorted_by_rating(self):
+        Player.objects.create(name="Low", rating=1400)
+        Player.objects.create(name="High", rating=1700)
+        Player.objects.create(name="Mid", rating=1500)
+
+        response = self.client.get(reverse("player-rankings"), {"limit": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["name"] for p in response.data], ["High", "Mid"])
+        self.assertEqual([p["rank"] for p in response.data], [1, 2])
+
+        response = self.client.get(reverse("player-rankings"), {"offset": 2})
+        self.assertEqual([(p["rank"], p["name"]) for p in response.data], [(3, "Low")])
+
+    @pytest.mark.order(31)
+    def test_rankings_invalid_limit(self):
+        response = self.client.get(reverse("player-rankings"), {"limit": "ten"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @pytest.mark.order(32)
+    def test_recompute_matches_incremental_updates(self):
+        """
+        Replaying history in bulk yields the same ratings as the per-game updates,
+        and also covers games written directly to the table.
+        """
+        alice = self._create_player("Alice")
+        bob = self._create_player("Bob")
+        carol = self._create_player("Carol")
+        dave = self._create_player("Dave")
+        t = Tournament.objects.create(name="Replay Cup")
+        pa = self._create_participant(t, alice)
+        pb = self._create_participant(t, bob)
+        pc = self._create_participant(t, carol)
+
+        self._post_game(t, pa, pb, alice.id)
+        self._post_game(t, pb, pc, None)
+        self._post_game(t, pc, pa, carol.id)
+        incremental = dict(Player.objects.values_list("id", "rating"))
+
+        Player.objects.update(rating=1000, rated_games=7)
+        call_command("recompute_ratings", stdout=StringIO())
+
+        for player in Player.objects.all():
+            self.assertAlmostEqual(player.rating, incremental[player.id])
+        self.assertEqual(Player.objects.get(id=alice.id).rated_games, 2)
+        self.assertEqual(Player.objects.get(id=dave.id).rating, 1500.0)
+        self.assertEqual(Player.objects.get(id=dave.id).rated_games, 0)
+
+        # A game that bypassed the API is included in the replay
+        other = Tournament.objects.create(name="Import")
+        Game.objects.create(
+            tournament=other,
+            home_participant=self._create_participant(other, dave),
+            away_participant=self._create_participant(other, alice),
+            home_score=2,
+            away_score=0,
+        )
+        call_command("recompute_ratings", stdout=StringIO())
+        self.assertGreater(Player.objects.get(id=dave.id).rating, 1500.0)
@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player
+from tournaments.models import Tournament
+
+
+class ServerTimingTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Timing Cup")
+        for name in ("Alice", "Bob"):
+            self.client.post(
+                reverse("add-participant", kwargs={"tournament_id": self.tournament.id}),
+                {"player_id": Player.objects.create(name=name).id},
+                format="json",
+            )
+        self.url = reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})
+
+    def _metrics(self, response):
+        """Server-Timing metrics by name, each a dict of its parameters."""
+        metrics = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+        return metrics
+
+    @pytest.mark.order(87)
+    def test_server_timing_breaks_down_the_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        metrics = self._metrics(response)
+        self.assertEqual(list(metrics), ["db", "view", "render", "total"])
+        self.assertEqual(metrics["db"]["desc"], f'"{len(queries)} queries"')
+        durations = {name: float(params["dur"]) for name, params in metrics.items()}
+        self.assertLessEqual(durations["db"], durations["view"])
+        self.assertLessEqual(durations["view"] + durations["render"], durations["total"])
+
+    @pytest.mark.order(88)
+    def test_queries_are_recorded_under_asgi(self):
+        response = async_to_sync(AsyncClient().get)(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(self._metrics(response)["db"]["desc"], r'"[1-9]\d* queries"')
+
+    @pytest.mark.order(89)
+    def test_profiling_requires_the_token(self):
+        with override_settings(PROFILING_TOKEN="s3cret"):
+            response = self.client.get(self.url, headers={"X-Profile": "s3cret"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["response"]["tournament_name"], "Timing Cup")
+        profile = body["profile"]
+        self.assertGreater(profile["queries"], 0)
+        self.assertEqual(len(profile["slowest_queries"]), min(profile["queries"], 10))
+        self.assertTrue(any(re.search(r"tournament_status", f["function"]) for f in profile["functions"]))
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+        # Wrong token, or profiling not configured: a normal response
+        with override_settings(PROFILING_TOKEN="s3cret"):
+            response = self.client.get(self.url, headers={"X-Profile": "guess"})
+        self.assertEqual(response.json()["tournament_name"], "Timing Cup")
+        response = self.client.get(self.url, headers={"X-Profile": ""})
+        self.assertEqual(response.json()["tournament_name"], "Timing Cup")
+
+    @pytest.mark.order(90)
+    @override_settings(SERVER_TIMING=False, PROFILING_TOKEN="s3cret")
+    def test_disabled_middleware_is_removed(self):
+        # The middleware stack is loaded on a client's first request
+        client = self.client_class()
+        response = client.get(self.url, headers={"X-Profile": "s3cret"})
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(response.json()["tournament_name"], "Timing Cup")
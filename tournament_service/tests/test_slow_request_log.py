@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournament_service.log import BackgroundHandler, JsonFormatter
+from tournaments.models import Tournament
+
+LOGGER = "tournament_service.slow_requests"
+
+
+class SlowRequestLogTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Slow Cup")
+        self.url = reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})
+
+    def _get(self):
+        # A fresh client loads the middleware with the overridden thresholds
+        return self.client_class().get(self.url)
+
+    @pytest.mark.order(91)
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0.001, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_request_is_logged_with_its_queries(self):
+        with self.assertLogs(LOGGER, "WARNING") as logs, CaptureQueriesContext(connection) as queries:
+            response = self._get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        [record] = logs.records
+        data = record.data
+        self.assertEqual(data["event"], "slow_request")
+        self.assertEqual(data["endpoint"], "tournament-status")
+        self.assertEqual(data["tournament_id"], self.tournament.id)
+        self.assertEqual(data["status"], 200)
+        self.assertEqual(data["queries"], len(queries))
+        self.assertEqual(data["slow_queries"], 0)
+        self.assertEqual(len(data["slowest_queries"]), min(len(queries), 5))
+        durations = [query["ms"] for query in data["slowest_queries"]]
+        self.assertEqual(durations, sorted(durations, reverse=True))
+        self.assertTrue(any("tournaments_tournament" in query["sql"] for query in data["slowest_queries"]))
+
+    @pytest.mark.order(92)
+    def test_thresholds(self):
+        with override_settings(SLOW_REQUEST_THRESHOLD_MS=60000, SLOW_QUERY_THRESHOLD_MS=60000):
+            with self.assertNoLogs(LOGGER):
+                self._get()
+
+        # A single slow statement is enough
+        with override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_QUERY_THRESHOLD_MS=0.000001):
+            with self.assertLogs(LOGGER, "WARNING") as logs:
+                self._get()
+        self.assertGreater(logs.records[0].data["slow_queries"], 0)
+
+    @pytest.mark.order(93)
+    def test_background_handler_writes_json_lines(self):
+        stream = io.StringIO()
+        handler = BackgroundHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        logger = logging.getLogger("tests.background_handler")
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            logger.warning("Took %d ms", 12, extra={"data": {"endpoint": "tournament-status", "queries": 3}})
+            self.assertTrue(handler._listener._thread.is_alive())
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        [line] = stream.getvalue().splitlines()
+        payload = json.loads(line)
+        self.assertEqual(payload["message"], "Took 12 ms")
+        self.assertEqual(payload["level"], "WARNING")
+        self.assertEqual(payload["endpoint"], "tournament-status")
+        self.assertEqual(payload["queries"], 3)
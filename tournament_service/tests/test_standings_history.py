@@ -0,0 +1,193 @@
+from datetime import timedelta
+from io import StringIO
+from itertools import combinations
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player
+from tournaments.deletion import delete_players
+from tournaments.history import checkpoint_interval, pack_results, unpack_results
+from tournaments.models import Game, StandingsCheckpoint, Tournament, TournamentParticipant
+from tournaments.services import record_games
+
+NAMES = ("Alice", "Bob", "Charlie", "Dave", "Eve", "Frank", "Grace", "Heidi")
+# Every pairing once as (home, away, winner) by index into NAMES; None is a draw
+RESULTS = [
+    (home, away, (home, away, None)[i % 3])
+    for i, (home, away) in enumerate(combinations(range(len(NAMES)), 2))
+]
+
+
+class StandingsHistoryTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="History Cup")
+        self.players = [Player.objects.create(name=name) for name in NAMES]
+        self.participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=player) for player in self.players
+        ]
+        Tournament.objects.filter(pk=self.tournament.pk).repair_counters()
+        self.status_url = reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})
+        self.url = reverse("tournament-status-as-of", kwargs={"tournament_id": self.tournament.id})
+
+    def _post_game(self, home, away, winner):
+        return self.client.post(
+            reverse("add-game", kwargs={"tournament_id": self.tournament.id}),
+            {
+                "home_participant": self.participants[home].id,
+                "away_participant": self.participants[away].id,
+                "winner": None if winner is None else self.players[winner].id,
+            },
+            format="json",
+        )
+
+    def _play(self, results):
+        """Record the results and return the status payload before and after each game."""
+        statuses = [self.client.get(self.status_url).data]
+        for result in results:
+            self.assertEqual(self._post_game(*result).status_code, status.HTTP_201_CREATED)
+            statuses.append(self.client.get(self.status_url).data)
+        return statuses
+
+    def _checkpoints(self):
+        return list(StandingsCheckpoint.objects.filter(tournament=self.tournament).values_list("sequence", flat=True))
+
+    @pytest.mark.order(107)
+    def test_standings_as_of_every_game_match_the_status_back_then(self):
+        statuses = self._play(RESULTS[:-1])
+        games = list(Game.objects.filter(tournament=self.tournament).order_by("id").values_list("sequence", "played_at"))
+        self.assertEqual([sequence for sequence, _ in games], list(range(1, len(RESULTS))))
+        self.assertEqual([played_at for _, played_at in games], sorted(played_at for _, played_at in games))
+        # 8 participants: a checkpoint every round of 4 games
+        self.assertEqual(self._checkpoints(), [4, 8, 12, 16, 20, 24])
+
+        for sequence, expected in enumerate(statuses):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, {"sequence": sequence})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # Tournament, checkpoint, participants and the games after the checkpoint
+            self.assertEqual(len(queries), 4)
+            as_of = response.data.pop("as_of")
+            self.assertEqual(as_of["sequence"], sequence)
+            self.assertEqual(as_of["played_at"], games[sequence - 1][1] if sequence else None)
+            self.assertEqual(response.data, expected, sequence)
+
+        # Beyond the last game: the current standings, with the usual selection
+        response = self.client.get(self.url, {"sequence": 1000, "top": 2, "fields": "player_name,points"})
+        self.assertEqual(response.data["as_of"]["sequence"], len(RESULTS) - 1)
+        self.assertEqual(
+            response.data["leaderboard"],
+            [{"player_name": e["player_name"], "points": e["points"]} for e in statuses[-1]["leaderboard"][:2]],
+        )
+
+        # The last game finishes and freezes the tournament; its history stays available
+        self._post_game(*RESULTS[-1])
+        self.tournament.refresh_from_db()
+        self.assertIsNotNone(self.tournament.frozen_at)
+        call_command("archive_finished_tournaments", "--days", "0", stdout=StringIO())
+        self.assertFalse(Game.objects.filter(tournament=self.tournament).exists())
+        response = self.client.get(self.url, {"sequence": 20})
+        response.data.pop("as_of")
+        self.assertEqual(response.data, statuses[20])
+
+    @pytest.mark.order(108)
+    def test_standings_as_of_a_time(self):
+        self._play(RESULTS[:20])
+        # One game a minute from noon on
+        noon = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        for game in Game.objects.filter(tournament=self.tournament):
+            Game.objects.filter(id=game.id).update(played_at=noon + timedelta(minutes=game.sequence - 1))
+        call_command("checkpoint_standings", "--tournament", str(self.tournament.id), stdout=StringIO())
+        self.assertEqual(self._checkpoints(), [4, 8, 12, 16, 20])
+
+        for at, sequence in ((noon - timedelta(seconds=1), 0), (noon, 1), (noon + timedelta(seconds=90), 2),
+                             (noon + timedelta(minutes=15), 16), (noon + timedelta(minutes=17), 18),
+                             (noon + timedelta(days=1), 20)):
+            response = self.client.get(self.url, {"at": at.isoformat()})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["as_of"]["sequence"], sequence, at)
+            self.assertEqual(response.data["games_played"], sequence)
+            by_sequence = self.client.get(self.url, {"sequence": sequence}).data
+            self.assertEqual(response.data["leaderboard"], by_sequence["leaderboard"])
+
+        # Naive times are in the server's time zone
+        naive = timezone.make_naive(noon + timedelta(seconds=90)).isoformat()
+        self.assertEqual(self.client.get(self.url, {"at": naive}).data["as_of"]["sequence"], 2)
+
+        for params in ({}, {"sequence": 1, "at": noon.isoformat()}, {"at": "yesterday"}, {"sequence": -1},
+                       {"sequence": 1, "around_player": 0}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST, params)
+        missing = reverse("tournament-status-as-of", kwargs={"tournament_id": 0})
+        self.assertEqual(self.client.get(missing, {"sequence": 1}).status_code, status.HTTP_404_NOT_FOUND)
+
+    @pytest.mark.order(109)
+    def test_checkpoints_follow_participant_changes(self):
+        points = np.array([[0, 2, 1], [0, 0, 0], [1, 2, 0]])
+        played = np.array([[0, 1, 1], [1, 0, 1], [1, 1, 0]])
+        unpacked = unpack_results(pack_results(points, played), 3)
+        self.assertTrue((unpacked[0] == points).all() and (unpacked[1] == played).all())
+
+        # A batch of games is numbered in order and completes a checkpoint
+        self._play(RESULTS[:14])
+        games = [
+            Game(tournament=self.tournament, home_participant=self.participants[home],
+                 away_participant=self.participants[away], home_score=1, away_score=1)
+            for home, away, _ in RESULTS[14:17]
+        ]
+        self.assertEqual([game.sequence for game in record_games(games)], [15, 16, 17])
+        self.assertEqual(self._checkpoints(), [4, 8, 12, 16])
+        before = self.client.get(self.url, {"sequence": 17}).data
+
+        # A new participant appears with no games, a deleted one with theirs
+        TournamentParticipant.objects.create(tournament=self.tournament, player=Player.objects.create(name="Ivan"))
+        delete_players([self.players[0].id])
+        after = self.client.get(self.url, {"sequence": 17}).data
+        entries = {entry["player_name"]: entry for entry in after["leaderboard"]}
+        self.assertEqual(set(entries), set(NAMES[1:]) | {"Ivan"})
+        self.assertEqual(entries["Ivan"]["games_played"], 0)
+        alice_games = sum(1 for home, away, _ in RESULTS[:17] if 0 in (home, away))
+        self.assertEqual(after["games_played"], before["games_played"] - alice_games)
+
+        # The same as without a checkpoint
+        StandingsCheckpoint.objects.all().delete()
+        self.assertEqual(self.client.get(self.url, {"sequence": 17}).data, after)
+
+    @pytest.mark.order(124)
+    def test_default_settings_checkpoint_every_round(self):
+        # The largest field the API allows, played to the end through it
+        self.tournament = Tournament.objects.create(name="Small Cup")
+        self.players, self.participants = self.players[:5], []
+        for player in self.players:
+            response = self.client.post(
+                reverse("add-participant", kwargs={"tournament_id": self.tournament.id}),
+                {"player_id": player.id},
+                format="json",
+            )
+            self.participants.append(TournamentParticipant.objects.get(id=response.data["id"]))
+        self.url = reverse("tournament-status-as-of", kwargs={"tournament_id": self.tournament.id})
+        results = [(home, away, winner) for home, away, winner in RESULTS if away < 5]
+        statuses = [self.client.get(self.url, {"sequence": 0}).data]
+        for result in results:
+            self.assertEqual(self._post_game(*result).status_code, status.HTTP_201_CREATED)
+            statuses.append(self.client.get(self.url, {"sequence": len(statuses)}).data)
+        self.assertEqual(self._checkpoints(), [2, 4, 6, 8, 10])
+
+        # Standings as of a checkpointed game are read from it
+        StandingsCheckpoint.objects.filter(tournament=self.tournament, sequence=6).update(
+            results=pack_results(np.zeros((5, 5), dtype=np.int64), np.zeros((5, 5), dtype=np.int64))
+        )
+        self.assertEqual(self.client.get(self.url, {"sequence": 7}).data["games_played"], 1)
+        self.assertEqual(self.client.get(self.url, {"sequence": 5}).data, statuses[5])
+
+        # The setting caps the interval of larger fields
+        self.assertEqual([checkpoint_interval(n) for n in (0, 2, 5, 8, 1000)], [1, 1, 2, 4, 100])
+        with override_settings(STANDINGS_CHECKPOINT_INTERVAL=3):
+            self.assertEqual(checkpoint_interval(8), 3)
@@ -0,0 +1,130 @@
+import time
+import unittest
+
+import pytest
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from players.models import Player
+from tournaments import status_cache
+from tournaments.models import Game, Tournament, TournamentParticipant
+from tournaments.status_cache import STATUS_CHANNEL, cache, listener
+
+
+class StatusCacheTests(APITestCase):
+    def setUp(self):
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+        self.tournament = self._create_tournament("Cache Cup")
+        self.url = self._status_url(self.tournament)
+
+    def _create_tournament(self, name):
+        tournament = Tournament.objects.create(name=name)
+        for player in self.players:
+            TournamentParticipant.objects.create(tournament=tournament, player=player)
+        return tournament
+
+    def _status_url(self, tournament):
+        return reverse("tournament-status", kwargs={"tournament_id": tournament.id})
+
+    def _add_game(self, tournament, home, away):
+        participants = {p.player_id: p for p in tournament.participants.all()}
+        Game.objects.create(tournament=tournament, home_participant=participants[home.id],
+                            away_participant=participants[away.id], home_score=2, away_score=0)
+
+    @pytest.mark.order(94)
+    def test_hit_only_loads_the_tournament(self):
+        first = self.client.get(self.url, {"top": 1})
+        self.assertIn(self.tournament.id, cache)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["leaderboard"]), 3)
+        self.assertEqual(response.data["leaderboard"][:1], first.data["leaderboard"])
+
+        # Field selection works on a copy and leaves the cached payload intact
+        self.client.get(self.url, {"fields": "player_name"})
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertIn("points", response.data["leaderboard"][0])
+
+    @pytest.mark.order(95)
+    def test_writes_and_renames_are_never_served_stale(self):
+        self.client.get(self.url)
+        alice, bob, _ = self.players
+        self._add_game(self.tournament, bob, alice)
+        self.assertNotIn(self.tournament.id, cache)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["games_played"], 1)
+        self.assertEqual(response.data["leaderboard"][0]["player_name"], "Bob")
+
+        response = self.client.patch(reverse("player-detail", kwargs={"pk": bob.id}), {"name": "Robert"},
+                                     format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["leaderboard"][0]["player_name"], "Robert")
+
+        # An entry for an older revision is not served even if it was not evicted
+        tournament = Tournament.objects.get(id=self.tournament.id)
+        cache.put(tournament, {**response.data, "tournament_name": "Stale"})
+        Tournament.objects.filter(id=tournament.id).update(revision=tournament.revision + 1)
+        self.assertEqual(self.client.get(self.url).data["tournament_name"], "Cache Cup")
+
+        batch = self.client.get(reverse("tournament-batch-status"), {"ids": str(self.tournament.id)})
+        self.assertEqual(batch.data["results"][self.tournament.id]["leaderboard"], response.data["leaderboard"])
+
+    @pytest.mark.order(96)
+    @override_settings(STATUS_CACHE_SIZE=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        second, third = self._create_tournament("Second Cup"), self._create_tournament("Third Cup")
+        cache.clear()
+        self.client.get(self.url)
+        self.client.get(self._status_url(second))
+        self.client.get(self.url)
+        self.client.get(self._status_url(third))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn(self.tournament.id, cache)
+        self.assertNotIn(second.id, cache)
+        self.assertIn(third.id, cache)
+
+        with override_settings(STATUS_CACHE_SIZE=0):
+            cache.clear()
+            self.client.get(self.url)
+        self.assertEqual(len(cache), 0)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY needs PostgreSQL")
+class StatusCacheListenerTests(TransactionTestCase):
+    def setUp(self):
+        listener.start()
+        self.addCleanup(listener.stop)
+        self.assertTrue(listener.connected.wait(5))
+
+    def _wait_until_evicted(self, tournament_id):
+        deadline = time.monotonic() + 5
+        while tournament_id in cache and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return tournament_id not in cache
+
+    @pytest.mark.order(97)
+    def test_notifications_evict_after_commit(self):
+        tournament = Tournament.objects.create(name="Listener Cup")
+        cache.put(tournament, {"tournament_name": "Listener Cup"})
+
+        with transaction.atomic():
+            # Another worker's write: only the notification reaches this process
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", [STATUS_CHANNEL, str(tournament.id)])
+            time.sleep(0.2)
+            self.assertIn(tournament.id, cache)
+        self.assertTrue(self._wait_until_evicted(tournament.id))
+
+        cache.put(tournament, {"tournament_name": "Listener Cup"})
+        with transaction.atomic():
+            status_cache.invalidate([tournament.id])
+            cache.put(tournament, {"tournament_name": "Listener Cup"})
+        self.assertTrue(self._wait_until_evicted(tournament.id))
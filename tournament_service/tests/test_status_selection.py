@@ -0,0 +1,79 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class StatusSelectionTests(APITestCase):
+    def setUp(self):
+        """
+        Five players where every player beats everybody listed after them,
+        so the leaderboard is Alice, Bob, Charlie, Dave, Eve.
+        """
+        self.tournament = Tournament.objects.create(name="Selection Cup")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie", "Dave", "Eve")]
+        participants = [
+            TournamentParticipant.objects.create(tournament=self.tournament, player=player)
+            for player in self.players
+        ]
+        for i, home in enumerate(participants):
+            for away in participants[i + 1:]:
+                Game.objects.create(tournament=self.tournament, home_participant=home, away_participant=away,
+                                    home_score=2, away_score=0)
+        self.url = reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})
+
+    def _names(self, response):
+        return [entry["player_name"] for entry in response.data["leaderboard"]]
+
+    @pytest.mark.order(62)
+    def test_full_leaderboard_has_ranks(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._names(response), ["Alice", "Bob", "Charlie", "Dave", "Eve"])
+        self.assertEqual([entry["rank"] for entry in response.data["leaderboard"]], [1, 2, 3, 4, 5])
+
+    @pytest.mark.order(63)
+    def test_top_k_with_fields(self):
+        response = self.client.get(self.url, {"top": 3, "fields": "rank,player_name,points"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["leaderboard"],
+            [
+                {"rank": 1, "player_name": "Alice", "points": 8},
+                {"rank": 2, "player_name": "Bob", "points": 6},
+                {"rank": 3, "player_name": "Charlie", "points": 4},
+            ],
+        )
+        # The rest of the status is unaffected
+        self.assertEqual(response.data["participants_count"], 5)
+        self.assertEqual(response.data["status"], "finished")
+
+    @pytest.mark.order(64)
+    def test_rank_neighborhood(self):
+        dave = self.players[3].id
+        response = self.client.get(self.url, {"around_player": dave, "window": 1})
+        self.assertEqual(self._names(response), ["Charlie", "Dave", "Eve"])
+        self.assertEqual([entry["rank"] for entry in response.data["leaderboard"]], [3, 4, 5])
+
+        alice = self.players[0].id
+        response = self.client.get(self.url, {"around_player": alice})
+        self.assertEqual(self._names(response), ["Alice", "Bob", "Charlie"])
+
+    @pytest.mark.order(65)
+    def test_invalid_selection(self):
+        outsider = Player.objects.create(name="Outsider")
+        for params in (
+            {"top": -1},
+            {"top": "three"},
+            {"top": 3, "around_player": self.players[0].id},
+            {"window": 2},
+            {"fields": "rank,rating"},
+            {"around_player": outsider.id},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,103 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class TiebreakTests(APITestCase):
+    def setUp(self):
+        """
+        Five players, all games played:
+          A beats B, C and D, draws E
+          B draws C, D and E
+          C beats D, loses to E
+          D beats E
+
+        Points: A 7, E 4, B 3, C 3, D 3 - the tie between B, C and D is broken by
+          - head-to-head: C (3), B (2), D (1)
+          - Sonneborn-Berger: D (5.5), B (5.0), C (4.5)
+          - wins: C and D (1) over B (0)
+        """
+        self.tournament = Tournament.objects.create(name="Tiebreak Cup")
+        p = {}
+        for name in "ABCDE":
+            player = Player.objects.create(name=name)
+            p[name] = TournamentParticipant.objects.create(tournament=self.tournament, player=player)
+
+        for home, away, home_score, away_score in [
+            ("A", "B", 2, 0),
+            ("A", "C", 2, 0),
+            ("A", "D", 2, 0),
+            ("A", "E", 1, 1),
+            ("B", "C", 1, 1),
+            ("B", "D", 1, 1),
+            ("B", "E", 1, 1),
+            ("C", "D", 2, 0),
+            ("C", "E", 0, 2),
+            ("D", "E", 2, 0),
+        ]:
+            Game.objects.create(
+                tournament=self.tournament,
+                home_participant=p[home],
+                away_participant=p[away],
+                home_score=home_score,
+                away_score=away_score,
+            )
+
+    def _status_url(self):
+        return reverse("tournament-status", kwargs={"tournament_id": self.tournament.id})
+
+    def _order(self):
+        response = self.client.get(self._status_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [e["player_name"] for e in response.data["leaderboard"]]
+
+    def _set_tiebreak_order(self, value):
+        url = reverse("tournament-detail", kwargs={"pk": self.tournament.id})
+        return self.client.patch(url, {"tiebreak_order": value}, format="json")
+
+    @pytest.mark.order(33)
+    def test_default_order_uses_head_to_head_first(self):
+        response = self.client.get(self._status_url())
+
+        self.assertEqual(response.data["tiebreak_order"], ["head_to_head", "sonneborn_berger", "wins"])
+        self.assertEqual(self._order(), ["A", "E", "C", "B", "D"])
+
+        entries = {e["player_name"]: e for e in response.data["leaderboard"]}
+        self.assertEqual(entries["C"]["head_to_head"], 3)
+        self.assertEqual(entries["B"]["head_to_head"], 2)
+        self.assertEqual(entries["D"]["head_to_head"], 1)
+        self.assertEqual(entries["D"]["sonneborn_berger"], 5.5)
+        self.assertEqual(entries["B"]["sonneborn_berger"], 5.0)
+        self.assertEqual(entries["C"]["sonneborn_berger"], 4.5)
+        self.assertEqual(entries["B"]["draws"], 3)
+        self.assertEqual(entries["C"]["losses"], 2)
+
+    @pytest.mark.order(34)
+    def test_configured_order_changes_ranking(self):
+        response = self._set_tiebreak_order("sonneborn_berger")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._order(), ["A", "E", "D", "B", "C"])
+
+        self._set_tiebreak_order("wins, head_to_head")
+        self.assertEqual(self._order(), ["A", "E", "C", "D", "B"])
+
+        # Without tiebreakers ties fall back to the player name
+        self._set_tiebreak_order("")
+        self.assertEqual(self._order(), ["A", "E", "B", "C", "D"])
+
+    @pytest.mark.order(35)
+    def test_invalid_tiebreak_order_rejected(self):
+        response = self._set_tiebreak_order("coin_toss")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._set_tiebreak_order("wins,wins")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @pytest.mark.order(36)
+    def test_status_uses_one_query_per_table(self):
+        with self.assertNumQueries(3):
+            self.client.get(self._status_url())
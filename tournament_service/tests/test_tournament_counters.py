@@ -0,0 +1,91 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament, TournamentParticipant, Game
+from players.models import Player
+
+
+class TournamentCounterTests(APITestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Counter Cup")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+
+    def _add_participant(self, player):
+        response = self.client.post(
+            reverse("add-participant", kwargs={"tournament_id": self.tournament.id}),
+            {"player_id": player.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def _add_game(self, home_id, away_id):
+        response = self.client.post(
+            reverse("add-game", kwargs={"tournament_id": self.tournament.id}),
+            {"home_participant": home_id, "away_participant": away_id, "winner": None},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def _counters(self):
+        self.tournament.refresh_from_db()
+        return self.tournament.participants_count, self.tournament.games_played, self.tournament.status
+
+    def _repair(self, *args):
+        out = StringIO()
+        call_command("repair_tournament_counters", *args, stdout=out)
+        return out.getvalue()
+
+    @pytest.mark.order(54)
+    def test_counters_follow_writes(self):
+        alice = self._add_participant(self.players[0])
+        bob = self._add_participant(self.players[1])
+        self.assertEqual(self._counters(), (2, 0, "in_planning"))
+
+        charlie = self._add_participant(self.players[2])
+        self._add_game(alice, bob)
+        self.assertEqual(self._counters(), (3, 1, "started"))
+
+        self._add_game(alice, charlie)
+        self._add_game(bob, charlie)
+        self.assertEqual(self._counters(), (3, 3, "finished"))
+
+        response = self.client.get(reverse("tournament-list"), {"status": "finished"})
+        self.assertEqual([t["id"] for t in response.data], [self.tournament.id])
+        self.assertEqual(response.data[0]["total_required_games"], 3)
+
+    @pytest.mark.order(55)
+    def test_counters_are_read_only(self):
+        url = reverse("tournament-detail", kwargs={"pk": self.tournament.id})
+        response = self.client.patch(url, {"games_played": 42, "status": "finished"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._counters(), (0, 0, "in_planning"))
+
+    @pytest.mark.order(56)
+    def test_repair_command(self):
+        """
+        Rows written behind the API's back leave the counters stale until repaired.
+        """
+        pa = TournamentParticipant.objects.create(tournament=self.tournament, player=self.players[0])
+        pb = TournamentParticipant.objects.create(tournament=self.tournament, player=self.players[1])
+        Game.objects.create(tournament=self.tournament, home_participant=pa, away_participant=pb,
+                            home_score=1, away_score=1)
+        consistent = Tournament.objects.create(name="Consistent Cup")
+
+        with self.assertRaises(CommandError):
+            self._repair("--check")
+        self.assertEqual(self._counters(), (0, 0, "in_planning"))
+
+        output = self._repair()
+        self.assertIn(f"Tournament {self.tournament.id}", output)
+        self.assertNotIn(f"Tournament {consistent.id}:", output)
+        self.assertEqual(self._counters(), (2, 1, "finished"))
+
+        self.assertIn("consistent", self._repair("--check"))
@@ -0,0 +1,98 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tournaments.models import Tournament
+from players.models import Player
+
+
+class TournamentListStatusTests(APITestCase):
+    def setUp(self):
+        self.list_url = reverse("tournament-list")
+        self.players = [Player.objects.create(name=name) for name in ("Alice", "Bob", "Charlie")]
+
+    def _create_tournament(self, name, participants=0, games=0):
+        """
+        Create a tournament through the API with the first `participants`
+        players and `games` played (in pairing order, home always wins).
+        """
+        tournament_id = self.client.post(self.list_url, {"name": name}, format="json").data["id"]
+        participant_ids = []
+        for player in self.players[:participants]:
+            response = self.client.post(
+                reverse("add-participant", kwargs={"tournament_id": tournament_id}),
+                {"player_id": player.id},
+                format="json",
+            )
+            participant_ids.append((response.data["id"], player.id))
+
+        pairs = [(0, 1), (0, 2), (1, 2)][:games]
+        for home, away in pairs:
+            self.client.post(
+                reverse("add-game", kwargs={"tournament_id": tournament_id}),
+                {
+                    "home_participant": participant_ids[home][0],
+                    "away_participant": participant_ids[away][0],
+                    "winner": participant_ids[home][1],
+                },
+                format="json",
+            )
+        return tournament_id
+
+    @pytest.mark.order(49)
+    def test_list_includes_counts_and_status(self):
+        planning = self._create_tournament("Planning", participants=3)
+        started = self._create_tournament("Started", participants=3, games=1)
+        finished = self._create_tournament("Finished", participants=3, games=3)
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_id = {t["id"]: t for t in response.data}
+        self.assertEqual(by_id[planning]["status"], "in_planning")
+        self.assertEqual(by_id[started]["status"], "started")
+        self.assertEqual(by_id[started]["games_played"], 1)
+        self.assertEqual(by_id[finished]["status"], "finished")
+        self.assertEqual(by_id[finished]["participants_count"], 3)
+        self.assertEqual(by_id[finished]["total_required_games"], 3)
+
+        detail = self.client.get(reverse("tournament-detail", kwargs={"pk": started}))
+        self.assertEqual(detail.data["status"], "started")
+        self.assertEqual(detail.data["participants_count"], 3)
+
+    @pytest.mark.order(50)
+    def test_create_returns_counts(self):
+        response = self.client.post(self.list_url, {"name": "Fresh"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["participants_count"], 0)
+        self.assertEqual(response.data["total_required_games"], 0)
+        self.assertEqual(response.data["status"], "in_planning")
+
+    @pytest.mark.order(51)
+    def test_filter_by_status_and_ordering(self):
+        self._create_tournament("B Planning", participants=2, games=0)
+        self._create_tournament("A Finished", participants=2, games=1)
+        self._create_tournament("C Finished", participants=3, games=3)
+
+        response = self.client.get(self.list_url, {"status": "finished", "ordering": "-games_played"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t["name"] for t in response.data], ["C Finished", "A Finished"])
+
+        response = self.client.get(self.list_url, {"ordering": "name"})
+        self.assertEqual([t["name"] for t in response.data], ["A Finished", "B Planning", "C Finished"])
+
+    @pytest.mark.order(52)
+    def test_invalid_status_filter(self):
+        response = self.client.get(self.list_url, {"status": "paused"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @pytest.mark.order(53)
+    def test_list_uses_single_query(self):
+        for i in range(5):
+            Tournament.objects.create(name=f"Cup {i}")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {"status": "in_planning", "ordering": "-created_at"})
+        self.assertEqual(len(response.data), 5)
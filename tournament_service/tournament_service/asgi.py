@@ -9,8 +9,20 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tournament_service.settings")
 
 application = get_asgi_application()
+
+# Evict status cache entries when other workers write (PostgreSQL only)
+from tournaments import status_cache  # noqa: E402
+
+status_cache.listen()
+
+# Serve static files (admin, API docs) in development like runserver does
+if settings.DEBUG:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+    application = ASGIStaticFilesHandler(application)
@@ -0,0 +1,69 @@
+"""
+Logging helpers referenced from the LOGGING setting.
+
+JsonFormatter renders a record as one JSON object per line. Structured fields
+are passed as `extra={"data": {...}}` and merged into the object.
+
+BackgroundHandler puts records on a queue that a listener thread writes to the
+stream, so logging never waits for I/O on the request path. The thread is
+started lazily in every process: server workers are forked from a master
+process, and a thread started before the fork does not exist in the workers.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "data", {}))
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, cls=DjangoJSONEncoder)
+
+
+class BackgroundHandler(QueueHandler):
+    """Format records on the calling thread and write them from a listener thread."""
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        self._listener = None
+        self._pid = None
+
+    def _start(self):
+        # A queue inherited through fork may hold the parent's records
+        self.queue = queue.SimpleQueue()
+        self._listener = QueueListener(self.queue, self.target)
+        self._listener.start()
+        self._pid = os.getpid()
+        atexit.register(self._stop)
+
+    def _stop(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+        self._listener = None
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        super().emit(record)
+
+    def close(self):
+        # Drains the queue before closing the stream handler
+        self._stop()
+        self.target.close()
+        super().close()
@@ -38,13 +38,18 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "players",
-    "tournaments"
+    "tournaments",
+    "idempotency",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    "tournament_service.timing.ServerTimingMiddleware",
+    "tournament_service.slow_requests.SlowRequestLogMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -73,6 +78,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "tournament_service.wsgi.application"
+ASGI_APPLICATION = "tournament_service.asgi.application"
 
 
 # Database
@@ -136,6 +142,82 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Elo rating settings
+ELO_K_FACTOR = float(os.getenv("ELO_K_FACTOR", "32"))
+ELO_RECOMPUTE_CHUNK_SIZE = int(os.getenv("ELO_RECOMPUTE_CHUNK_SIZE", "50000"))
+
+# Seconds a crosstable stays cached for a given tournament revision
+CROSSTABLE_CACHE_TIMEOUT = int(os.getenv("CROSSTABLE_CACHE_TIMEOUT", "3600"))
+
+# Computed status payloads each worker keeps in memory (0 disables the cache);
+# see tournaments/status_cache.py
+STATUS_CACHE_SIZE = int(os.getenv("STATUS_CACHE_SIZE", "1024"))
+
+# Queued game ingestion (Prefer: respond-async on add_game_result): results
+# recorded per transaction by ingest_game_results, and its idle poll interval
+GAME_INGEST_BATCH_SIZE = int(os.getenv("GAME_INGEST_BATCH_SIZE", "500"))
+GAME_INGEST_POLL_INTERVAL = float(os.getenv("GAME_INGEST_POLL_INTERVAL", "1"))
+
+# Background jobs (see jobs/worker.py): threads of a run_jobs worker and its idle
+# poll interval, retry backoff bounds in seconds, seconds between heartbeats of
+# running jobs and without one before a job is taken back, and where
+# export_state jobs write their archives
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "10"))
+JOB_RETRY_BACKOFF_MAX = float(os.getenv("JOB_RETRY_BACKOFF_MAX", "600"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "60"))
+JOB_EXPORT_DIR = os.getenv("JOB_EXPORT_DIR", str(BASE_DIR / "exports"))
+
+# Most games between two standings checkpoints of a tournament, which
+# point-in-time standings start from; below it, one per round of the field
+# (see tournaments/history.py)
+STANDINGS_CHECKPOINT_INTERVAL = int(os.getenv("STANDINGS_CHECKPOINT_INTERVAL", "100"))
+
+# Number of event log rows fetched per round trip when replaying standings
+STANDINGS_REPLAY_CHUNK_SIZE = int(os.getenv("STANDINGS_REPLAY_CHUNK_SIZE", "10000"))
+
+# Seconds between keep-alive comments on idle live leaderboard streams
+LIVE_STREAM_KEEPALIVE = float(os.getenv("LIVE_STREAM_KEEPALIVE", "15"))
+
+# Idempotency-Key handling: seconds a stored response is replayed, seconds a
+# retry waits for a concurrent request with the same key, and its poll interval
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+# Seconds a request holds its key while it runs; a retry after that takes the
+# key over from a crashed worker. Keep it above the longest request (GUNICORN_TIMEOUT)
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10"))
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.05"))
+
+# Server-Timing response headers, and the token that unlocks per-request
+# profiling through the X-Profile header (off while empty); see timing.py
+SERVER_TIMING = os.getenv("SERVER_TIMING", "TRUE").upper() == "TRUE"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+
+# Slow-request log: requests slower than SLOW_REQUEST_THRESHOLD_MS, or with a
+# query slower than SLOW_QUERY_THRESHOLD_MS, are logged as JSON lines (0 disables)
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "tournament_service.log.JsonFormatter"},
+    },
+    "handlers": {
+        "json": {"()": "tournament_service.log.BackgroundHandler", "formatter": "json"},
+    },
+    "loggers": {
+        "tournament_service.slow_requests": {"handlers": ["json"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Query plan checks (tests/test_query_plans.py): a sequential scan of the games
+# or participants table fails them once the table holds more rows than this
+EXPLAIN_SEQ_SCAN_MAX_ROWS = int(os.getenv("EXPLAIN_SEQ_SCAN_MAX_ROWS", "1000"))
+
 # drf-spectacular settings
 SPECTACULAR_SETTINGS = {
     "TITLE": "Tournament Service API",
@@ -0,0 +1,90 @@
+"""
+Slow-request log.
+
+SlowRequestLogMiddleware records every query of a request with an execute
+wrapper and, when the request took longer than SLOW_REQUEST_THRESHOLD_MS or a
+single query longer than SLOW_QUERY_THRESHOLD_MS, logs one structured record
+to the "tournament_service.slow_requests" logger. The LOGGING setting writes
+that logger as JSON lines from a background thread (see log.py).
+
+Statements are logged as executed by Django, with placeholders instead of
+parameter values.
+"""
+import heapq
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .timing import QueryRecorder
+
+logger = logging.getLogger("tournament_service.slow_requests")
+
+SLOWEST_QUERIES = 5
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class SlowRequestLogMiddleware:
+    """
+    Log requests that exceed the configured latency thresholds. Both
+    thresholds set to 0 disable it.
+    """
+
+    def __init__(self, get_response):
+        self.request_threshold = settings.SLOW_REQUEST_THRESHOLD_MS / 1000
+        self.query_threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        if not self.request_threshold and not self.query_threshold:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(keep_statements=True)
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        latency = time.perf_counter() - started
+
+        slow_queries = [
+            (elapsed, sql) for elapsed, sql in recorder.statements
+            if self.query_threshold and elapsed > self.query_threshold
+        ]
+        if (self.request_threshold and latency > self.request_threshold) or slow_queries:
+            self._log(request, response, latency, recorder, slow_queries)
+        return response
+
+    def _log(self, request, response, latency, recorder, slow_queries):
+        match = request.resolver_match
+        endpoint = match.view_name if match else None
+        tournament_id = None
+        if match:
+            tournament_id = match.kwargs.get("tournament_id")
+            if tournament_id is None and endpoint.startswith("tournament-"):
+                tournament_id = match.kwargs.get("pk")
+
+        slowest = heapq.nlargest(SLOWEST_QUERIES, recorder.statements, key=lambda statement: statement[0])
+        logger.warning(
+            "Slow request %s %s took %.1f ms",
+            request.method,
+            request.path,
+            latency * 1000,
+            extra={
+                "data": {
+                    "event": "slow_request",
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": endpoint,
+                    "tournament_id": int(tournament_id) if str(tournament_id).isdigit() else None,
+                    "status": response.status_code,
+                    "latency_ms": _ms(latency),
+                    "queries": recorder.count,
+                    "db_ms": _ms(recorder.duration),
+                    "slow_queries": len(slow_queries),
+                    "slowest_queries": [{"sql": sql, "ms": _ms(elapsed)} for elapsed, sql in slowest],
+                }
+            },
+        )
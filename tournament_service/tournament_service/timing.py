@@ -0,0 +1,152 @@
+"""
+Server-Timing headers and opt-in per-request profiling.
+
+ServerTimingMiddleware reports where a request spent its time, e.g.
+
+    Server-Timing: db;dur=3.1;desc="4 queries", view;dur=7.9, render;dur=0.6, total;dur=9.2
+
+`db` is the time spent executing SQL, `view` the view function including its
+queries, `render` the serialization of a DRF response (rendered after the view
+returns) and `total` everything below the middleware. With SERVER_TIMING
+disabled the middleware removes itself from the stack at startup.
+
+Requests carrying the X-Profile header with the value of PROFILING_TOKEN also
+run under cProfile. Their JSON responses are returned as
+{"response": <original body>, "profile": {...}} with the slowest queries and
+functions. Profiling is unavailable while PROFILING_TOKEN is empty.
+"""
+import cProfile
+import hmac
+import json
+import pstats
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERIES = 10
+PROFILE_FUNCTIONS = 25
+
+
+class QueryRecorder:
+    """Execute wrapper that counts queries and sums up their duration."""
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if keep_statements else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.statements is not None:
+                self.statements.append((elapsed, sql))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _profile_summary(profiler, recorder, total):
+    functions = sorted(pstats.Stats(profiler).stats.items(), key=lambda item: item[1][3], reverse=True)
+    return {
+        "total_ms": _ms(total),
+        "db_ms": _ms(recorder.duration),
+        "queries": recorder.count,
+        "slowest_queries": [
+            {"sql": sql, "ms": _ms(elapsed)}
+            for elapsed, sql in sorted(recorder.statements, key=lambda statement: statement[0], reverse=True)
+            [:PROFILE_QUERIES]
+        ],
+        "functions": [
+            {
+                "function": pstats.func_std_string(function),
+                "calls": calls,
+                "own_ms": _ms(own),
+                "cumulative_ms": _ms(cumulative),
+            }
+            for function, (_, calls, own, cumulative, _) in functions[:PROFILE_FUNCTIONS]
+        ],
+    }
+
+
+class ServerTimingMiddleware:
+    """
+    Add a Server-Timing header to every response and profile requests that
+    ask for it with the profiling token. Keep it first in MIDDLEWARE.
+
+    It is a synchronous middleware on purpose: under ASGI, sync views then run
+    in the same thread as the middleware, so their queries are recorded too.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profiler = cProfile.Profile() if self._profiling_requested(request) else None
+        recorder = QueryRecorder(keep_statements=profiler is not None)
+        # [view started, view finished], filled in by the hooks below
+        request._server_timing_view = [None, None]
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finished = time.perf_counter()
+
+        response["Server-Timing"] = self._header(request, recorder, finished - started, finished)
+        if profiler is not None:
+            self._attach_profile(response, _profile_summary(profiler, recorder, finished - started))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._server_timing_view[0] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Called after the view returned and before the response is rendered
+        request._server_timing_view[1] = time.perf_counter()
+        return response
+
+    def _profiling_requested(self, request):
+        token = settings.PROFILING_TOKEN
+        supplied = request.headers.get(PROFILE_HEADER)
+        return bool(token) and supplied is not None and hmac.compare_digest(supplied.encode(), token.encode())
+
+    def _header(self, request, recorder, total, finished):
+        metrics = [f'db;dur={_ms(recorder.duration)};desc="{recorder.count} queries"']
+        view_started, view_finished = request._server_timing_view
+        if view_started is not None:
+            if view_finished is None:
+                metrics.append(f"view;dur={_ms(finished - view_started)}")
+            else:
+                metrics.append(f"view;dur={_ms(view_finished - view_started)}")
+                metrics.append(f"render;dur={_ms(finished - view_finished)}")
+        metrics.append(f"total;dur={_ms(total)}")
+        return ", ".join(metrics)
+
+    def _attach_profile(self, response, summary):
+        """Wrap a JSON body into a {"response": ..., "profile": ...} envelope."""
+        if response.streaming or not response.get("Content-Type", "").startswith("application/json"):
+            return
+        body = json.loads(response.content) if response.content else None
+        response.content = json.dumps({"response": body, "profile": summary}, cls=DjangoJSONEncoder)
+        response["Content-Length"] = str(len(response.content))
+        # The envelope belongs to this request only
+        response["Cache-Control"] = "no-store"
+        if response.has_header("ETag"):
+            del response["ETag"]
@@ -29,6 +29,7 @@ urlpatterns = [
     path("health/", health),
     path("api/", include("players.urls")),
     path("api/", include("tournaments.urls")),
+    path("api/", include("jobs.urls")),
     # OpenAPI schema
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     # Swagger UI
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tournament_service.settings")
 
 application = get_wsgi_application()
+
+# Evict status cache entries when other workers write (PostgreSQL only)
+from tournaments import status_cache  # noqa: E402
+
+status_cache.listen()
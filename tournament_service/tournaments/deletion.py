@@ -0,0 +1,138 @@
+"""
+Bulk deletion of tournaments and players.
+
+Django's cascade collector loads every dependent row (participants, games,
+events...) into memory before deleting them in batches. These helpers delete
+each dependent table with a single DELETE ... WHERE fk IN (subquery) instead,
+deepest relations first, inside one transaction. Signals are not sent, so the
+bookkeeping that the post_delete receivers would do happens here.
+
+The deleted games are taken back out of the players' career stats in the same
+transaction. Elo ratings depend on the order of all games and cannot be taken
+back game by game, so a `recompute_ratings` job is queued instead. Frozen
+tournaments that lose a participant are thawed: their final standings are
+dropped, and they are frozen again if the remaining games still complete them.
+
+The results event log of a deleted tournament goes with it. When players are
+deleted, the events of their games are dropped from the log of the
+tournaments that remain, along with those tournaments' standings snapshots,
+which counted the games; a fresh snapshot of the remaining events replaces
+them, so that replaying the log agrees with the games table again.
+"""
+from functools import partial
+
+from django.db import models, transaction
+from django.db.models import F, Q
+
+from jobs.models import Job, JobStatus
+from jobs.registry import enqueue
+from players import stats as player_stats
+
+from . import status_cache
+from .live import hub
+from .models import (
+    ArchivedGame,
+    FinalStandings,
+    Game,
+    GameEvent,
+    StandingsSnapshot,
+    Tournament,
+    TournamentParticipant,
+    TournamentStatus,
+)
+from .replay import rebuild_standings, take_snapshot
+from .services import freeze_tournament
+
+
+def cascade_delete(queryset) -> int:
+    """
+    Delete the rows of `queryset` and everything that cascades from them with
+    one statement per relation. Returns the number of rows of `queryset`'s
+    model that were deleted.
+    """
+    model = queryset.model
+    for relation in model._meta.related_objects:
+        if relation.on_delete is not models.CASCADE:
+            # Left to the database constraint (PROTECT, SET_NULL, ... are not used here)
+            continue
+        related = relation.related_model._base_manager.filter(**{f"{relation.field.name}__in": queryset})
+        cascade_delete(related)
+    # The private fast path of QuerySet.delete(): a plain DELETE without collecting
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_tournaments(tournament_ids) -> int:
+    """Delete tournaments with all of their participants, games and derived rows."""
+    tournament_ids = list(tournament_ids)
+    with transaction.atomic():
+        _remove_results(
+            Game.objects.filter(tournament_id__in=tournament_ids),
+            ArchivedGame.objects.filter(tournament_id__in=tournament_ids),
+        )
+        deleted = cascade_delete(Tournament.objects.filter(id__in=tournament_ids))
+        status_cache.invalidate(tournament_ids)
+        for tournament_id in tournament_ids:
+            transaction.on_commit(partial(hub.publish, tournament_id))
+    return deleted
+
+
+def delete_players(player_ids) -> int:
+    """
+    Delete players with their participations and the games they played. The
+    tournaments they took part in get their counters repaired and a new revision.
+    """
+    from players.models import Player
+
+    player_ids = list(player_ids)
+    with transaction.atomic():
+        tournament_ids = list(
+            TournamentParticipant.objects.filter(player_id__in=player_ids)
+            .order_by("tournament_id")
+            .values_list("tournament_id", flat=True)
+            .distinct()
+        )
+        played = Q(home_participant__player_id__in=player_ids) | Q(away_participant__player_id__in=player_ids)
+        _remove_results(Game.objects.filter(played), ArchivedGame.objects.filter(played))
+        tournaments = Tournament.objects.filter(id__in=tournament_ids)
+        frozen = list(tournaments.filter(frozen_at__isnull=False).values_list("pk", flat=True))
+        deleted = cascade_delete(Player.objects.filter(id__in=player_ids))
+        _remove_events(tournament_ids, player_ids)
+
+        tournaments.repair_counters()
+        if frozen:
+            FinalStandings.objects.filter(tournament_id__in=frozen).delete()
+            Tournament.objects.filter(pk__in=frozen).update(frozen_at=None)
+            finished = Tournament.objects.with_actual_counts().filter(
+                pk__in=frozen, actual_status=TournamentStatus.FINISHED
+            )
+            for tournament_id in finished.values_list("pk", flat=True):
+                freeze_tournament(tournament_id)
+        tournaments.update(revision=F("revision") + 1)
+        status_cache.invalidate(tournament_ids)
+        for tournament_id in tournament_ids:
+            transaction.on_commit(partial(hub.publish, tournament_id))
+    return deleted
+
+
+def _remove_events(tournament_ids, player_ids):
+    """Drop the deleted players' games from the event log and re-snapshot the tournaments they were in."""
+    events = GameEvent.objects.filter(tournament_id__in=tournament_ids)
+    removed = events.filter(Q(home_player_id__in=player_ids) | Q(away_player_id__in=player_ids))
+    affected = list(removed.order_by("tournament_id").values_list("tournament_id", flat=True).distinct())
+    if not affected:
+        return
+    removed._raw_delete(removed.db)
+    StandingsSnapshot.objects.filter(tournament_id__in=affected)._raw_delete(StandingsSnapshot.objects.db)
+    for tournament_id in affected:
+        standings, last_event_id = rebuild_standings(tournament_id)
+        if last_event_id:
+            take_snapshot(tournament_id, standings, last_event_id)
+
+
+def _remove_results(*games):
+    """Take the games of the querysets out of the players' stats and ratings before they are deleted."""
+    if player_stats.remove_games(games) and not Job.objects.filter(
+        kind="recompute_ratings", status=JobStatus.QUEUED
+    ).exists():
+        # A replay that is already running may still see the deleted games
+        enqueue("recompute_ratings")
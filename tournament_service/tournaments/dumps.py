@@ -0,0 +1,363 @@
+"""
+Dumping and restoring the tournament data set.
+
+A dump is a gzipped tar archive holding a manifest.json followed by one CSV
+file per table. Only source data is dumped: players, tournaments,
+participants, games (live and archived) and the results event log. Derived
+rows (career statistics, final standings of frozen tournaments) are rebuilt
+after a restore; standings snapshots are left to the replay and standings
+checkpoints to `checkpoint_standings`.
+
+On PostgreSQL the CSV files are written and read with COPY. A restore that
+keeps the ids of a table copies its file straight into it; otherwise the file
+is loaded into a temporary table and moved over with a single INSERT ...
+SELECT that shifts the ids. Into an empty table, secondary indexes are built
+once after the load rather than updated row by row; foreign keys are checked
+in one pass after it as well, unless the table holds many more rows than the
+dump. Other backends go through the csv module and batched multi-row inserts.
+
+Restoring into a database that already holds data shifts every id of a table
+by an offset above the ids already in use, and every reference by the offset
+of the table it points to. Existing rows stay untouched and the restored rows
+keep their relations. Restoring into a fresh database keeps the ids.
+
+Empty CSV values are NULL in nullable columns and empty strings elsewhere.
+"""
+import codecs
+import csv
+import io
+import json
+import tarfile
+import tempfile
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from players.models import Player
+from players.stats import rebuild_all as rebuild_player_stats
+
+from .models import ArchivedGame, FinalStandings, Game, GameEvent, Tournament, TournamentParticipant
+from .standings import build_status, rows_by_tournament
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+DUMP_CHUNK_SIZE = 10000
+# CSV of ids and numbers compresses well already at the fastest level
+DUMP_COMPRESSLEVEL = 1
+RESTORE_BATCH_SIZE = 5000
+FINAL_STANDINGS_BATCH_SIZE = 500
+
+# (name, model, {column: id space it refers to}) in foreign key order. Archived
+# games keep the id of the game they were moved from, so they share its space.
+TABLES = [
+    ("players", Player, {"id": "players"}),
+    ("tournaments", Tournament, {"id": "tournaments"}),
+    (
+        "participants",
+        TournamentParticipant,
+        {"id": "participants", "tournament_id": "tournaments", "player_id": "players"},
+    ),
+    (
+        "games",
+        Game,
+        {
+            "id": "games",
+            "tournament_id": "tournaments",
+            "home_participant_id": "participants",
+            "away_participant_id": "participants",
+        },
+    ),
+    (
+        "archived_games",
+        ArchivedGame,
+        {
+            "id": "games",
+            "tournament_id": "tournaments",
+            "home_participant_id": "participants",
+            "away_participant_id": "participants",
+        },
+    ),
+    (
+        "game_events",
+        GameEvent,
+        {
+            "id": "game_events",
+            "tournament_id": "tournaments",
+            "game_id": "games",
+            "home_participant_id": "participants",
+            "away_participant_id": "participants",
+            "home_player_id": "players",
+            "away_player_id": "players",
+        },
+    ),
+]
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+# Dumping
+
+def _copy_out(cursor, model, columns, out) -> int:
+    select = f"SELECT {', '.join(map(_qn, columns))} FROM {_qn(model._meta.db_table)}"
+    cursor.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+    return cursor.rowcount
+
+
+def _write_csv(model, columns, out) -> int:
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    rows = 0
+    for row in model._base_manager.order_by().values_list(*attnames).iterator(chunk_size=DUMP_CHUNK_SIZE):
+        writer.writerow(["" if value is None else value for value in row])
+        rows += 1
+    text.flush()
+    text.detach()
+    return rows
+
+
+def dump_state(fileobj) -> dict:
+    """
+    Write a dump of all tables to the binary file object `fileobj` and return
+    its manifest. The tables are read in one transaction, so the dump is a
+    consistent snapshot.
+    """
+    manifest = {"format": FORMAT_VERSION, "created_at": timezone.now().isoformat(), "tables": []}
+    files = []
+    try:
+        outermost = not connection.in_atomic_block
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == "postgresql" and outermost:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            for name, model, _ in TABLES:
+                columns = _columns(model)
+                out = tempfile.TemporaryFile()
+                files.append(out)
+                if connection.vendor == "postgresql":
+                    rows = _copy_out(cursor, model, columns, out)
+                else:
+                    rows = _write_csv(model, columns, out)
+                manifest["tables"].append({"name": name, "file": f"{name}.csv", "columns": columns, "rows": rows})
+
+        # The manifest goes first so that restores can stream the archive
+        with tarfile.open(fileobj=fileobj, mode="w|gz", compresslevel=DUMP_COMPRESSLEVEL) as tar:
+            data = json.dumps(manifest, indent=2).encode()
+            info = tarfile.TarInfo(MANIFEST)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+            for table, out in zip(manifest["tables"], files):
+                info = tarfile.TarInfo(table["file"])
+                info.size = out.seek(0, io.SEEK_END)
+                out.seek(0)
+                tar.addfile(info, out)
+    finally:
+        for out in files:
+            out.close()
+    return manifest
+
+
+# Restoring
+
+def _check_manifest(manifest):
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dump format {manifest.get('format')!r}; expected {FORMAT_VERSION}.")
+    expected = [(name, _columns(model)) for name, model, _ in TABLES]
+    found = [(table["name"], table["columns"]) for table in manifest["tables"]]
+    if found != expected:
+        raise ValueError("The dump was taken from a different schema; migrate both databases to the same state.")
+
+
+def _id_offsets(cursor) -> dict:
+    """The offset of each id space: above every id in use, or 0 when it is unused."""
+    offsets = {}
+    for _, model, remap in TABLES:
+        table = model._meta.db_table
+        sql = f"SELECT COALESCE(MAX(id), 0) FROM {_qn(table)}"
+        params = []
+        if connection.vendor == "postgresql":
+            # Ids handed out by the sequence may still be referenced by the event log
+            sql = (
+                f"SELECT GREATEST(({sql}), COALESCE(pg_sequence_last_value("
+                f"pg_get_serial_sequence(%s, 'id')::regclass), 0))"
+            )
+            params = [table]
+        cursor.execute(sql, params)
+        space = remap["id"]
+        offsets[space] = max(offsets.get(space, 0), cursor.fetchone()[0])
+    return offsets
+
+
+def _secondary_indexes(cursor, table):
+    """Names and definitions of the indexes of `table` that do not back a constraint."""
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid)
+        """,
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _foreign_keys(cursor, table):
+    """Names and definitions of the foreign key constraints of `table`."""
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _copy_in(cursor, model, columns, remap, offsets, source, dumped: int) -> int:
+    table = _qn(model._meta.db_table)
+    staging = _qn(f"restore_{model._meta.db_table}")
+    column_list = ", ".join(map(_qn, columns))
+    nullable = [_qn(field.column) for field in model._meta.concrete_fields if field.null]
+    not_null = [_qn(field.column) for field in model._meta.concrete_fields if not field.null]
+
+    options = ["FORMAT csv", "HEADER"]
+    if nullable:
+        options.append(f"FORCE_NULL ({', '.join(nullable)})")
+    if not_null:
+        options.append(f"FORCE_NOT_NULL ({', '.join(not_null)})")
+
+    # Building an index once is much cheaper than updating it row by row, but
+    # only worth it when the table has no rows of its own. Checking a foreign
+    # key in one pass covers the rows already there as well, which pays off as
+    # long as there are not many more of them than `dumped` (going by the
+    # planner's estimate, unknown before the first ANALYZE).
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {table}), (SELECT reltuples FROM pg_class WHERE oid = %s::regclass)",
+        [model._meta.db_table],
+    )
+    populated, estimate = cursor.fetchone()
+    indexes = [] if populated else _secondary_indexes(cursor, model._meta.db_table)
+    defer_checks = not populated or 0 <= estimate <= dumped
+    foreign_keys = _foreign_keys(cursor, model._meta.db_table) if defer_checks else []
+    for name, _ in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {_qn(name)}")
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {_qn(name)}")
+
+    copy = f"FROM STDIN WITH ({', '.join(options)})"
+    if not any(offsets[remap[column]] for column in columns if column in remap):
+        cursor.copy_expert(f"COPY {table} ({column_list}) {copy}", source)
+        rows = cursor.rowcount
+    else:
+        cursor.execute(f"CREATE TEMPORARY TABLE {staging} AS SELECT {column_list} FROM {table} WITH NO DATA")
+        cursor.copy_expert(f"COPY {staging} ({column_list}) {copy}", source)
+        expressions = [f"{_qn(column)} + {int(offsets[remap[column]])}" if column in remap else _qn(column)
+                       for column in columns]
+        cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {', '.join(expressions)} FROM {staging}")
+        rows = cursor.rowcount
+        cursor.execute(f"DROP TABLE {staging}")
+
+    for _, definition in indexes:
+        cursor.execute(definition.replace(" ON ONLY ", " ON "))
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {_qn(name)} {definition}")
+    return rows
+
+
+def _insert_csv(model, columns, remap, offsets, source) -> int:
+    fields = model._meta.concrete_fields
+    # Archive members read in stream mode are not seekable, which TextIOWrapper needs
+    reader = csv.reader(codecs.iterdecode(source, "utf-8"))
+    next(reader)
+
+    def build(row):
+        values = {}
+        for field, column, value in zip(fields, columns, row):
+            if value == "" and field.null:
+                value = None
+            else:
+                value = field.to_python(value)
+                if column in remap:
+                    value += offsets[remap[column]]
+            values[field.attname] = value
+        return model(**values)
+
+    manager = model._base_manager
+    batch_size = min(RESTORE_BATCH_SIZE, connection.ops.bulk_batch_size(fields, [None] * RESTORE_BATCH_SIZE))
+    rows = 0
+    batch = []
+    for row in reader:
+        batch.append(build(row))
+        if len(batch) == batch_size:
+            # raw=True keeps auto_now_add columns as dumped, like loaddata does
+            manager._insert(batch, fields=fields, raw=True)
+            rows += len(batch)
+            batch = []
+    if batch:
+        manager._insert(batch, fields=fields, raw=True)
+        rows += len(batch)
+    return rows
+
+
+def _rebuild_final_standings(tournament_offset):
+    """Recreate the final standings of the restored frozen tournaments."""
+    frozen = Tournament.objects.filter(id__gt=tournament_offset, frozen_at__isnull=False).order_by("id")
+    ids = list(frozen.values_list("id", flat=True))
+    for start in range(0, len(ids), FINAL_STANDINGS_BATCH_SIZE):
+        tournaments = list(Tournament.objects.filter(id__in=ids[start:start + FINAL_STANDINGS_BATCH_SIZE]))
+        participants, games = rows_by_tournament([tournament.id for tournament in tournaments])
+        FinalStandings.objects.bulk_create(
+            FinalStandings(
+                tournament=tournament,
+                status=build_status(tournament, participants[tournament.id], games[tournament.id]),
+            )
+            for tournament in tournaments
+        )
+    return len(ids)
+
+
+def restore_state(fileobj) -> dict:
+    """
+    Load a dump written by `dump_state` from the binary file object `fileobj`,
+    in one transaction. Returns the number of restored rows per table and the
+    id offsets that were applied.
+    """
+    restored = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Deferred foreign key checks would keep indexes from being rebuilt
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        offsets = _id_offsets(cursor)
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+            members = iter(tar)
+            member = next(members, None)
+            if member is None or member.name != MANIFEST:
+                raise ValueError(f"Not a state dump: {MANIFEST} is missing.")
+            manifest = json.load(tar.extractfile(member))
+            _check_manifest(manifest)
+
+            for (name, model, remap), table in zip(TABLES, manifest["tables"]):
+                member = next(members, None)
+                if member is None or member.name != table["file"]:
+                    raise ValueError(f"The dump is incomplete: {table['file']} is missing.")
+                source = tar.extractfile(member)
+                if connection.vendor == "postgresql":
+                    restored[name] = _copy_in(cursor, model, table["columns"], remap, offsets, source, table["rows"])
+                else:
+                    restored[name] = _insert_csv(model, table["columns"], remap, offsets, source)
+
+        # New rows must not collide with the restored ids
+        models = [model for name, model, _ in TABLES if restored[name]]
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+        # Players without games need no career statistics row
+        if restored["games"] or restored["archived_games"]:
+            rebuild_player_stats()
+        _rebuild_final_standings(offsets["tournaments"])
+    return {"rows": restored, "offsets": offsets}
@@ -0,0 +1,200 @@
+"""
+Point-in-time standings.
+
+Every game has a `sequence`, its position among the tournament's games in the
+order the results were recorded, and a `played_at` that never decreases along
+the sequence. The standings as of sequence s are those of the games up to s;
+as of a time t, those of the games played at or before t, which are a prefix
+of the sequence as well.
+
+Folding every game up to s into the result matrices would make a query about
+the last rounds cost as much as computing the standings from scratch. Instead
+`record_games` stores a checkpoint of the tournament every
+`checkpoint_interval` games: the n x n grid of points the participants scored
+against each other, which is all the leaderboard and its tiebreakers are
+derived from (see `standings.results_matrices`). A query loads the latest
+checkpoint at or before the sequence and only the games recorded after it,
+at most one interval of them, and builds the payload with the same code as
+the current status.
+
+The grid is packed two bits per pairing (not played, lost, drawn, won). The
+interval is one round of the field, n // 2 games for n participants, and at
+most STANDINGS_CHECKPOINT_INTERVAL: a query reads the games of at most one
+round past its checkpoint, and a round-robin tournament gets a checkpoint
+after each of its n - 1 rounds, each n * n / 4 bytes.
+
+Leaderboards list the tournament's current participants. Participants added
+after a checkpoint start with an empty row, and the rows of deleted ones are
+dropped along with their games. Games saved outside of `record_games` do not
+create checkpoints, which only makes the following queries read a longer tail
+until `checkpoint_standings` rebuilds them.
+"""
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from .models import ArchivedGame, Game, StandingsCheckpoint
+from .standings import GAME_COLUMNS, participant_rows, results_matrices, status_from_matrices
+
+TAIL_COLUMNS = (*GAME_COLUMNS, "sequence", "played_at")
+
+
+def checkpoint_interval(participants_count: int) -> int:
+    """Number of games between two checkpoints of a tournament with this many participants."""
+    return max(min(settings.STANDINGS_CHECKPOINT_INTERVAL, participants_count // 2), 1)
+
+
+def pack_results(points, played) -> bytes:
+    """Pack a grid of single games, two bits per pairing: 0 not played, else points + 1."""
+    codes = np.where(played > 0, points + 1, 0).astype(np.uint8).ravel()
+    codes = np.concatenate([codes, np.zeros(-len(codes) % 4, dtype=np.uint8)]).reshape(-1, 4)
+    return (codes[:, 0] | codes[:, 1] << 2 | codes[:, 2] << 4 | codes[:, 3] << 6).tobytes()
+
+
+def unpack_results(data, n: int):
+    """The (points, played) matrices of a grid packed by `pack_results`."""
+    packed = np.frombuffer(bytes(data), dtype=np.uint8)
+    codes = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1).ravel()[:n * n]
+    codes = codes.reshape(n, n).astype(np.int64)
+    return np.maximum(codes - 1, 0), (codes > 0).astype(np.int64)
+
+
+def _checkpoint_grid(checkpoint, participant_ids):
+    """
+    The (points, played) matrices of a checkpoint, re-indexed by the sorted
+    `participant_ids`: rows of participants that no longer exist are dropped.
+    """
+    n = len(participant_ids)
+    points = np.zeros((n, n), dtype=np.int64)
+    played = np.zeros((n, n), dtype=np.int64)
+    if checkpoint is None or n == 0 or not checkpoint.participant_ids:
+        return points, played
+
+    stored_ids = np.asarray(checkpoint.participant_ids, dtype=np.int64)
+    stored_points, stored_played = unpack_results(checkpoint.results, len(stored_ids))
+    ids = np.asarray(participant_ids, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(ids, stored_ids), n - 1)
+    keep = np.flatnonzero(ids[positions] == stored_ids)
+    rows = positions[keep]
+    points[np.ix_(rows, rows)] = stored_points[np.ix_(keep, keep)]
+    played[np.ix_(rows, rows)] = stored_played[np.ix_(keep, keep)]
+    return points, played
+
+
+def _tail(tournament_id, **filters):
+    """Games of a tournament (live or archived) matching `filters`, ordered by sequence."""
+    rows = Game.objects.filter(tournament_id=tournament_id, **filters).values_list(*TAIL_COLUMNS).union(
+        ArchivedGame.objects.filter(tournament_id=tournament_id, **filters).values_list(*TAIL_COLUMNS),
+        all=True,
+    )
+    return sorted(rows, key=lambda row: row[4])
+
+
+def status_as_of(tournament, sequence=None, at=None, **selection):
+    """
+    Status payload of a tournament after the games up to `sequence`, or the
+    games played at or before the datetime `at`. The payload has an `as_of`
+    member with the sequence and time of the last game it includes.
+    See `select_entries` for the `selection` arguments.
+    """
+    checkpoints = StandingsCheckpoint.objects.filter(tournament_id=tournament.id)
+    if at is not None:
+        checkpoint = checkpoints.filter(played_at__lte=at).order_by("-sequence").first()
+        filters = {"played_at__lte": at}
+        # The games played by then end before the next checkpoint
+        following = checkpoints.filter(played_at__gt=at).order_by("sequence").values_list("sequence", flat=True)
+        if (end := following.first()) is not None:
+            filters["sequence__lt"] = end
+    else:
+        checkpoint = checkpoints.filter(sequence__lte=sequence).order_by("-sequence").first()
+        filters = {"sequence__lte": sequence}
+    if checkpoint is not None:
+        filters["sequence__gt"] = checkpoint.sequence
+
+    participants = sorted(participant_rows(tournament.id))
+    participant_ids = [p[0] for p in participants]
+    tail = _tail(tournament.id, **filters)
+
+    points, played = _checkpoint_grid(checkpoint, participant_ids)
+    tail_points, tail_wins, tail_draws, tail_played = results_matrices(participant_ids, [row[:4] for row in tail])
+    matrices = (
+        points + tail_points,
+        (points == 2) * played + tail_wins,
+        (points == 1) * played + tail_draws,
+        played + tail_played,
+    )
+
+    if tail:
+        last_sequence, last_played_at = tail[-1][4:]
+    elif checkpoint is not None:
+        last_sequence, last_played_at = checkpoint.sequence, checkpoint.played_at
+    else:
+        last_sequence, last_played_at = 0, None
+
+    games_played = int(matrices[3].sum()) // 2
+    payload = status_from_matrices(tournament, participants, matrices, games_played, **selection)
+    payload["as_of"] = {"sequence": last_sequence, "played_at": last_played_at}
+    return payload
+
+
+def write_checkpoints(tournament_id: int, targets) -> int:
+    """
+    Store checkpoints of a tournament at each of the ascending sequences in
+    `targets`, starting from its latest checkpoint before them. Returns the
+    number of checkpoints stored.
+    """
+    if not targets:
+        return 0
+    participant_ids = sorted(p[0] for p in participant_rows(tournament_id))
+    checkpoint = (
+        StandingsCheckpoint.objects.filter(tournament_id=tournament_id, sequence__lt=targets[0])
+        .order_by("-sequence")
+        .first()
+    )
+    points, played = _checkpoint_grid(checkpoint, participant_ids)
+    played_at = checkpoint.played_at if checkpoint is not None else None
+    since = checkpoint.sequence if checkpoint is not None else 0
+    games = iter(_tail(tournament_id, sequence__gt=since, sequence__lte=targets[-1]))
+
+    checkpoints = []
+    game = next(games, None)
+    for target in targets:
+        segment = []
+        while game is not None and game[4] <= target:
+            segment.append(game[:4])
+            played_at = game[5]
+            game = next(games, None)
+        segment_points, _, _, segment_played = results_matrices(participant_ids, segment)
+        points += segment_points
+        played += segment_played
+        # Pairings played twice (written behind the API's back) do not fit in
+        # two bits; queries then read the games instead
+        if played_at is None or played.max(initial=0) > 1:
+            continue
+        checkpoints.append(
+            StandingsCheckpoint(
+                tournament_id=tournament_id,
+                sequence=target,
+                played_at=played_at,
+                participant_ids=participant_ids,
+                results=pack_results(points, played),
+            )
+        )
+    StandingsCheckpoint.objects.bulk_create(checkpoints, ignore_conflicts=True)
+    return len(checkpoints)
+
+
+def checkpoints_due(participants_count: int, first_sequence: int, last_sequence: int) -> list:
+    """The sequences in [first_sequence, last_sequence] that get a checkpoint."""
+    interval = checkpoint_interval(participants_count)
+    return list(range(-(-first_sequence // interval) * interval, last_sequence + 1, interval))
+
+
+def rebuild_checkpoints(tournament_id: int, participants_count: int) -> int:
+    """Replace all checkpoints of a tournament with ones computed from its games."""
+    StandingsCheckpoint.objects.filter(tournament_id=tournament_id).delete()
+    last_sequence = max(
+        model.objects.filter(tournament_id=tournament_id).aggregate(last=Max("sequence"))["last"] or 0
+        for model in (Game, ArchivedGame)
+    )
+    return write_checkpoints(tournament_id, checkpoints_due(participants_count, 1, last_sequence))
@@ -0,0 +1,155 @@
+"""
+Write-behind ingestion of game results.
+
+Clients that send `Prefer: respond-async` to add_game_result get their result
+checked against the rows it names (tournament, participants, winner) and
+stored in the queued games table; the response is a 202 with the URL to poll.
+Recording the game with everything derived from it is left to the
+`ingest_game_results` worker.
+
+The worker claims a batch of queued results with SELECT ... FOR UPDATE SKIP
+LOCKED, so several workers can drain the queue side by side, and records the
+whole batch in one transaction with `record_games`: a burst of results costs a
+handful of statements and one commit per batch instead of per request.
+Every result is checked again against the batch's tournaments, locked in id
+order, together with the results accepted before it in the same batch; the
+rejected ones are marked with the reason and do not affect the others.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Game, QueuedGameResult, QueuedGameStatus, Tournament, TournamentParticipant
+from .services import GameRejected, check_game_result, record_games, validate_game_result
+
+
+def queue_game_result(tournament, home_id: int, away_id: int, winner) -> QueuedGameResult:
+    """Validate a game result without the pairing lookup and queue it for the worker."""
+    validate_game_result(tournament, home_id, away_id, winner, check_existing=False)
+    return QueuedGameResult.objects.create(
+        tournament=tournament, home_participant_id=home_id, away_participant_id=away_id, winner=winner
+    )
+
+
+def ingest_batch(batch_size: int) -> dict:
+    """
+    Record up to `batch_size` queued results, oldest first, in one transaction.
+    Returns the number of results recorded and rejected.
+    """
+    counts = {QueuedGameStatus.RECORDED: 0, QueuedGameStatus.REJECTED: 0}
+    with transaction.atomic():
+        batch = list(
+            QueuedGameResult.objects.select_for_update(skip_locked=True)
+            .filter(status=QueuedGameStatus.QUEUED)
+            .order_by("id")[:batch_size]
+        )
+        if not batch:
+            return counts
+
+        tournament_ids = sorted({queued.tournament_id for queued in batch})
+        # Locked so that results for the same tournament (from other workers
+        # or the synchronous endpoint) are checked and recorded one at a time
+        tournaments = {
+            tournament.id: tournament
+            for tournament in Tournament.objects.select_for_update().filter(id__in=tournament_ids).order_by("id")
+        }
+        participant_ids = {queued.home_participant_id for queued in batch} | {
+            queued.away_participant_id for queued in batch
+        }
+        # Not deleted while the batch is being recorded
+        participants = {
+            participant.id: participant
+            for participant in TournamentParticipant.objects.select_for_update(no_key=True)
+            .filter(id__in=participant_ids)
+            .order_by("id")
+        }
+        played_pairs = defaultdict(set)
+        for tournament_id, home_id, away_id in Game.objects.filter(tournament_id__in=tournament_ids).values_list(
+            "tournament_id", "home_participant_id", "away_participant_id"
+        ):
+            played_pairs[tournament_id].add(frozenset((home_id, away_id)))
+        participant_counts = dict(
+            TournamentParticipant.objects.filter(tournament_id__in=tournament_ids)
+            .order_by()
+            .values("tournament_id")
+            .annotate(count=Count("id"))
+            .values_list("tournament_id", "count")
+        )
+
+        now = timezone.now()
+        accepted = []
+        for queued in batch:
+            tournament = tournaments[queued.tournament_id]
+            try:
+                home_participant, away_participant, home_score, away_score = check_game_result(
+                    tournament,
+                    participants,
+                    queued.home_participant_id,
+                    queued.away_participant_id,
+                    queued.winner,
+                    played_pairs[tournament.id],
+                )
+            except GameRejected as exc:
+                queued.status, queued.detail = QueuedGameStatus.REJECTED, exc.detail
+            else:
+                queued.status = QueuedGameStatus.RECORDED
+                accepted.append(
+                    (
+                        queued,
+                        Game(
+                            tournament=tournament,
+                            home_participant=home_participant,
+                            away_participant=away_participant,
+                            home_score=home_score,
+                            away_score=away_score,
+                        ),
+                    )
+                )
+                pairs = played_pairs[tournament.id]
+                pairs.add(frozenset((home_participant.id, away_participant.id)))
+                n = participant_counts.get(tournament.id, 0)
+                if len(pairs) == n * (n - 1) // 2:
+                    # record_games freezes it; later results of the batch are rejected like
+                    # results arriving after the commit
+                    tournament.frozen_at = now
+            queued.processed_at = now
+            counts[queued.status] += 1
+
+        if accepted:
+            games = record_games([game for _, game in accepted])
+            for (queued, _), game in zip(accepted, games):
+                queued.game_id = game.id
+        _write_outcomes(batch)
+    return counts
+
+
+def _write_outcomes(batch):
+    if connection.vendor != "postgresql":
+        QueuedGameResult.objects.bulk_update(batch, ["status", "detail", "game_id", "processed_at"])
+        return
+    # One row per result instead of a CASE branch per result and column
+    table = connection.ops.quote_name(QueuedGameResult._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS q
+            SET status = v.status, detail = v.detail, game_id = v.game_id, processed_at = %s
+            FROM unnest(%s::bigint[], %s::varchar[], %s::varchar[], %s::bigint[]) AS v(id, status, detail, game_id)
+            WHERE q.id = v.id
+            """,
+            [
+                batch[0].processed_at,
+                [queued.id for queued in batch],
+                [queued.status for queued in batch],
+                [queued.detail for queued in batch],
+                [queued.game_id for queued in batch],
+            ],
+        )
+
+
+def purge_processed(before) -> int:
+    """Delete recorded and rejected results processed before `before`."""
+    deleted, _ = QueuedGameResult.objects.filter(processed_at__lt=before).delete()
+    return deleted
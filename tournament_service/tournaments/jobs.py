@@ -0,0 +1,40 @@
+"""Background jobs of the tournaments app, run by `manage.py run_jobs`."""
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.registry import job, run_command
+
+from .dumps import dump_state
+
+
+@job("rebuild_standings")
+def rebuild_standings(tournament: int | None = None, snapshot: bool = False, verify: bool = False):
+    return run_command("rebuild_standings", tournament=tournament, snapshot=snapshot, verify=verify)
+
+
+@job("checkpoint_standings")
+def checkpoint_standings(tournament: int | None = None):
+    return run_command("checkpoint_standings", tournament=tournament)
+
+
+@job("purge_tournaments")
+def purge_tournaments(days: int, status: str | None = None, chunk_size: int = 100):
+    return run_command("purge_tournaments", days=days, status=status, chunk_size=chunk_size)
+
+
+@job("archive_finished_tournaments")
+def archive_finished_tournaments(days: int = 30):
+    return run_command("archive_finished_tournaments", days=days)
+
+
+@job("export_state", max_attempts=1)
+def export_state():
+    """Dump the data set (see dump_state) into a new archive in JOB_EXPORT_DIR."""
+    directory = Path(settings.JOB_EXPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"state-{timezone.now():%Y%m%dT%H%M%S%f}.tar.gz"
+    with open(path, "wb") as fileobj:
+        manifest = dump_state(fileobj)
+    return {"path": str(path), "tables": manifest["tables"]}
@@ -0,0 +1,158 @@
+"""
+Live leaderboard streaming (Server-Sent Events).
+
+A single `LeaderboardHub` per process keeps, for every tournament that has at
+least one connected client, the latest status payload. Writes to a tournament
+trigger one recomputation whose result is fanned out to all of its
+subscribers; idle connections only wait on a condition and cost no database
+work.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Tournament
+from .standings import current_status
+
+
+def load_leaderboard(tournament_id: int):
+    """Return (revision, status payload) of a tournament, or None if it is gone."""
+    try:
+        tournament = Tournament.objects.select_related("final_standings").get(id=tournament_id)
+    except Tournament.DoesNotExist:
+        return None
+    return tournament.revision, current_status(tournament)
+
+
+def leaderboard_diff(previous, current):
+    """
+    Describe the changes between two status payloads.
+
+    Contains the top-level counters, the leaderboard entries that are new or
+    changed, the ids of players that left and the new leaderboard order.
+    """
+    before = {entry["player_id"]: entry for entry in previous["leaderboard"]}
+    after = {entry["player_id"]: entry for entry in current["leaderboard"]}
+
+    diff = {key: value for key, value in current.items() if key != "leaderboard"}
+    diff["changed"] = [entry for player_id, entry in after.items() if before.get(player_id) != entry]
+    diff["removed"] = [player_id for player_id in before if player_id not in after]
+    diff["order"] = [entry["player_id"] for entry in current["leaderboard"]]
+    return diff
+
+
+def format_event(event: str, data, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class _Channel:
+    def __init__(self):
+        self.subscribers = 0
+        self.version = 0
+        self.revision = None
+        self.payload = None
+        self.deleted = False
+        self.changed = asyncio.Condition()
+        self.refresh_task = None
+        self.dirty = False
+
+
+class LeaderboardHub:
+    def __init__(self, loader=load_leaderboard):
+        self._loader = sync_to_async(loader)
+        self._loop = None
+        self._channels = {}
+
+    def publish(self, tournament_id: int):
+        """
+        Signal that a tournament changed. Safe to call from any thread; does
+        nothing when nobody in this process is watching the tournament.
+        """
+        loop = self._loop
+        if loop is None or tournament_id not in self._channels or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._schedule_refresh, tournament_id)
+
+    def _schedule_refresh(self, tournament_id: int):
+        channel = self._channels.get(tournament_id)
+        if channel is None:
+            return
+        if channel.refresh_task is not None and not channel.refresh_task.done():
+            # A recomputation is running; repeat it once it is done
+            channel.dirty = True
+            return
+        channel.refresh_task = asyncio.ensure_future(self._refresh(tournament_id, channel))
+
+    async def _refresh(self, tournament_id: int, channel: _Channel):
+        while True:
+            channel.dirty = False
+            result = await self._loader(tournament_id)
+            async with channel.changed:
+                if result is None:
+                    channel.deleted = True
+                elif result[0] != channel.revision or channel.payload is None:
+                    channel.revision, channel.payload = result
+                channel.version += 1
+                channel.changed.notify_all()
+            if not channel.dirty:
+                return
+
+    async def subscribe(self, tournament_id: int):
+        """
+        Async generator of SSE messages for one client: the full leaderboard
+        first, then a diff after every change, with keep-alive comments in
+        between.
+        """
+        self._loop = asyncio.get_running_loop()
+        channel = self._channels.setdefault(tournament_id, _Channel())
+        channel.subscribers += 1
+        try:
+            if channel.payload is None and not channel.deleted:
+                if channel.refresh_task is None or channel.refresh_task.done():
+                    channel.refresh_task = asyncio.ensure_future(self._refresh(tournament_id, channel))
+                await asyncio.shield(channel.refresh_task)
+
+            sent_version, sent_revision, sent_payload = None, None, None
+            while True:
+                if channel.deleted:
+                    yield format_event("deleted", {"tournament_id": tournament_id})
+                    return
+
+                if channel.version != sent_version:
+                    # Capture the state before yielding: it may change while suspended
+                    version, revision, payload = channel.version, channel.revision, channel.payload
+                    if sent_payload is None:
+                        message = format_event("leaderboard", payload, revision)
+                    elif revision != sent_revision:
+                        message = format_event("diff", leaderboard_diff(sent_payload, payload), revision)
+                    else:
+                        message = None
+                    sent_version, sent_revision, sent_payload = version, revision, payload
+                    if message is not None:
+                        yield message
+
+                timed_out = False
+                async with channel.changed:
+                    try:
+                        await asyncio.wait_for(
+                            channel.changed.wait_for(lambda: channel.version != sent_version),
+                            timeout=settings.LIVE_STREAM_KEEPALIVE,
+                        )
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                if timed_out:
+                    yield ": keepalive\n\n"
+        finally:
+            channel.subscribers -= 1
+            if channel.subscribers == 0:
+                self._channels.pop(tournament_id, None)
+
+
+hub = LeaderboardHub()
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tournaments.models import ArchivedGame, Game, Tournament, TournamentStatus
+from tournaments.services import freeze_tournament
+
+ARCHIVE_BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the games of tournaments that finished more than --days days ago "
+        "from the games table into the archive table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Only archive tournaments frozen at least this many days ago (default 30).",
+        )
+
+    def handle(self, *args, **options):
+        # Tournaments finished before freezing existed (or behind the API's back)
+        unfrozen = Tournament.objects.filter(status=TournamentStatus.FINISHED, frozen_at__isnull=True)
+        frozen = 0
+        for tournament_id in unfrozen.values_list("id", flat=True).iterator():
+            freeze_tournament(tournament_id)
+            frozen += 1
+        if frozen:
+            self.stdout.write(f"Froze {frozen} finished tournaments.")
+
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        candidates = list(
+            Tournament.objects.filter(frozen_at__lte=cutoff)
+            .filter(Exists(Game.objects.filter(tournament=OuterRef("pk"))))
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        archived = 0
+        for start in range(0, len(candidates), ARCHIVE_BATCH_SIZE):
+            archived += self._archive(candidates[start:start + ARCHIVE_BATCH_SIZE])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {archived} games of {len(candidates)} tournaments.")
+        )
+
+    def _archive(self, tournament_ids):
+        """Copy the games of the tournaments into the archive and delete them, atomically."""
+        qn = connection.ops.quote_name
+        game_table = qn(Game._meta.db_table)
+        archive_table = qn(ArchivedGame._meta.db_table)
+        columns = (
+            "id, tournament_id, home_participant_id, away_participant_id, home_score, away_score, sequence, played_at"
+        )
+        placeholders = ", ".join(["%s"] * len(tournament_ids))
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {archive_table} ({columns}, archived_at)
+                SELECT {columns}, %s FROM {game_table}
+                WHERE tournament_id IN ({placeholders})
+                """,
+                [timezone.now(), *tournament_ids],
+            )
+            cursor.execute(
+                f"DELETE FROM {game_table} WHERE tournament_id IN ({placeholders})",
+                tournament_ids,
+            )
+            return cursor.rowcount
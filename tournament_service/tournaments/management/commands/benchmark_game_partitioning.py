@@ -0,0 +1,149 @@
+import random
+import statistics
+import time
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from players.models import Player
+from tournaments.models import Game, Tournament, TournamentParticipant, TournamentStatus
+from tournaments.partitioning import DEFAULT_PARTITIONS, is_partitioned, partition_games
+from tournaments.standings import compute_status
+
+SEED_BATCH_SIZE = 1000
+PLAYERS_PER_TOURNAMENT = 5
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure status query and bulk delete latency on a plain and on a partitioned "
+        "games table (PostgreSQL only). Seeds synthetic tournaments, runs both phases "
+        "and rolls everything back. Meant for a local database: the games table stays "
+        "locked while it runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tournaments", type=int, default=20000, help="Synthetic tournaments to seed.")
+        parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS)
+        parser.add_argument("--samples", type=int, default=200, help="Status queries per phase.")
+        parser.add_argument("--delete-batches", type=int, default=20, help="Bulk deletes per phase.")
+        parser.add_argument("--delete-size", type=int, default=50, help="Tournaments per bulk delete.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for picking tournaments.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The partitioning benchmark requires PostgreSQL.")
+        if is_partitioned():
+            raise CommandError("The games table is already partitioned; nothing to compare against.")
+
+        needed = 2 * options["delete_batches"] * options["delete_size"]
+        if options["tournaments"] < needed:
+            raise CommandError(f"--tournaments must be at least {needed} for the requested deletes.")
+
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            started = time.perf_counter()
+            tournament_ids = self._seed(options["tournaments"])
+            self._analyze()
+            self.stdout.write(
+                f"Seeded {len(tournament_ids)} tournaments with "
+                f"{len(tournament_ids) * PLAYERS_PER_TOURNAMENT * (PLAYERS_PER_TOURNAMENT - 1) // 2} games "
+                f"in {time.perf_counter() - started:.1f}s "
+                f"({Game.objects.count()} games in the table)."
+            )
+
+            rng.shuffle(tournament_ids)
+            half = len(tournament_ids) // 2
+            phases = [("plain", tournament_ids[:half]), ("partitioned", tournament_ids[half:])]
+
+            for name, ids in phases:
+                if name == "partitioned":
+                    started = time.perf_counter()
+                    partition_games(options["partitions"])
+                    self.stdout.write(
+                        f"Partitioned into {options['partitions']} partitions "
+                        f"in {time.perf_counter() - started:.1f}s."
+                    )
+                self._report(name, "status query", self._time_status(rng.sample(ids, options["samples"])))
+                delete_ids = ids[-options["delete_batches"] * options["delete_size"]:]
+                self._report(
+                    name,
+                    f"delete {options['delete_size']} tournaments",
+                    self._time_deletes(delete_ids, options["delete_size"]),
+                )
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark data rolled back."))
+
+    def _seed(self, count):
+        players = Player.objects.bulk_create(
+            [Player(name=f"Benchmark player {i}") for i in range(PLAYERS_PER_TOURNAMENT)]
+        )
+        total_games = PLAYERS_PER_TOURNAMENT * (PLAYERS_PER_TOURNAMENT - 1) // 2
+        tournament_ids = []
+        for start in range(0, count, SEED_BATCH_SIZE):
+            tournaments = Tournament.objects.bulk_create(
+                [
+                    Tournament(
+                        name=f"Benchmark {i}",
+                        participants_count=PLAYERS_PER_TOURNAMENT,
+                        games_played=total_games,
+                        status=TournamentStatus.FINISHED,
+                    )
+                    for i in range(start, min(start + SEED_BATCH_SIZE, count))
+                ]
+            )
+            participants = TournamentParticipant.objects.bulk_create(
+                [TournamentParticipant(tournament=t, player=p) for t in tournaments for p in players]
+            )
+            games = []
+            now = timezone.now()
+            for i, tournament in enumerate(tournaments):
+                field = participants[i * PLAYERS_PER_TOURNAMENT:(i + 1) * PLAYERS_PER_TOURNAMENT]
+                for sequence, (home, away) in enumerate(combinations(field, 2), start=1):
+                    games.append(
+                        Game(tournament=tournament, home_participant=home, away_participant=away,
+                             home_score=2, away_score=0, sequence=sequence, played_at=now)
+                    )
+            Game.objects.bulk_create(games)
+            tournament_ids.extend(t.id for t in tournaments)
+        return tournament_ids
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            for model in (Tournament, TournamentParticipant, Game):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+    def _time_status(self, tournament_ids):
+        tournaments = Tournament.objects.in_bulk(tournament_ids)
+        timings = []
+        for tournament_id in tournament_ids:
+            started = time.perf_counter()
+            compute_status(tournaments[tournament_id])
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def _time_deletes(self, tournament_ids, size):
+        table = connection.ops.quote_name(Game._meta.db_table)
+        timings = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(tournament_ids), size):
+                batch = tournament_ids[start:start + size]
+                placeholders = ", ".join(["%s"] * len(batch))
+                started = time.perf_counter()
+                cursor.execute(f"DELETE FROM {table} WHERE tournament_id IN ({placeholders})", batch)
+                timings.append(time.perf_counter() - started)
+        return timings
+
+    def _report(self, phase, label, timings):
+        milliseconds = sorted(t * 1000 for t in timings)
+        if len(milliseconds) > 1:
+            p95 = statistics.quantiles(milliseconds, n=20, method="inclusive")[18]
+        else:
+            p95 = milliseconds[0]
+        self.stdout.write(
+            f"{phase:>11} | {label:<24} | n={len(milliseconds):<4} "
+            f"p50 {statistics.median(milliseconds):8.2f} ms | p95 {p95:8.2f} ms | max {milliseconds[-1]:8.2f} ms"
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tournaments.history import rebuild_checkpoints
+from tournaments.models import Tournament
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the standings checkpoints that point-in-time status queries start from, "
+        "from the games of each tournament (e.g. after a restore or for games created "
+        "before checkpoints existed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tournament", type=int, help="Only rebuild the checkpoints of this tournament.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        tournaments = Tournament.objects.filter(games_played__gt=0)
+        if options["tournament"] is not None:
+            tournaments = Tournament.objects.filter(id=options["tournament"])
+            if not tournaments.exists():
+                raise CommandError(f"Tournament {options['tournament']} does not exist.")
+
+        rebuilt = checkpoints = 0
+        for tournament_id, participants_count in tournaments.order_by("id").values_list("id", "participants_count"):
+            # One tournament per transaction; its checkpoints are never missing halfway
+            with transaction.atomic():
+                checkpoints += rebuild_checkpoints(tournament_id, participants_count)
+            rebuilt += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored {checkpoints} checkpoints of {rebuilt} tournaments in {elapsed:.2f}s.")
+        )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tournaments.dumps import dump_state
+
+
+class Command(BaseCommand):
+    help = (
+        "Dump all players, tournaments, participants, games and game events into a "
+        "gzipped tar archive of CSV files (restore it with restore_state)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archive file to write, e.g. state.tar.gz.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with open(options["path"], "wb") as fileobj:
+            manifest = dump_state(fileobj)
+        elapsed = time.perf_counter() - started
+
+        rows = 0
+        for table in manifest["tables"]:
+            self.stdout.write(f"{table['name']:>15}: {table['rows']} rows")
+            rows += table["rows"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dumped {rows} rows to {options['path']} in {elapsed:.1f}s ({rows / max(elapsed, 1e-6):.0f} rows/s)."
+            )
+        )
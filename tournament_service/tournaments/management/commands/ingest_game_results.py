@@ -0,0 +1,67 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tournaments.ingest import ingest_batch, purge_processed
+from tournaments.models import QueuedGameStatus
+
+# Seconds between deletions of old processed results while the queue is empty
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Record the game results queued by add_game_result (Prefer: respond-async), "
+        "one transaction per batch. Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.GAME_INGEST_BATCH_SIZE,
+            help=f"Results recorded per transaction (default {settings.GAME_INGEST_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.GAME_INGEST_POLL_INTERVAL,
+            help=f"Seconds to wait while the queue is empty (default {settings.GAME_INGEST_POLL_INTERVAL}).",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=7,
+            help="Delete processed results older than this many days while idle (default 7).",
+        )
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        recorded = rejected = 0
+        purged_at = None
+        while True:
+            started = time.perf_counter()
+            counts = ingest_batch(options["batch_size"])
+            batch = sum(counts.values())
+            if batch:
+                recorded += counts[QueuedGameStatus.RECORDED]
+                rejected += counts[QueuedGameStatus.REJECTED]
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"Recorded {counts[QueuedGameStatus.RECORDED]} and rejected "
+                    f"{counts[QueuedGameStatus.REJECTED]} results in {elapsed:.2f} s "
+                    f"({batch / elapsed:.0f} results/s)."
+                )
+                continue
+
+            if purged_at is None or time.monotonic() - purged_at > PURGE_INTERVAL:
+                purge_processed(timezone.now() - timedelta(days=options["keep_days"]))
+                purged_at = time.monotonic()
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Recorded {recorded} and rejected {rejected} results."))
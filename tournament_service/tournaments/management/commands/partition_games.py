@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tournaments.partitioning import (
+    DEFAULT_PARTITIONS,
+    is_partitioned,
+    partition_count,
+    partition_games,
+    unpartition_games,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hash-partition the games table by tournament (PostgreSQL only). The table is "
+        "locked and rewritten in one transaction; run it during a maintenance window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=DEFAULT_PARTITIONS,
+            help=f"Number of hash partitions (default {DEFAULT_PARTITIONS}).",
+        )
+        parser.add_argument(
+            "--revert",
+            action="store_true",
+            help="Convert a partitioned games table back into a plain table.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning the games table requires PostgreSQL.")
+
+        started = time.perf_counter()
+        if options["revert"]:
+            if not is_partitioned():
+                raise CommandError("The games table is not partitioned.")
+            unpartition_games()
+            message = "Converted the games table back into a plain table"
+        else:
+            partitions = options["partitions"]
+            if partitions < 2:
+                raise CommandError("--partitions must be at least 2.")
+            if is_partitioned():
+                raise CommandError(
+                    f"The games table is already partitioned ({partition_count()} partitions); "
+                    "use --revert first to change the number of partitions."
+                )
+            partition_games(partitions)
+            message = f"Partitioned the games table into {partitions} partitions"
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{message} in {elapsed:.1f}s."))
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tournaments.deletion import delete_tournaments
+from tournaments.models import Tournament, TournamentStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete tournaments created more than --days days ago, with all their "
+        "participants and games, in chunks of --chunk-size tournaments per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, required=True, help="Minimum age in days.")
+        parser.add_argument(
+            "--status",
+            choices=TournamentStatus.values,
+            help="Only delete tournaments with this status.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Tournaments deleted per transaction (default 100).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to wait between chunks, to leave room for other writers.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        candidates = Tournament.objects.filter(created_at__lt=timezone.now() - timedelta(days=options["days"]))
+        if options["status"]:
+            candidates = candidates.filter(status=options["status"])
+
+        deleted = 0
+        last_id = 0
+        while True:
+            # Keyset pagination keeps every chunk lookup an index range scan
+            chunk = list(
+                candidates.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:options["chunk_size"]]
+            )
+            if not chunk:
+                break
+            deleted += delete_tournaments(chunk)
+            last_id = chunk[-1]
+            self.stdout.write(f"Deleted {deleted} tournaments so far.")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} tournaments."))
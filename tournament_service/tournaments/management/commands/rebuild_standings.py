@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tournaments.models import StandingsSnapshot, Tournament
+from tournaments.replay import rebuild_all, rebuild_standings, standings_to_snapshot
+from tournaments.standings import build_leaderboard, game_rows, participant_rows
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild tournament standings from the results event log, starting from "
+        "each tournament's latest snapshot. Optionally store new snapshots and "
+        "verify the result against the games table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tournament", type=int, help="Only rebuild this tournament.")
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="Store the rebuilt standings as new snapshots.",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Compare the rebuilt standings with the ones computed from the games table.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        if options["tournament"] is not None:
+            tournament_id = options["tournament"]
+            if not Tournament.objects.filter(id=tournament_id).exists():
+                raise CommandError(f"Tournament {tournament_id} does not exist.")
+            standings, last_event_id = rebuild_standings(tournament_id)
+            results = [(tournament_id, standings, last_event_id, True)]
+        else:
+            results = rebuild_all()
+
+        rebuilt = mismatched = 0
+        pending = []
+        for tournament_id, standings, last_event_id, changed in results:
+            rebuilt += 1
+            if options["snapshot"] and changed and last_event_id:
+                pending.append(
+                    StandingsSnapshot(
+                        tournament_id=tournament_id,
+                        last_event_id=last_event_id,
+                        standings=standings_to_snapshot(standings),
+                    )
+                )
+                if len(pending) >= SNAPSHOT_BATCH_SIZE:
+                    StandingsSnapshot.objects.bulk_create(pending)
+                    pending = []
+            if options["verify"] and not self._matches_games(tournament_id, standings):
+                mismatched += 1
+                self.stdout.write(self.style.WARNING(
+                    f"Tournament {tournament_id}: event log does not match the games table."
+                ))
+
+        if pending:
+            StandingsSnapshot.objects.bulk_create(pending)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt standings of {rebuilt} tournaments in {elapsed:.2f}s."))
+        if options["verify"] and mismatched:
+            raise CommandError(f"{mismatched} tournaments differ from the games table.")
+
+    def _matches_games(self, tournament_id, standings):
+        games = game_rows(tournament_id)
+        expected = {
+            entry["player_id"]: [
+                entry["points"], entry["wins"], entry["draws"], entry["losses"], entry["games_played"]
+            ]
+            for entry in build_leaderboard(participant_rows(tournament_id), games, [])
+            if entry["games_played"]
+        }
+        return expected == standings
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+
+from tournaments.models import Tournament
+
+REPAIR_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the participant/game counters and status stored on each tournament "
+        "against the participant and game rows, and repair any that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report inconsistent tournaments; exit with an error if there are any.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Tournament.objects.with_actual_counts()
+            .filter(
+                ~Q(participants_count=F("actual_participants_count"))
+                | ~Q(games_played=F("actual_games_played"))
+                | ~Q(status=F("actual_status"))
+            )
+            .values_list(
+                "id",
+                "participants_count",
+                "actual_participants_count",
+                "games_played",
+                "actual_games_played",
+                "status",
+                "actual_status",
+            )
+        )
+
+        repaired = 0
+        batch = []
+        for row in drifted.iterator():
+            tournament_id, participants, actual_participants, games, actual_games, status, actual_status = row
+            self.stdout.write(
+                f"Tournament {tournament_id}: participants {participants} -> {actual_participants}, "
+                f"games {games} -> {actual_games}, status {status} -> {actual_status}"
+            )
+            batch.append(tournament_id)
+            if not options["check"] and len(batch) >= REPAIR_BATCH_SIZE:
+                repaired += self._repair(batch)
+                batch = []
+
+        if options["check"]:
+            if batch:
+                raise CommandError(f"{len(batch)} tournaments have inconsistent counters.")
+            self.stdout.write(self.style.SUCCESS("All tournament counters are consistent."))
+            return
+
+        if batch:
+            repaired += self._repair(batch)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} tournaments."))
+
+    def _repair(self, tournament_ids):
+        return Tournament.objects.filter(id__in=tournament_ids).repair_counters()
@@ -0,0 +1,38 @@
+import tarfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tournaments.dumps import restore_state
+
+
+class Command(BaseCommand):
+    help = (
+        "Restore an archive written by dump_state in one transaction. When the database "
+        "already holds data, the restored ids are shifted past the existing ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archive file to read.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as fileobj:
+                result = restore_state(fileobj)
+        except (OSError, ValueError, tarfile.TarError) as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.perf_counter() - started
+
+        for name, count in result["rows"].items():
+            self.stdout.write(f"{name:>15}: {count} rows")
+        shifted = {space: offset for space, offset in result["offsets"].items() if offset}
+        if shifted:
+            self.stdout.write("Ids shifted by " + ", ".join(f"{space} +{offset}" for space, offset in shifted.items()))
+        rows = sum(result["rows"].values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Restored {rows} rows from {options['path']} in {elapsed:.1f}s "
+                f"({rows / max(elapsed, 1e-6):.0f} rows/s)."
+            )
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 22:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0002_tournamentparticipant_game"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tournament",
+            name="tiebreak_order",
+            field=models.CharField(
+                blank=True, default="head_to_head,sonneborn_berger,wins", max_length=100
+            ),
+        ),
+    ]
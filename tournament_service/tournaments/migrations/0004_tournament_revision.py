@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0003_tournament_tiebreak_order"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tournament",
+            name="revision",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
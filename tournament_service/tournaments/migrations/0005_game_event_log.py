@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-18 22:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0004_tournament_revision"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GameEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("game_id", models.BigIntegerField()),
+                ("home_participant_id", models.BigIntegerField()),
+                ("away_participant_id", models.BigIntegerField()),
+                ("home_player_id", models.BigIntegerField()),
+                ("away_player_id", models.BigIntegerField()),
+                ("home_score", models.PositiveIntegerField()),
+                ("away_score", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="game_events",
+                        to="tournaments.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["tournament", "id"], name="gameevent_tournament_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StandingsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_event_id", models.BigIntegerField()),
+                ("standings", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="standings_snapshots",
+                        to="tournaments.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["tournament", "-last_event_id"],
+                        name="snapshot_tournament_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 6.0 on 2026-10-18 22:27
+
+from django.db import migrations, models
+
+
+# Backfill the counters and status of existing tournaments from their rows
+BACKFILL_COUNTERS = """
+UPDATE tournaments_tournament SET
+    participants_count = (
+        SELECT COUNT(*) FROM tournaments_tournamentparticipant p
+        WHERE p.tournament_id = tournaments_tournament.id
+    ),
+    games_played = (
+        SELECT COUNT(*) FROM tournaments_game g
+        WHERE g.tournament_id = tournaments_tournament.id
+    );
+"""
+
+BACKFILL_STATUS = """
+UPDATE tournaments_tournament SET status = CASE
+    WHEN games_played = 0 THEN 'in_planning'
+    WHEN participants_count >= 2
+         AND games_played < participants_count * (participants_count - 1) / 2 THEN 'started'
+    ELSE 'finished'
+END;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0005_game_event_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tournament",
+            name="games_played",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="participants_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("in_planning", "In Planning"),
+                    ("started", "Started"),
+                    ("finished", "Finished"),
+                ],
+                default="in_planning",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tournament",
+            index=models.Index(fields=["status", "id"], name="tournament_status_idx"),
+        ),
+        migrations.RunSQL(BACKFILL_COUNTERS, migrations.RunSQL.noop),
+        migrations.RunSQL(BACKFILL_STATUS, migrations.RunSQL.noop),
+    ]
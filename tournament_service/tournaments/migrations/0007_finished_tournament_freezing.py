@@ -0,0 +1,69 @@
+# Generated by Django 6.0 on 2026-10-18 22:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0006_tournament_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FinalStandings",
+            fields=[
+                (
+                    "tournament",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="final_standings",
+                        serialize=False,
+                        to="tournaments.tournament",
+                    ),
+                ),
+                ("status", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="frozen_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="ArchivedGame",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("home_score", models.PositiveIntegerField()),
+                ("away_score", models.PositiveIntegerField()),
+                ("archived_at", models.DateTimeField()),
+                (
+                    "away_participant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_away_games",
+                        to="tournaments.tournamentparticipant",
+                    ),
+                ),
+                (
+                    "home_participant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_home_games",
+                        to="tournaments.tournamentparticipant",
+                    ),
+                ),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_games",
+                        to="tournaments.tournament",
+                    ),
+                ),
+            ],
+        ),
+    ]
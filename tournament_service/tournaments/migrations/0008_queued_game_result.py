@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-18 23:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0007_finished_tournament_freezing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedGameResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("home_participant_id", models.BigIntegerField()),
+                ("away_participant_id", models.BigIntegerField()),
+                ("winner", models.BigIntegerField(null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("recorded", "Recorded"),
+                            ("rejected", "Rejected"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                    ),
+                ),
+                ("detail", models.CharField(blank=True, default="", max_length=200)),
+                ("game_id", models.BigIntegerField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(null=True)),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="queued_games",
+                        to="tournaments.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "queued")),
+                        fields=["id"],
+                        name="queuedgame_queued_idx",
+                    ),
+                    models.Index(
+                        fields=["processed_at"], name="queuedgame_processed_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 6.0 on 2026-10-18 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Number the existing games of each tournament (live and archived) in id order.
+# They are dated by their event log entry, or the tournament's creation when
+# they have none, and never earlier than the game before them.
+BACKFILL_POSITIONS = """
+WITH all_games AS (
+    SELECT id, tournament_id FROM tournaments_game
+    UNION ALL
+    SELECT id, tournament_id FROM tournaments_archivedgame
+),
+events AS (
+    SELECT game_id, MIN(created_at) AS created_at FROM tournaments_gameevent GROUP BY game_id
+),
+numbered AS (
+    SELECT
+        g.id,
+        ROW_NUMBER() OVER (PARTITION BY g.tournament_id ORDER BY g.id) AS sequence,
+        MAX(COALESCE(e.created_at, t.created_at)) OVER (PARTITION BY g.tournament_id ORDER BY g.id) AS played_at
+    FROM all_games g
+    JOIN tournaments_tournament t ON t.id = g.tournament_id
+    LEFT JOIN events e ON e.game_id = g.id
+)
+UPDATE {table} SET sequence = numbered.sequence, played_at = numbered.played_at
+FROM numbered WHERE {table}.id = numbered.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0008_queued_game_result"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="sequence",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="played_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedgame",
+            name="sequence",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedgame",
+            name="played_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunSQL(
+            [
+                BACKFILL_POSITIONS.format(table="tournaments_game"),
+                BACKFILL_POSITIONS.format(table="tournaments_archivedgame"),
+            ],
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="sequence",
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="played_at",
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name="archivedgame",
+            name="sequence",
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="archivedgame",
+            name="played_at",
+            field=models.DateTimeField(),
+        ),
+        migrations.AddConstraint(
+            model_name="game",
+            constraint=models.UniqueConstraint(
+                fields=("tournament", "sequence"), name="game_tournament_sequence_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="archivedgame",
+            constraint=models.UniqueConstraint(
+                fields=("tournament", "sequence"),
+                name="archivedgame_tournament_seq_uniq",
+            ),
+        ),
+        migrations.CreateModel(
+            name="StandingsCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence", models.PositiveIntegerField()),
+                ("played_at", models.DateTimeField()),
+                ("participant_ids", models.JSONField(default=list)),
+                ("results", models.BinaryField()),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="standings_checkpoints",
+                        to="tournaments.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tournament", "sequence"),
+                        name="checkpoint_tournament_seq_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,13 +1,144 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact, GreaterThanOrEqual, LessThan
+from django.utils import timezone
 from players.models import Player
 
+# Tiebreakers applied (in the configured order) to participants on equal points
+TIEBREAKERS = ("head_to_head", "sonneborn_berger", "wins")
+DEFAULT_TIEBREAK_ORDER = ",".join(TIEBREAKERS)
+
+
+class TournamentStatus(models.TextChoices):
+    IN_PLANNING = "in_planning"
+    STARTED = "started"
+    FINISHED = "finished"
+
+
+def _count_per_tournament(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.filter(tournament=OuterRef("pk"))
+            .order_by()
+            .values("tournament")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+def total_required_games_expression(participants_count):
+    """Round-robin game count n * (n - 1) / 2 as a database expression."""
+    return Case(
+        When(
+            GreaterThanOrEqual(participants_count, 2),
+            then=participants_count * (participants_count - 1) / 2,
+        ),
+        default=Value(0),
+    )
+
+
+def status_expression(games_played, participants_count):
+    """The rules of `tournament_status` as a database expression."""
+    return Case(
+        When(Exact(games_played, 0), then=Value(TournamentStatus.IN_PLANNING)),
+        When(
+            LessThan(games_played, total_required_games_expression(participants_count)),
+            then=Value(TournamentStatus.STARTED),
+        ),
+        default=Value(TournamentStatus.FINISHED),
+        output_field=models.CharField(),
+    )
+
+
+class TournamentQuerySet(models.QuerySet):
+    def with_actual_counts(self):
+        """
+        Annotate the participant/game counts and status computed from the
+        related rows, to check the maintained counters against.
+        """
+        return self.annotate(
+            actual_participants_count=_count_per_tournament(TournamentParticipant.objects.all()),
+            actual_games_played=(
+                _count_per_tournament(Game.objects.all()) + _count_per_tournament(ArchivedGame.objects.all())
+            ),
+        ).annotate(
+            actual_status=status_expression(F("actual_games_played"), F("actual_participants_count")),
+        )
+
+    def repair_counters(self) -> int:
+        """
+        Recompute the counters and status of these tournaments from their
+        related rows, with the tournament rows locked. Returns the number of
+        tournaments written.
+        """
+        with transaction.atomic():
+            ids = list(self.select_for_update().order_by("pk").values_list("pk", flat=True))
+            rows = (
+                self.model.objects.filter(pk__in=ids)
+                .with_actual_counts()
+                .values_list("pk", "actual_participants_count", "actual_games_played", "actual_status")
+            )
+            tournaments = [
+                self.model(pk=i, participants_count=p, games_played=g, status=s) for i, p, g, s in rows
+            ]
+            self.model.objects.bulk_update(tournaments, ["participants_count", "games_played", "status"])
+        return len(tournaments)
+
+
 class Tournament(models.Model):
     name = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Comma separated list of TIEBREAKERS, e.g. "wins,head_to_head"
+    tiebreak_order = models.CharField(max_length=100, blank=True, default=DEFAULT_TIEBREAK_ORDER)
+    # Incremented on every change to the tournament, its participants or games
+    revision = models.PositiveBigIntegerField(default=0)
+    # Maintained by add_participant / add_game_result, see `repair_tournament_counters`
+    participants_count = models.PositiveIntegerField(default=0)
+    games_played = models.PositiveIntegerField(default=0)
+    status = models.CharField(
+        max_length=20, choices=TournamentStatus.choices, default=TournamentStatus.IN_PLANNING
+    )
+    # Set when the last required game is recorded, see `FinalStandings`
+    frozen_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TournamentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="tournament_status_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def total_required_games(self):
+        n = self.participants_count
+        return n * (n - 1) // 2 if n >= 2 else 0
+
+    def get_tiebreak_order(self):
+        return [name for name in self.tiebreak_order.split(",") if name]
+
+    @classmethod
+    def participant_added(cls, tournament_id: int):
+        """Atomically count a new participant and update the status."""
+        cls.objects.filter(pk=tournament_id).update(
+            participants_count=F("participants_count") + 1,
+            status=status_expression(F("games_played"), F("participants_count") + 1),
+        )
+
+    @classmethod
+    def games_added(cls, tournament_ids, count: int = 1):
+        """Atomically count `count` new games of each tournament and update the status."""
+        cls.objects.filter(pk__in=tournament_ids).update(
+            games_played=F("games_played") + count,
+            status=status_expression(F("games_played") + count, F("participants_count")),
+        )
+
+
 class TournamentParticipant(models.Model):
     tournament = models.ForeignKey(
         Tournament, on_delete=models.CASCADE, related_name="participants"
@@ -25,4 +156,174 @@ class Game(models.Model):
     home_participant = models.ForeignKey(TournamentParticipant, on_delete=models.CASCADE, related_name="home_games")
     away_participant = models.ForeignKey(TournamentParticipant, on_delete=models.CASCADE, related_name="away_games")
     home_score = models.PositiveIntegerField()
-    away_score = models.PositiveIntegerField()
\ No newline at end of file
+    away_score = models.PositiveIntegerField()
+    # Position among the tournament's games (1, 2, ...) in the order they were
+    # recorded, and when; `played_at` never decreases with the sequence (see history.py)
+    sequence = models.PositiveIntegerField()
+    played_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tournament", "sequence"], name="game_tournament_sequence_uniq"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Games saved one by one (admin, shell, tests) instead of through
+        # record_games, which numbers whole batches under the tournament lock
+        if self.sequence is None:
+            last = (
+                Game.objects.filter(tournament_id=self.tournament_id)
+                .order_by("-sequence")
+                .values_list("sequence", "played_at")
+                .first()
+            )
+            self.sequence, self.played_at = next_position(last, self.played_at)
+        super().save(*args, **kwargs)
+
+
+def next_position(last, played_at=None):
+    """
+    The (sequence, played_at) of the game recorded after `last`, the
+    (sequence, played_at) of the tournament's latest game or None.
+    """
+    played_at = played_at or timezone.now()
+    if last is None:
+        return 1, played_at
+    return last[0] + 1, max(played_at, last[1])
+
+
+class ArchivedGame(models.Model):
+    """
+    Cold storage for the games of finished tournaments, moved out of the games
+    table by `archive_finished_tournaments`. Rows keep their original game id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="archived_games")
+    home_participant = models.ForeignKey(
+        TournamentParticipant, on_delete=models.CASCADE, related_name="archived_home_games"
+    )
+    away_participant = models.ForeignKey(
+        TournamentParticipant, on_delete=models.CASCADE, related_name="archived_away_games"
+    )
+    home_score = models.PositiveIntegerField()
+    away_score = models.PositiveIntegerField()
+    sequence = models.PositiveIntegerField()
+    played_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tournament", "sequence"], name="archivedgame_tournament_seq_uniq"),
+        ]
+
+
+class FinalStandings(models.Model):
+    """
+    Status payload of a finished tournament, frozen when its last required game
+    was recorded. Served instead of recomputing the leaderboard.
+    """
+    tournament = models.OneToOneField(
+        Tournament, on_delete=models.CASCADE, primary_key=True, related_name="final_standings"
+    )
+    status = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class GameEvent(models.Model):
+    """
+    Append-only log of recorded game results.
+
+    Participant, player and game ids are stored as plain values so that the log
+    stays intact when the rows it describes are changed or removed.
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="game_events")
+    game_id = models.BigIntegerField()
+    home_participant_id = models.BigIntegerField()
+    away_participant_id = models.BigIntegerField()
+    home_player_id = models.BigIntegerField()
+    away_player_id = models.BigIntegerField()
+    home_score = models.PositiveIntegerField()
+    away_score = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tournament", "id"], name="gameevent_tournament_idx"),
+        ]
+
+
+class StandingsSnapshot(models.Model):
+    """
+    Standings of a tournament after applying all events up to `last_event_id`.
+
+    `standings` holds one [player_id, points, wins, draws, losses, games_played]
+    row per player.
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="standings_snapshots")
+    last_event_id = models.BigIntegerField()
+    standings = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tournament", "-last_event_id"], name="snapshot_tournament_idx"),
+        ]
+
+
+class StandingsCheckpoint(models.Model):
+    """
+    The results of a tournament's games up to `sequence`, stored every few
+    games by `record_games` so that point-in-time standings only need the games
+    recorded since (see history.py).
+
+    `participant_ids` lists the participants in ascending order and `results`
+    packs their n x n grid of points scored against each other, two bits per
+    pairing (see `history.pack_results`).
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="standings_checkpoints")
+    sequence = models.PositiveIntegerField()
+    # When the game at `sequence` was played
+    played_at = models.DateTimeField()
+    participant_ids = models.JSONField(default=list)
+    results = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tournament", "sequence"], name="checkpoint_tournament_seq_uniq"),
+        ]
+
+
+class QueuedGameStatus(models.TextChoices):
+    QUEUED = "queued"
+    RECORDED = "recorded"
+    REJECTED = "rejected"
+
+
+class QueuedGameResult(models.Model):
+    """
+    A game result accepted by `add_game_result` for asynchronous ingestion and
+    recorded later by the `ingest_game_results` worker (see ingest.py).
+
+    The result is kept as entered (participant ids and the winning player id)
+    and validated again when it is recorded. The game id is a plain value, like
+    in `GameEvent`, so that archiving the game leaves the row intact.
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="queued_games")
+    home_participant_id = models.BigIntegerField()
+    away_participant_id = models.BigIntegerField()
+    winner = models.BigIntegerField(null=True)
+    status = models.CharField(max_length=20, choices=QueuedGameStatus.choices, default=QueuedGameStatus.QUEUED)
+    # Why the result was rejected
+    detail = models.CharField(max_length=200, blank=True, default="")
+    game_id = models.BigIntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            # The worker's queue: only the rows still waiting are indexed
+            models.Index(
+                fields=["id"], condition=models.Q(status=QueuedGameStatus.QUEUED), name="queuedgame_queued_idx"
+            ),
+            models.Index(fields=["processed_at"], name="queuedgame_processed_idx"),
+        ]
@@ -0,0 +1,125 @@
+"""
+Opt-in hash partitioning of the games table by tournament (PostgreSQL only).
+
+Every hot query on games filters by `tournament_id`, so partitioning on it
+lets those queries, vacuum and bulk deletes work on one small partition
+instead of the whole table. The conversion rebuilds the table under the same
+name with the same columns, index and constraint names, so the `Game` model
+and later migrations keep working unchanged. Nothing references the games
+table with a foreign key, which is what makes the swap possible. The primary
+key becomes (id, tournament_id) because it must contain the partition key;
+ids stay unique as they keep coming from a single sequence.
+"""
+from django.db import connection, transaction
+
+from .models import Game
+
+DEFAULT_PARTITIONS = 16
+
+
+def _table():
+    return Game._meta.db_table
+
+
+def is_partitioned() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [_table()])
+        return cursor.fetchone()[0] == "p"
+
+
+def partition_count() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM pg_inherits WHERE inhparent = %s::regclass", [_table()])
+        return cursor.fetchone()[0]
+
+
+def _rebuild(cursor, partitions):
+    """
+    Recreate the games table, hash partitioned into `partitions` partitions or
+    as a plain table when `partitions` is None, and move the rows over.
+    """
+    table = _table()
+    qn = connection.ops.quote_name
+    staging = f"{table}_unpartitioned" if partitions else f"{table}_partitioned"
+
+    # Deferred foreign key checks of earlier writes would block the swap
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+
+    # Remember everything that is recreated under the same name
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisprimary
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass
+        """,
+        [table],
+    )
+    indexes = cursor.fetchall()
+    primary_key = next(name for name, _, is_primary in indexes if is_primary)
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('f', 'u')
+        """,
+        [table],
+    )
+    constraints = cursor.fetchall()
+    # Their indexes come back with the constraints
+    unique = {name for name, kind, _ in constraints if kind == "u"}
+    cursor.execute(
+        f"""
+        SELECT GREATEST(
+            (SELECT COALESCE(MAX(id), 0) FROM {qn(table)}),
+            COALESCE(pg_sequence_last_value(pg_get_serial_sequence(%s, 'id')::regclass), 0)
+        ) + 1
+        """,
+        [table],
+    )
+    next_id = cursor.fetchone()[0]
+
+    # Move the current table out of the way; index names must be unique
+    cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(staging)}")
+    for name, _, _ in indexes:
+        cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(name[:55] + '_staging')}")
+
+    partition_clause = " PARTITION BY HASH (tournament_id)" if partitions else ""
+    key_columns = "id, tournament_id" if partitions else "id"
+    cursor.execute(
+        f"CREATE TABLE {qn(table)} (LIKE {qn(staging)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        f"{partition_clause}"
+    )
+    cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(primary_key)} PRIMARY KEY ({key_columns})")
+    for remainder in range(partitions or 0):
+        cursor.execute(
+            f"CREATE TABLE {qn(f'{table}_p{remainder}')} PARTITION OF {qn(table)} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+
+    cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(staging)}")
+
+    # Secondary indexes, unique constraints (which include the partition key)
+    # and foreign keys are built after loading the rows
+    for name, definition, is_primary in indexes:
+        if not is_primary and name not in unique:
+            cursor.execute(definition.replace(" ON ONLY ", " ON "))
+    for name, _, definition in constraints:
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+
+    cursor.execute(f"DROP TABLE {qn(staging)}")
+    cursor.execute(
+        f"ALTER TABLE {qn(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {int(next_id)})"
+    )
+    cursor.execute(f"ANALYZE {qn(table)}")
+
+
+def partition_games(partitions: int = DEFAULT_PARTITIONS):
+    """Convert the games table into `partitions` hash partitions on tournament_id."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        _rebuild(cursor, partitions)
+
+
+def unpartition_games():
+    """Convert a partitioned games table back into a plain table."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        _rebuild(cursor, None)
@@ -0,0 +1,83 @@
+"""
+Rank of a player within a tournament, computed in the database.
+
+The per-participant figures of the leaderboard (see standings.py) are
+aggregated in SQL from the tournament's games, live and archived, read
+through their tournament and participant indexes: points, wins and draws per
+participant, head-to-head as the points scored against opponents on the same
+points, and Sonneborn-Berger as the opponents' points weighted by the score
+against them. The ranking orders them by points and then by the
+tournament's tiebreak order (see players/ranks.py for the window functions);
+participants equal on all of them share their rank, and are listed by name
+and then in the order they joined, which is the order of the leaderboard.
+Names are compared by code point like Python compares strings: with the "C"
+collation on PostgreSQL, whose default collation follows the locale, and with
+SQLite's default BINARY collation, which compares UTF-8 bytes and so code
+points.
+"""
+from django.db import connection
+
+from players.models import Player
+from players.ranks import rank_around
+
+from .models import TIEBREAKERS, ArchivedGame, Game, TournamentParticipant
+from .standings import LEADERBOARD_FIELDS
+
+TOURNAMENT_RANK_FIELDS = ("dense_rank", *LEADERBOARD_FIELDS)
+
+
+def tournament_rank(tournament, player_id: int, window: int):
+    """
+    Rank of a player in a tournament with the participants around it (see
+    `rank_around`), or None if the player does not take part.
+    """
+    qn = connection.ops.quote_name
+    columns = "home_participant_id, away_participant_id, home_score, away_score"
+    games = (
+        f"SELECT {columns} FROM {qn(Game._meta.db_table)} WHERE tournament_id = %s "
+        f"UNION ALL SELECT {columns} FROM {qn(ArchivedGame._meta.db_table)} WHERE tournament_id = %s"
+    )
+    # One row per game and participant: the opponent and the points scored
+    side = """
+        SELECT {own}_participant_id AS participant_id, {other}_participant_id AS opponent_id,
+               CASE WHEN {own}_score > {other}_score THEN 2
+                    WHEN {own}_score = {other}_score THEN 1 ELSE 0 END AS points
+        FROM games
+    """
+    sides = f"{side.format(own='home', other='away')} UNION ALL {side.format(own='away', other='home')}"
+    totals = f"""
+        SELECT p.id AS participant_id, p.player_id, pl.name AS player_name,
+               COALESCE(SUM(s.points), 0) AS points,
+               COALESCE(SUM(CASE WHEN s.points = 2 THEN 1 ELSE 0 END), 0) AS wins,
+               COALESCE(SUM(CASE WHEN s.points = 1 THEN 1 ELSE 0 END), 0) AS draws,
+               COUNT(s.participant_id) AS games_played
+        FROM {qn(TournamentParticipant._meta.db_table)} p
+        JOIN {qn(Player._meta.db_table)} pl ON pl.id = p.player_id
+        LEFT JOIN sides s ON s.participant_id = p.id
+        WHERE p.tournament_id = %s
+        GROUP BY p.id, p.player_id, pl.name
+    """
+    ranking = """
+        SELECT t.participant_id, t.player_id, t.player_name, t.points, t.wins, t.draws,
+               t.games_played - t.wins - t.draws AS losses, t.games_played,
+               COALESCE(SUM(CASE WHEN o.points = t.points THEN s.points ELSE 0 END), 0) AS head_to_head,
+               CAST(COALESCE(SUM(s.points * o.points), 0) AS DOUBLE PRECISION) / 2 AS sonneborn_berger
+        FROM totals t
+        LEFT JOIN sides s ON s.participant_id = t.participant_id
+        LEFT JOIN totals o ON o.participant_id = s.opponent_id
+        GROUP BY t.participant_id, t.player_id, t.player_name, t.points, t.wins, t.draws, t.games_played
+    """
+    # Only known tiebreaker names become column names of the query
+    tiebreak_order = [name for name in tournament.get_tiebreak_order() if name in TIEBREAKERS]
+    order = ", ".join(f"{name} DESC" for name in ("points", *tiebreak_order))
+    collate = ' COLLATE "C"' if connection.vendor == "postgresql" else ""
+    return rank_around(
+        ranking,
+        order,
+        f"player_name{collate}, participant_id",
+        [tournament.id, tournament.id, tournament.id],
+        player_id,
+        window,
+        TOURNAMENT_RANK_FIELDS,
+        ctes=[("games", games), ("sides", sides), ("totals", totals)],
+    )
@@ -0,0 +1,154 @@
+"""
+Rebuild tournament standings from the results event log.
+
+Standings are represented as {player_id: [points, wins, draws, losses, games_played]}.
+A rebuild starts from the tournament's latest snapshot and folds in only the
+events recorded after it.
+"""
+from django.conf import settings
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import GameEvent, StandingsSnapshot
+
+POINTS, WINS, DRAWS, LOSSES, GAMES_PLAYED = range(5)
+
+EVENT_FIELDS = ("tournament_id", "id", "home_player_id", "away_player_id", "home_score", "away_score")
+
+
+def _player(standings, player_id):
+    row = standings.get(player_id)
+    if row is None:
+        row = standings[player_id] = [0, 0, 0, 0, 0]
+    return row
+
+
+def apply_event(standings, home_player_id, away_player_id, home_score, away_score):
+    """Fold a single game result into `standings` in place."""
+    home = _player(standings, home_player_id)
+    away = _player(standings, away_player_id)
+    home[GAMES_PLAYED] += 1
+    away[GAMES_PLAYED] += 1
+
+    if home_score > away_score:
+        home[POINTS] += 2
+        home[WINS] += 1
+        away[LOSSES] += 1
+    elif home_score < away_score:
+        away[POINTS] += 2
+        away[WINS] += 1
+        home[LOSSES] += 1
+    else:
+        home[POINTS] += 1
+        away[POINTS] += 1
+        home[DRAWS] += 1
+        away[DRAWS] += 1
+
+
+def snapshot_to_standings(rows):
+    return {row[0]: list(row[1:]) for row in rows}
+
+
+def standings_to_snapshot(standings):
+    return [[player_id, *values] for player_id, values in sorted(standings.items())]
+
+
+def _latest_snapshot_last_event():
+    """Subquery: last_event_id of the latest snapshot of the outer tournament (or 0)."""
+    return Coalesce(
+        Subquery(
+            StandingsSnapshot.objects.filter(tournament=OuterRef("tournament"))
+            .order_by("-last_event_id")
+            .values("last_event_id")[:1]
+        ),
+        Value(0),
+    )
+
+
+def rebuild_standings(tournament_id: int):
+    """
+    Rebuild one tournament's standings from its latest snapshot plus newer events.
+
+    Returns (standings, last_event_id).
+    """
+    snapshot = (
+        StandingsSnapshot.objects.filter(tournament_id=tournament_id)
+        .order_by("-last_event_id")
+        .first()
+    )
+    if snapshot is None:
+        standings, last_event_id = {}, 0
+    else:
+        standings, last_event_id = snapshot_to_standings(snapshot.standings), snapshot.last_event_id
+
+    events = (
+        GameEvent.objects.filter(tournament_id=tournament_id, id__gt=last_event_id)
+        .order_by("id")
+        .values_list(*EVENT_FIELDS)
+        .iterator(chunk_size=settings.STANDINGS_REPLAY_CHUNK_SIZE)
+    )
+    for _, event_id, home_player_id, away_player_id, home_score, away_score in events:
+        apply_event(standings, home_player_id, away_player_id, home_score, away_score)
+        last_event_id = event_id
+
+    return standings, last_event_id
+
+
+def rebuild_all():
+    """
+    Rebuild the standings of every tournament that has events or snapshots.
+
+    Yields (tournament_id, standings, last_event_id, changed) one tournament at
+    a time. Latest snapshots are loaded in one query and only the events newer
+    than each tournament's snapshot are streamed, in a single ordered pass.
+    """
+    latest_ids = (
+        StandingsSnapshot.objects.filter(tournament=OuterRef("tournament"))
+        .order_by("-last_event_id")
+        .values("id")[:1]
+    )
+    snapshots = {
+        s.tournament_id: s
+        for s in StandingsSnapshot.objects.filter(id=Subquery(latest_ids))
+    }
+
+    events = (
+        GameEvent.objects.annotate(since=_latest_snapshot_last_event())
+        .filter(id__gt=F("since"))
+        .order_by("tournament_id", "id")
+        .values_list(*EVENT_FIELDS)
+        .iterator(chunk_size=settings.STANDINGS_REPLAY_CHUNK_SIZE)
+    )
+
+    def start(tournament_id):
+        snapshot = snapshots.pop(tournament_id, None)
+        if snapshot is None:
+            return {}, 0
+        return snapshot_to_standings(snapshot.standings), snapshot.last_event_id
+
+    current = None
+    standings, last_event_id = {}, 0
+    for tournament_id, event_id, home_player_id, away_player_id, home_score, away_score in events:
+        if tournament_id != current:
+            if current is not None:
+                yield current, standings, last_event_id, True
+            current = tournament_id
+            standings, last_event_id = start(tournament_id)
+        apply_event(standings, home_player_id, away_player_id, home_score, away_score)
+        last_event_id = event_id
+
+    if current is not None:
+        yield current, standings, last_event_id, True
+
+    # Tournaments without new events are fully described by their snapshot
+    for tournament_id, snapshot in snapshots.items():
+        yield tournament_id, snapshot_to_standings(snapshot.standings), snapshot.last_event_id, False
+
+
+def take_snapshot(tournament_id: int, standings, last_event_id: int):
+    """Persist `standings` as the tournament's newest snapshot."""
+    return StandingsSnapshot.objects.create(
+        tournament_id=tournament_id,
+        last_event_id=last_event_id,
+        standings=standings_to_snapshot(standings),
+    )
@@ -1,11 +1,29 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Tournament, TournamentParticipant, Game
+from .models import Tournament, TournamentParticipant, Game, QueuedGameResult, TIEBREAKERS
 
 
 class TournamentsSerializer(serializers.ModelSerializer):
+    total_required_games = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Tournament
         fields = "__all__"
+        read_only_fields = ["revision", "participants_count", "games_played", "status", "frozen_at"]
+
+    def validate_tiebreak_order(self, value):
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if name not in TIEBREAKERS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown tiebreaker(s): {', '.join(unknown)}. Choose from: {', '.join(TIEBREAKERS)}."
+            )
+        if len(set(names)) != len(names):
+            raise serializers.ValidationError("Each tiebreaker may only be listed once.")
+        value = ",".join(names)
+        if self.instance is not None and self.instance.frozen_at is not None and value != self.instance.tiebreak_order:
+            raise serializers.ValidationError("The standings of a finished tournament are frozen.")
+        return value
 
 
 class TournamentParticipantSerializer(serializers.ModelSerializer):
@@ -27,4 +45,26 @@ class AddParticipantSerializer(serializers.Serializer):
 class AddGameResultSerializer(serializers.Serializer):
     home_participant = serializers.IntegerField()
     away_participant = serializers.IntegerField()
-    winner = serializers.IntegerField(allow_null=True)
\ No newline at end of file
+    winner = serializers.IntegerField(allow_null=True)
+
+class QueuedGameResultSerializer(serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QueuedGameResult
+        fields = [
+            "id",
+            "tournament",
+            "home_participant_id",
+            "away_participant_id",
+            "winner",
+            "status",
+            "detail",
+            "game_id",
+            "created_at",
+            "processed_at",
+            "status_url",
+        ]
+
+    def get_status_url(self, obj) -> str:
+        return reverse("queued-game", kwargs={"tournament_id": obj.tournament_id, "queued_id": obj.id})
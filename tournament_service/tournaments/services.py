@@ -0,0 +1,264 @@
+from collections import Counter, defaultdict
+from http import HTTPStatus
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from players import ratings as player_ratings
+from players import stats as player_stats
+
+from .history import checkpoints_due, write_checkpoints
+from .models import (
+    FinalStandings,
+    Game,
+    GameEvent,
+    Tournament,
+    TournamentParticipant,
+    TournamentStatus,
+    next_position,
+)
+from .signals import bump_revision
+from .standings import compute_status
+
+FROZEN_DETAIL = "This tournament is finished; its standings are frozen."
+MAX_PARTICIPANTS = 5
+
+
+class GameRejected(Exception):
+    """A game result that cannot be recorded, with the HTTP status to answer with."""
+
+    def __init__(self, detail: str, status_code: int = HTTPStatus.BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class EnrollmentRejected(GameRejected):
+    """A player that cannot join a tournament, with the HTTP status to answer with."""
+
+
+def enroll_participant(tournament, player) -> TournamentParticipant:
+    """
+    Add a player to a tournament and update the tournament's counters.
+
+    The tournament is locked first, like `record_games` locks it, and then
+    checked: a concurrent final game may have frozen it and concurrent
+    enrolments may have filled it up or added the same player. Raises
+    EnrollmentRejected.
+    """
+    with transaction.atomic():
+        frozen_at = Tournament.objects.select_for_update().values_list("frozen_at", flat=True).get(pk=tournament.pk)
+        if frozen_at is not None:
+            raise EnrollmentRejected(FROZEN_DETAIL)
+        participants = TournamentParticipant.objects.filter(tournament=tournament)
+        if participants.count() >= MAX_PARTICIPANTS:
+            raise EnrollmentRejected(f"This tournament already has the maximum of {MAX_PARTICIPANTS} participants.")
+        if participants.filter(player=player).exists():
+            raise EnrollmentRejected("Player is already a participant of this tournament.")
+
+        participant = TournamentParticipant.objects.create(tournament=tournament, player=player)
+        Tournament.participant_added(tournament.id)
+    return participant
+
+
+def check_game_result(tournament, participants, home_id: int, away_id: int, winner, played_pairs=None):
+    """
+    Check a game result entered as participant ids and the winning player id
+    (None for a draw) against pre-loaded rows and convert it into scores.
+
+    `participants` maps participant ids to participants and must contain the
+    two named ones if they exist; `played_pairs` holds the frozensets of
+    participant ids of the tournament's recorded games (None skips that check).
+    Returns (home_participant, away_participant, home_score, away_score) or
+    raises GameRejected.
+    """
+    # 1. Nothing can be added to a finished tournament
+    if tournament.frozen_at is not None:
+        raise GameRejected(FROZEN_DETAIL)
+
+    # 2. Both participants must exist
+    if home_id not in participants or away_id not in participants:
+        raise GameRejected("One or both participants do not exist.", HTTPStatus.NOT_FOUND)
+    home_participant, away_participant = participants[home_id], participants[away_id]
+
+    # 3. Cannot play against themselves
+    if home_id == away_id:
+        raise GameRejected("A participant cannot play against themselves.")
+
+    # 4. Validate participants belong to this tournament
+    if home_participant.tournament_id != tournament.id or away_participant.tournament_id != tournament.id:
+        raise GameRejected("Both participants must belong to this tournament.")
+
+    # 5. Validate winner is one of the participants or null
+    if winner not in (None, home_participant.player_id, away_participant.player_id):
+        raise GameRejected("Winner must be one of the participants or null for draw.")
+
+    # 6. Only one game per pair
+    if played_pairs is not None and frozenset((home_id, away_id)) in played_pairs:
+        raise GameRejected("A game between these participants already exists for this tournament.")
+
+    # 7. Convert winner into internal scores
+    if winner is None:
+        home_score, away_score = 1, 1
+    elif winner == home_participant.player_id:
+        home_score, away_score = 2, 0
+    else:  # winner == away participant
+        home_score, away_score = 0, 2
+
+    return home_participant, away_participant, home_score, away_score
+
+
+def validate_game_result(tournament, home_id: int, away_id: int, winner, check_existing: bool = True):
+    """
+    Load the rows `check_game_result` needs for a single result and check it.
+    `check_existing=False` skips the lookup of an already played pairing, for
+    results that are checked again before being recorded.
+    """
+    participants = TournamentParticipant.objects.in_bulk([home_id, away_id])
+    played_pairs = None
+    if check_existing:
+        # Either direction; the same participant on both sides is rejected anyway
+        played = Game.objects.filter(
+            tournament=tournament,
+            home_participant_id__in=(home_id, away_id),
+            away_participant_id__in=(home_id, away_id),
+        ).exists()
+        played_pairs = {frozenset((home_id, away_id))} if played else set()
+    return check_game_result(tournament, participants, home_id, away_id, winner, played_pairs)
+
+
+def record_game(tournament, home_participant, away_participant, home_score: int, away_score: int) -> Game:
+    """Persist a validated game result together with everything derived from it (see `record_games`)."""
+    [game] = record_games(
+        [
+            Game(
+                tournament=tournament,
+                home_participant=home_participant,
+                away_participant=away_participant,
+                home_score=home_score,
+                away_score=away_score,
+            )
+        ]
+    )
+    return game
+
+
+def record_games(games) -> list:
+    """
+    Persist validated, unsaved games together with everything derived from them.
+
+    The game rows, the tournament counters and revisions, the results event
+    log entries, the players' career stats and their ratings are written in one
+    transaction, with a number of statements that does not depend on the
+    number of games. Games are numbered per tournament in the given order, and
+    standings checkpoints that become due are stored (see history.py).
+    Tournaments that are finished afterwards are frozen.
+
+    Results are checked before the locks are taken, so a concurrent request
+    or ingestion worker may have recorded the same pairing, or finished the
+    tournament, in the meantime: both are checked again under the tournament
+    locks and raise GameRejected, recording none of the games.
+    """
+    with transaction.atomic():
+        per_tournament = Counter(game.tournament_id for game in games)
+        # Locked in id order (like the ingestion worker does) while the games
+        # are numbered after the latest one of their tournament
+        latest = Game.objects.filter(tournament=OuterRef("pk")).order_by("-sequence")
+        positions = {}
+        for tournament_id, frozen_at, participants_count, last_sequence, last_played_at in (
+            Tournament.objects.select_for_update()
+            .filter(pk__in=list(per_tournament))
+            .order_by("pk")
+            .annotate(
+                last_sequence=Subquery(latest.values("sequence")[:1]),
+                last_played_at=Subquery(latest.values("played_at")[:1]),
+            )
+            .values_list("pk", "frozen_at", "participants_count", "last_sequence", "last_played_at")
+        ):
+            if frozen_at is not None:
+                raise GameRejected(FROZEN_DETAIL)
+            positions[tournament_id] = participants_count, (last_sequence, last_played_at) if last_sequence else None
+        _check_unplayed(games)
+        first_sequences = {}
+        now = timezone.now()
+        for game in games:
+            participants_count, last = positions[game.tournament_id]
+            game.sequence, game.played_at = next_position(last, now)
+            first_sequences.setdefault(game.tournament_id, game.sequence)
+            positions[game.tournament_id] = participants_count, (game.sequence, game.played_at)
+        games = Game.objects.bulk_create(games)
+        by_count = defaultdict(list)
+        for tournament_id, count in per_tournament.items():
+            by_count[count].append(tournament_id)
+        for count, tournament_ids in by_count.items():
+            Tournament.games_added(tournament_ids, count)
+        # bulk_create sends no post_save signals
+        bump_revision(*per_tournament)
+
+        GameEvent.objects.bulk_create(
+            [
+                GameEvent(
+                    tournament_id=game.tournament_id,
+                    game_id=game.id,
+                    home_participant_id=game.home_participant.id,
+                    away_participant_id=game.away_participant.id,
+                    home_player_id=game.home_participant.player_id,
+                    away_player_id=game.away_participant.player_id,
+                    home_score=game.home_score,
+                    away_score=game.away_score,
+                )
+                for game in games
+            ]
+        )
+        rows = [
+            (game.home_participant.player_id, game.away_participant.player_id, game.home_score, game.away_score)
+            for game in games
+        ]
+        for tournament_id, (participants_count, (last_sequence, _)) in positions.items():
+            write_checkpoints(
+                tournament_id, checkpoints_due(participants_count, first_sequences[tournament_id], last_sequence)
+            )
+
+        # Ratings first: they lock the players, which keeps concurrent batches
+        # from updating the same stats rows in a different order
+        player_ratings.record_games(rows)
+        player_stats.record_games(rows)
+
+        # Decided on the actual rows rather than the counters, which miss
+        # participants added behind the API's back
+        finished = Tournament.objects.with_actual_counts().filter(
+            pk__in=list(per_tournament), actual_status=TournamentStatus.FINISHED
+        )
+        for tournament_id in finished.values_list("pk", flat=True):
+            freeze_tournament(tournament_id)
+    return games
+
+
+def _check_unplayed(games):
+    """Raise GameRejected if a pairing of `games` is already recorded or repeated among them."""
+    participant_ids = {game.home_participant.id for game in games} | {game.away_participant.id for game in games}
+    played = {
+        (tournament_id, frozenset(pair))
+        for tournament_id, *pair in Game.objects.filter(
+            tournament_id__in={game.tournament_id for game in games},
+            home_participant_id__in=participant_ids,
+            away_participant_id__in=participant_ids,
+        ).values_list("tournament_id", "home_participant_id", "away_participant_id")
+    }
+    for game in games:
+        pair = (game.tournament_id, frozenset((game.home_participant.id, game.away_participant.id)))
+        if pair in played:
+            raise GameRejected("A game between these participants already exists for this tournament.")
+        played.add(pair)
+
+
+def freeze_tournament(tournament_id: int) -> FinalStandings:
+    """Persist the final standings of a finished tournament and mark it frozen."""
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(pk=tournament_id)
+        final_standings, _ = FinalStandings.objects.update_or_create(
+            tournament=tournament, defaults={"status": compute_status(tournament)}
+        )
+        Tournament.objects.filter(pk=tournament_id).update(frozen_at=timezone.now())
+    return final_standings
@@ -0,0 +1,55 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from players.models import Player
+
+from . import status_cache
+from .live import hub
+from .models import Game, Tournament, TournamentParticipant
+
+
+def bump_revision(*tournament_ids: int):
+    """Mark everything derived from the tournaments (crosstable, standings) as outdated."""
+    Tournament.objects.filter(pk__in=tournament_ids).update(revision=F("revision") + 1)
+    status_cache.invalidate(tournament_ids)
+    for tournament_id in tournament_ids:
+        transaction.on_commit(partial(hub.publish, tournament_id))
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+@receiver(post_save, sender=TournamentParticipant)
+@receiver(post_delete, sender=TournamentParticipant)
+def tournament_content_changed(sender, instance, **kwargs):
+    bump_revision(instance.tournament_id)
+
+
+@receiver(post_save, sender=Tournament)
+def tournament_changed(sender, instance, created, **kwargs):
+    if created:
+        # Backends without sequences (SQLite) hand out the ids of rolled back
+        # inserts again
+        status_cache.invalidate([instance.pk], notify=False)
+    else:
+        bump_revision(instance.pk)
+
+
+@receiver(post_delete, sender=Tournament)
+def tournament_deleted(sender, instance, **kwargs):
+    status_cache.invalidate([instance.pk])
+    transaction.on_commit(partial(hub.publish, instance.pk))
+
+
+@receiver(post_save, sender=Player)
+def player_changed(sender, instance, created, **kwargs):
+    # Leaderboards and crosstables show the player's name
+    if not created:
+        tournament_ids = list(
+            TournamentParticipant.objects.filter(player=instance).values_list("tournament_id", flat=True)
+        )
+        if tournament_ids:
+            bump_revision(*tournament_ids)
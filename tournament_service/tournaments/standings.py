@@ -0,0 +1,350 @@
+"""
+Leaderboard computation for a single tournament.
+
+All results of a tournament are folded into n x n matrices (one row and column
+per participant) and every per-player figure, including the tiebreakers, is
+derived from those matrices with array operations.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from players.models import Player
+
+from .models import ArchivedGame, Game, TournamentParticipant, TournamentStatus
+from .status_cache import cache, cached_status
+
+LEADERBOARD_FIELDS = (
+    "rank",
+    "player_id",
+    "player_name",
+    "points",
+    "wins",
+    "draws",
+    "losses",
+    "games_played",
+    "head_to_head",
+    "sonneborn_berger",
+)
+
+
+def results_matrices(participant_ids, games):
+    """
+    Build the per-pairing result matrices of a tournament.
+
+    `participant_ids` must be sorted ascending; `games` is a sequence of
+    (home_participant_id, away_participant_id, home_score, away_score) rows.
+    Returns (points, wins, draws, played) where e.g. points[i, j] is what
+    participant i scored against participant j.
+    """
+    n = len(participant_ids)
+    points = np.zeros((n, n), dtype=np.int64)
+    wins = np.zeros((n, n), dtype=np.int64)
+    draws = np.zeros((n, n), dtype=np.int64)
+    played = np.zeros((n, n), dtype=np.int64)
+
+    if n == 0 or not games:
+        return points, wins, draws, played
+
+    ids = np.asarray(participant_ids, dtype=np.int64)
+    rows = np.asarray(games, dtype=np.int64).reshape(-1, 4)
+    home = np.searchsorted(ids, rows[:, 0])
+    away = np.searchsorted(ids, rows[:, 1])
+
+    home_won = rows[:, 2] > rows[:, 3]
+    away_won = rows[:, 2] < rows[:, 3]
+    drawn = ~(home_won | away_won)
+    home_points = np.where(home_won, 2, np.where(drawn, 1, 0))
+    away_points = np.where(away_won, 2, np.where(drawn, 1, 0))
+
+    np.add.at(points, (home, away), home_points)
+    np.add.at(points, (away, home), away_points)
+    np.add.at(wins, (home, away), home_won)
+    np.add.at(wins, (away, home), away_won)
+    np.add.at(draws, (home, away), drawn)
+    np.add.at(draws, (away, home), drawn)
+    np.add.at(played, (home, away), 1)
+    np.add.at(played, (away, home), 1)
+
+    return points, wins, draws, played
+
+
+def build_leaderboard(participants, games, tiebreak_order):
+    """
+    Return the sorted leaderboard entries of a tournament.
+
+    `participants` is a sequence of (participant_id, player_id, player_name)
+    rows and `tiebreak_order` a list of tiebreaker names (see TIEBREAKERS).
+    Entries are sorted by points, then by each tiebreaker in order, then by
+    player name for a deterministic result.
+    """
+    participants = sorted(participants)
+    matrices = results_matrices([p[0] for p in participants], games)
+    return leaderboard_from_matrices(participants, matrices, tiebreak_order)
+
+
+def leaderboard_from_matrices(participants, matrices, tiebreak_order):
+    """
+    `build_leaderboard` from the `results_matrices` of `participants`, which
+    must be sorted by participant id.
+    """
+    points_m, wins_m, draws_m, played_m = matrices
+
+    points = points_m.sum(axis=1)
+    wins = wins_m.sum(axis=1)
+    draws = draws_m.sum(axis=1)
+    played = played_m.sum(axis=1)
+
+    # Head-to-head: points scored only against opponents on the same points
+    tied = points[:, None] == points[None, :]
+    head_to_head = (points_m * tied).sum(axis=1)
+
+    # Sonneborn-Berger: opponents' points weighted by the score against them
+    # (full for a win, half for a draw)
+    sonneborn_berger = (points_m @ points) / 2
+
+    tiebreak_values = {
+        "head_to_head": head_to_head,
+        "sonneborn_berger": sonneborn_berger,
+        "wins": wins,
+    }
+
+    n = len(participants)
+    # The participant index settles ties between players with the same name
+    keys = [
+        (-points[i], *(-tiebreak_values[name][i] for name in tiebreak_order), participants[i][2], i)
+        for i in range(n)
+    ]
+
+    entries = []
+    for rank, key in enumerate(sorted(keys), start=1):
+        i = key[-1]
+        _, player_id, player_name = participants[i]
+        entries.append(
+            {
+                "rank": rank,
+                "player_id": player_id,
+                "player_name": player_name,
+                "points": int(points[i]),
+                "wins": int(wins[i]),
+                "draws": int(draws[i]),
+                "losses": int(played[i] - wins[i] - draws[i]),
+                "games_played": int(played[i]),
+                "head_to_head": int(head_to_head[i]),
+                "sonneborn_berger": float(sonneborn_berger[i]),
+            }
+        )
+    return entries
+
+
+def select_entries(entries, top=None, around_player=None, window=0):
+    """
+    Select part of a sorted leaderboard.
+
+    `top` limits the result to the first `top` entries; `around_player`
+    returns the entries ranked at most `window` places above or below that
+    player. Status payloads are cached whole (see status_cache.py) and each
+    request's selection is applied to them with this.
+    """
+    if around_player is not None:
+        try:
+            position = next(i for i, entry in enumerate(entries) if entry["player_id"] == around_player)
+        except StopIteration:
+            raise ValueError("Player is not a participant of this tournament.")
+        return entries[max(position - window, 0):position + window + 1]
+    if top is not None:
+        return entries[:top]
+    return entries
+
+
+def select_fields(entries, fields):
+    """Reduce leaderboard entries to the given fields (see LEADERBOARD_FIELDS)."""
+    return [{field: entry[field] for field in fields} for entry in entries]
+
+
+def build_crosstable(tournament, participants, games):
+    """
+    Encode the tournament's n x n result grid compactly.
+
+    Participants are indexed by their position in `participants` (ordered by
+    participant id); `results` is the grid in row-major order where cell
+    [i * size + j] holds the points participant i scored against participant j,
+    or None when the pairing has not been played (including the diagonal).
+    """
+    participants = sorted(participants)
+    points, _, _, played = results_matrices([p[0] for p in participants], games)
+    cells = np.where(played > 0, points, -1).ravel().tolist()
+
+    return {
+        "tournament_id": tournament.id,
+        "revision": tournament.revision,
+        "size": len(participants),
+        "participants": [
+            {"participant_id": participant_id, "player_id": player_id, "player_name": player_name}
+            for participant_id, player_id, player_name in participants
+        ],
+        "results": [None if cell < 0 else cell for cell in cells],
+    }
+
+
+def build_status(tournament, participants, games, **selection):
+    """
+    Assemble the status payload of a tournament from pre-fetched rows.
+
+    See `build_leaderboard` for the shape of `participants` and `games` and
+    `select_entries` for the leaderboard `selection` arguments.
+    """
+    participants = sorted(participants)
+    matrices = results_matrices([p[0] for p in participants], games)
+    return status_from_matrices(tournament, participants, matrices, len(games), **selection)
+
+
+def status_from_matrices(tournament, participants, matrices, games_played, **selection):
+    """`build_status` from the `results_matrices` of `participants`, sorted by participant id."""
+    n = len(participants)
+    # Round-robin: each participant plays every other participant once
+    # Formula: n * (n - 1) / 2 (only valid for n >= 2)
+    total_required_games = n * (n - 1) // 2 if n >= 2 else 0
+
+    # Determine tournament status
+    if games_played == 0:
+        status_str = TournamentStatus.IN_PLANNING
+    elif games_played < total_required_games:
+        status_str = TournamentStatus.STARTED
+    else:
+        status_str = TournamentStatus.FINISHED
+
+    tiebreak_order = tournament.get_tiebreak_order()
+
+    return {
+        "tournament_id": tournament.id,
+        "tournament_name": tournament.name,
+        "participants_count": n,
+        "total_required_games": total_required_games,
+        "games_played": games_played,
+        "status": status_str,
+        "tiebreak_order": tiebreak_order,
+        "leaderboard": select_entries(leaderboard_from_matrices(participants, matrices, tiebreak_order), **selection),
+    }
+
+
+def participant_rows(tournament_id):
+    return list(
+        TournamentParticipant.objects.filter(tournament_id=tournament_id)
+        .values_list("id", "player_id", "player__name")
+    )
+
+
+GAME_COLUMNS = ("home_participant_id", "away_participant_id", "home_score", "away_score")
+
+
+def game_rows(tournament_id):
+    """Result rows of a tournament, including games moved to the archive."""
+    return list(
+        Game.objects.filter(tournament_id=tournament_id).values_list(*GAME_COLUMNS).union(
+            ArchivedGame.objects.filter(tournament_id=tournament_id).values_list(*GAME_COLUMNS),
+            all=True,
+        )
+    )
+
+
+def rows_by_tournament(tournament_ids):
+    """
+    Participant and game rows (see `participant_rows` and `game_rows`) of many
+    tournaments, fetched with one query per table and grouped by tournament id.
+    """
+    participants = defaultdict(list)
+    for tournament_id, *row in TournamentParticipant.objects.filter(tournament_id__in=tournament_ids).values_list(
+        "tournament_id", "id", "player_id", "player__name"
+    ):
+        participants[tournament_id].append(tuple(row))
+
+    games = defaultdict(list)
+    columns = ("tournament_id", *GAME_COLUMNS)
+    for tournament_id, *row in Game.objects.filter(tournament_id__in=tournament_ids).values_list(*columns).union(
+        ArchivedGame.objects.filter(tournament_id__in=tournament_ids).values_list(*columns),
+        all=True,
+    ):
+        games[tournament_id].append(tuple(row))
+    return participants, games
+
+
+def compute_crosstable(tournament):
+    """Compute the crosstable payload of a tournament with one query per table."""
+    return build_crosstable(tournament, participant_rows(tournament.id), game_rows(tournament.id))
+
+
+def compute_status(tournament, **selection):
+    """Compute the status payload of a tournament with one query per table."""
+    return build_status(tournament, participant_rows(tournament.id), game_rows(tournament.id), **selection)
+
+
+def _selected(payload, **selection):
+    """A copy of a status payload with (copies of) the selected leaderboard entries."""
+    payload = dict(payload)
+    payload["leaderboard"] = [dict(entry) for entry in select_entries(payload["leaderboard"], **selection)]
+    return payload
+
+
+def current_statuses(tournaments, **selection):
+    """
+    Status payloads of many tournaments keyed by id. Tournaments that are
+    neither cached nor frozen (see `current_status`) are computed together with
+    one query per table.
+    """
+    cached = {tournament.id: cached_status(tournament) for tournament in tournaments if tournament.frozen_at is None}
+    missing = [tournament_id for tournament_id, payload in cached.items() if payload is None]
+    participants, games = rows_by_tournament(missing) if missing else ({}, {})
+
+    results = {}
+    frozen = []
+    for tournament in tournaments:
+        if tournament.frozen_at is not None:
+            results[tournament.id] = _frozen_status(tournament, **selection)
+            frozen.append(results[tournament.id])
+            continue
+        payload = cached[tournament.id]
+        if payload is None:
+            payload = cache.put(
+                tournament,
+                build_status(tournament, participants.get(tournament.id, []), games.get(tournament.id, [])),
+            )
+        results[tournament.id] = _selected(payload, **selection)
+    _current_player_names(frozen)
+    return results
+
+
+def current_status(tournament, **selection):
+    """
+    Status payload of a tournament. Live tournaments are served from the
+    process-local cache (see status_cache.py) and frozen ones from their final
+    standings; load the tournament with `select_related("final_standings")` to
+    avoid an extra query. Frozen standings show the current names of the
+    tournament and of the listed players.
+    """
+    if tournament.frozen_at is None:
+        payload = cached_status(tournament)
+        if payload is None:
+            payload = cache.put(tournament, compute_status(tournament))
+        return _selected(payload, **selection)
+
+    payload = _frozen_status(tournament, **selection)
+    _current_player_names([payload])
+    return payload
+
+
+def _frozen_status(tournament, **selection):
+    payload = _selected(tournament.final_standings.status, **selection)
+    payload["tournament_name"] = tournament.name
+    return payload
+
+
+def _current_player_names(payloads):
+    """Replace the player names stored in the leaderboards of frozen payloads with the current ones."""
+    player_ids = {entry["player_id"] for payload in payloads for entry in payload["leaderboard"]}
+    if not player_ids:
+        return
+    names = dict(Player.objects.filter(id__in=player_ids).values_list("id", "name"))
+    for payload in payloads:
+        for entry in payload["leaderboard"]:
+            entry["player_name"] = names.get(entry["player_id"], entry["player_name"])
@@ -0,0 +1,210 @@
+"""
+Process-local cache of computed status payloads.
+
+Every server worker keeps the full status payloads of recently read
+tournaments in memory, in an LRU of at most STATUS_CACHE_SIZE entries. An
+entry remembers the tournament revision it was computed for and is only served
+for that revision. The status views load the tournament row anyway, so a hit
+costs that one primary key lookup and never returns standings older than the
+row, even when an eviction notice has not arrived yet.
+
+Writes evict the tournament locally and send a NOTIFY on STATUS_CHANNEL, which
+PostgreSQL delivers to the listeners when the transaction commits. Each worker
+process runs a listener thread that evicts the tournaments named in the
+notifications and wakes their live leaderboard streams, so streams also follow
+writes made by other workers. The thread is started on first use in processes
+that called `listen()` (the ASGI and WSGI entry points do), because server
+workers are forked from a master process and threads do not survive the fork.
+While the listener is disconnected notifications are lost, so it empties the
+cache whenever it (re)connects.
+"""
+import logging
+import os
+import select
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHANNEL = "tournament_status"
+
+# Seconds the listener waits for a notification before checking whether it
+# should stop, and bounds of its reconnect backoff
+LISTEN_POLL_INTERVAL = 1.0
+RECONNECT_DELAY = 0.5
+RECONNECT_DELAY_MAX = 30.0
+
+
+class StatusCache:
+    """A thread-safe LRU of tournament id -> (revision, status payload)."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_entries(self):
+        return settings.STATUS_CACHE_SIZE
+
+    def get(self, tournament):
+        """The cached payload for the tournament's current revision, or None."""
+        with self._lock:
+            entry = self._entries.get(tournament.id)
+            if entry is None or entry[0] != tournament.revision:
+                return None
+            self._entries.move_to_end(tournament.id)
+            return entry[1]
+
+    def put(self, tournament, payload):
+        """
+        Store a payload computed for the tournament's revision and return it.
+        Cached payloads are shared between requests and must not be modified.
+        """
+        if self.max_entries <= 0:
+            return payload
+        with self._lock:
+            entry = self._entries.get(tournament.id)
+            # A slower request must not replace a newer revision
+            if entry is None or entry[0] <= tournament.revision:
+                self._entries[tournament.id] = (tournament.revision, payload)
+            self._entries.move_to_end(tournament.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def evict(self, tournament_ids):
+        with self._lock:
+            for tournament_id in tournament_ids:
+                self._entries.pop(tournament_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, tournament_id):
+        return tournament_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+cache = StatusCache()
+
+
+def invalidate(tournament_ids, notify=True):
+    """
+    Evict tournaments from this process's cache and, on PostgreSQL, from every
+    other worker's once the current transaction commits.
+    """
+    tournament_ids = list(tournament_ids)
+    cache.evict(tournament_ids)
+    if notify and tournament_ids and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, id::text) FROM unnest(%s::bigint[]) AS id",
+                [STATUS_CHANNEL, tournament_ids],
+            )
+
+
+class Listener:
+    """Evict the tournaments announced on STATUS_CHANNEL, one thread per process."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self.connected = threading.Event()
+
+    def ensure_started(self):
+        if self.enabled and self._pid != os.getpid():
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            if connection.vendor != "postgresql":
+                return
+            self._stopping = threading.Event()
+            self.connected = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(connection.get_connection_params(), self._stopping),
+                name="status-cache-listener",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stopping.set()
+            if self._thread is not None and self._pid == os.getpid():
+                self._thread.join()
+            self._thread = None
+            self._pid = None
+
+    def _run(self, params, stopping):
+        delay = RECONNECT_DELAY
+        while not stopping.is_set():
+            try:
+                self._listen(params, stopping)
+                return
+            except Exception:
+                self.connected.clear()
+                self.cache.clear()
+                logger.warning("Status cache listener lost its connection, retrying in %.1f s",
+                               delay, exc_info=True)
+                stopping.wait(delay)
+                delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+    def _listen(self, params, stopping):
+        raw = connection.Database.connect(**params)
+        try:
+            raw.autocommit = True
+            with raw.cursor() as cursor:
+                cursor.execute(f"LISTEN {STATUS_CHANNEL}")
+            # Writes may have committed unnoticed before this point
+            self.cache.clear()
+            self.connected.set()
+            while not stopping.is_set():
+                if not select.select([raw], [], [], LISTEN_POLL_INTERVAL)[0]:
+                    continue
+                raw.poll()
+                tournament_ids = set()
+                while raw.notifies:
+                    payload = raw.notifies.pop(0).payload
+                    if payload.isdigit():
+                        tournament_ids.add(int(payload))
+                self._received(tournament_ids)
+        finally:
+            self.connected.clear()
+            raw.close()
+
+    def _received(self, tournament_ids):
+        # Imported here: live.py depends on standings.py, which uses this module
+        from .live import hub
+
+        self.cache.evict(tournament_ids)
+        for tournament_id in tournament_ids:
+            hub.publish(tournament_id)
+
+
+listener = Listener(cache)
+
+
+def listen():
+    """Keep this process and the workers forked from it subscribed to evictions."""
+    listener.enabled = True
+
+
+def cached_status(tournament):
+    """The cached status payload of `tournament`, or None; store misses with `cache.put`."""
+    listener.ensure_started()
+    return cache.get(tournament)
@@ -1,6 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TournamentsViewSet, add_participant, add_game_result, tournament_status
+from .views import (
+    TournamentsViewSet,
+    add_participant,
+    add_game_result,
+    queued_game_result,
+    tournament_status,
+    tournament_status_as_of,
+    tournament_crosstable,
+    tournament_player_rank,
+    tournament_stream,
+)
 
 router = DefaultRouter()
 router.register(r'tournaments', TournamentsViewSet, basename='tournament')
@@ -9,5 +19,18 @@ urlpatterns = [
     path('', include(router.urls)),
     path("tournaments/<int:tournament_id>/participants/", add_participant, name="add-participant"),
     path("tournaments/<int:tournament_id>/games/", add_game_result, name="add-game"),
+    path(
+        "tournaments/<int:tournament_id>/games/queued/<int:queued_id>/", queued_game_result, name="queued-game"
+    ),
     path("tournaments/<int:tournament_id>/status/", tournament_status, name="tournament-status"),
+    path(
+        "tournaments/<int:tournament_id>/status/as-of/", tournament_status_as_of, name="tournament-status-as-of"
+    ),
+    path(
+        "tournaments/<int:tournament_id>/players/<int:player_id>/rank/",
+        tournament_player_rank,
+        name="tournament-player-rank",
+    ),
+    path("tournaments/<int:tournament_id>/crosstable/", tournament_crosstable, name="tournament-crosstable"),
+    path("tournaments/<int:tournament_id>/stream/", tournament_stream, name="tournament-stream"),
 ]
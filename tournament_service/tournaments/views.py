@@ -1,46 +1,217 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from rest_framework import status
-from drf_spectacular.utils import extend_schema, OpenApiParameter
-
-from .serializers import AddParticipantSerializer, AddGameResultSerializer, TournamentsSerializer, GameSerializer
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+
+from .serializers import (
+    AddParticipantSerializer,
+    AddGameResultSerializer,
+    TournamentsSerializer,
+    GameSerializer,
+    QueuedGameResultSerializer,
+)
 
-from .models import Tournament, TournamentParticipant, Game
+from .models import Tournament, QueuedGameResult, TournamentStatus, TIEBREAKERS
+from .standings import LEADERBOARD_FIELDS, current_status, current_statuses, compute_crosstable, select_fields
+from .live import hub
+from .history import status_as_of
+from .ranks import tournament_rank
+from .services import (
+    FROZEN_DETAIL,
+    EnrollmentRejected,
+    GameRejected,
+    enroll_participant,
+    record_game,
+    validate_game_result,
+)
+from .ingest import queue_game_result
+from .deletion import delete_tournaments
 from players.models import Player
+from players.ranks import MAX_WINDOW
+from idempotency.decorators import IDEMPOTENCY_KEY_PARAMETER, IdempotentCreateMixin, idempotent
+
+# Maximum number of tournaments per batch status request
+BATCH_STATUS_MAX_IDS = 100
+
+STATUS_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tournament_id": {"type": "integer"},
+        "tournament_name": {"type": "string"},
+        "participants_count": {"type": "integer"},
+        "total_required_games": {"type": "integer"},
+        "games_played": {"type": "integer"},
+        "status": {"type": "string", "enum": ["in_planning", "started", "finished"]},
+        "tiebreak_order": {"type": "array", "items": {"type": "string", "enum": list(TIEBREAKERS)}},
+        "leaderboard": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "rank": {"type": "integer"},
+                    "player_id": {"type": "integer"},
+                    "player_name": {"type": "string"},
+                    "points": {"type": "integer"},
+                    "wins": {"type": "integer"},
+                    "draws": {"type": "integer"},
+                    "losses": {"type": "integer"},
+                    "games_played": {"type": "integer"},
+                    "head_to_head": {"type": "integer"},
+                    "sonneborn_berger": {"type": "number"},
+                },
+            },
+        },
+    },
+}
 
-from collections import defaultdict
-
+TOP_PARAMETER = OpenApiParameter("top", int, description="Only return the first `top` leaderboard entries.")
+FIELDS_PARAMETER = OpenApiParameter(
+    "fields",
+    str,
+    description=f"Comma-separated leaderboard entry fields to return. One or more of: {', '.join(LEADERBOARD_FIELDS)}.",
+)
 
 
-class TournamentsViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "status",
+                str,
+                enum=TournamentStatus.values,
+                description="Only return tournaments with this status.",
+            ),
+        ],
+    ),
+    create=extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER]),
+)
+class TournamentsViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing tournaments.
     
-    Provides CRUD operations for tournaments.
+    Provides CRUD operations for tournaments. Every tournament is returned with
+    its participant and game counts and status, which are maintained on the
+    tournament row (no per-tournament status calls needed).
     """
     queryset = Tournament.objects.all()
     serializer_class = TournamentsSerializer
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["id", "name", "created_at", "participants_count", "games_played", "status"]
+    ordering = ["id"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        status_filter = self.request.query_params.get("status")
+        if status_filter is not None and self.action == "list":
+            if status_filter not in TournamentStatus.values:
+                raise ValidationError(
+                    {"status": f"Must be one of: {', '.join(TournamentStatus.values)}."}
+                )
+            queryset = queryset.filter(status=status_filter)
+        return queryset
+
+    def perform_destroy(self, instance):
+        # One DELETE per dependent table instead of Django's in-memory cascade
+        delete_tournaments([instance.pk])
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids",
+                str,
+                required=True,
+                description=f"Comma-separated tournament ids (at most {BATCH_STATUS_MAX_IDS}).",
+            ),
+            TOP_PARAMETER,
+            FIELDS_PARAMETER,
+        ],
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "results": {"type": "object", "additionalProperties": STATUS_RESPONSE_SCHEMA},
+                    "not_found": {"type": "array", "items": {"type": "integer"}},
+                },
+            },
+            400: None,
+        },
+        summary="Get the status of many tournaments",
+        description=(
+            "Status and leaderboard of several tournaments at once, keyed by tournament id. "
+            "Unknown ids are listed in `not_found`."
+        ),
+    )
+    @action(detail=False, methods=["get"], url_path="status")
+    def batch_status(self, request):
+        """
+        Return the status of several tournaments with a constant number of queries.
+
+        URL:
+          GET /api/tournaments/status/?ids=1,2,3[&top=3][&fields=rank,player_name,points]
+        """
+        # 1. Parse the ids and the leaderboard selection
+        try:
+            ids = list(dict.fromkeys(int(i) for i in request.query_params.get("ids", "").split(",") if i.strip()))
+        except ValueError:
+            return Response({"detail": "ids must be a comma-separated list of integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not ids or len(ids) > BATCH_STATUS_MAX_IDS:
+            return Response({"detail": f"Provide between 1 and {BATCH_STATUS_MAX_IDS} ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if "around_player" in request.query_params:
+            return Response({"detail": "around_player is not supported for several tournaments."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            selection, fields = _leaderboard_selection(request.query_params)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 2. Load the tournaments, then all their participants and games at once
+        tournaments = list(Tournament.objects.select_related("final_standings").filter(id__in=ids).order_by("id"))
+        results = current_statuses(tournaments, **selection)
+
+        if fields is not None:
+            for payload in results.values():
+                payload["leaderboard"] = select_fields(payload["leaderboard"], fields)
+        return Response(
+            {"results": results, "not_found": [i for i in ids if i not in results]},
+            status=status.HTTP_200_OK,
+        )
 
 
 @extend_schema(
     request=AddParticipantSerializer,
     responses={201: AddParticipantSerializer, 400: None, 404: None},
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
     summary="Add a player to a tournament",
     description="Add a player as a participant to a tournament. Maximum 5 participants per tournament.",
 )
 @api_view(["POST"])
+@idempotent
 def add_participant(request, tournament_id: int):
     """
     Add a player to a tournament.
     - URL: /tournaments/<tournament_id>/participants/
     - Body: { "player_id": <id> }
     """
-    # 1. Check that the tournament exists
+    # 1. Check that the tournament exists and is not finished yet
     try:
         tournament = Tournament.objects.get(id=tournament_id)
     except Tournament.DoesNotExist:
         return Response({"detail": "Tournament not found."}, status=status.HTTP_404_NOT_FOUND)
+    if tournament.frozen_at is not None:
+        return Response({"detail": FROZEN_DETAIL}, status=status.HTTP_400_BAD_REQUEST)
 
     # 2. Validate input data
     serializer = AddParticipantSerializer(data=request.data)
@@ -53,28 +224,14 @@ def add_participant(request, tournament_id: int):
     except Player.DoesNotExist:
         return Response({"detail": "Player not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    # 4. Enforce max 5 participants
-    current_count = TournamentParticipant.objects.filter(tournament=tournament).count()
-    if current_count >= 5:
-        return Response(
-            {"detail": "This tournament already has the maximum of 5 participants."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    # 5. Avoid duplicates
-    if TournamentParticipant.objects.filter(tournament=tournament, player=player).exists():
-        return Response(
-            {"detail": "Player is already a participant of this tournament."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    # 6. Create the participant
-    participant = TournamentParticipant.objects.create(
-        tournament=tournament,
-        player=player,
-    )
+    # 4. Create the participant; the maximum of 5 participants and duplicates
+    #    are checked under the tournament lock
+    try:
+        participant = enroll_participant(tournament, player)
+    except EnrollmentRejected as exc:
+        return Response({"detail": exc.detail}, status=exc.status_code)
 
-    # 7. Return simple representation
+    # 5. Return simple representation
     return Response(
         {
             "id": participant.id,
@@ -88,11 +245,24 @@ def add_participant(request, tournament_id: int):
 
 @extend_schema(
     request=AddGameResultSerializer,
-    responses={201: GameSerializer, 400: None, 404: None},
+    responses={201: GameSerializer, 202: QueuedGameResultSerializer, 400: None, 404: None},
+    parameters=[
+        IDEMPOTENCY_KEY_PARAMETER,
+        OpenApiParameter(
+            "Prefer",
+            str,
+            OpenApiParameter.HEADER,
+            description=(
+                "`respond-async` queues the result for the ingestion worker and answers 202 "
+                "with the URL of the queued result (`Location`)."
+            ),
+        ),
+    ],
     summary="Record a game result",
     description="Record the result of a game between two participants. Winner can be null for a draw.",
 )
 @api_view(["POST"])
+@idempotent
 def add_game_result(request, tournament_id: int):
     """
     Enter a game result using:
@@ -102,6 +272,9 @@ def add_game_result(request, tournament_id: int):
 
     URL:
       POST /api/tournaments/<tournament_id>/games/
+
+    With `Prefer: respond-async` the result is only checked against the
+    participants, queued and recorded by the `ingest_game_results` worker.
     """
     # 1. Tournament must exist
     try:
@@ -118,66 +291,250 @@ def add_game_result(request, tournament_id: int):
     away_id = serializer.validated_data["away_participant"]
     winner = serializer.validated_data["winner"]
 
-    # 3. Load participants
+    # 3. Queue the result for the ingestion worker if the client asked for it
+    if _prefers_async(request):
+        try:
+            queued = queue_game_result(tournament, home_id, away_id, winner)
+        except GameRejected as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
+        data = QueuedGameResultSerializer(queued).data
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["status_url"]})
+
+    # 4. Check the pairing and convert the winner into scores
+    try:
+        home_participant, away_participant, home_score, away_score = validate_game_result(
+            tournament, home_id, away_id, winner
+        )
+    except GameRejected as exc:
+        return Response({"detail": exc.detail}, status=exc.status_code)
+
+    # 5. Create the game and everything derived from it; the pairing is
+    #    checked again under the tournament lock
+    try:
+        game = record_game(tournament, home_participant, away_participant, home_score, away_score)
+    except GameRejected as exc:
+        return Response({"detail": exc.detail}, status=exc.status_code)
+
+    return Response(GameSerializer(game).data, status=status.HTTP_201_CREATED)
+
+
+def _prefers_async(request):
+    preferences = request.headers.get("Prefer", "")
+    return any(preference.strip().lower() == "respond-async" for preference in preferences.split(","))
+
+
+@extend_schema(
+    responses={200: QueuedGameResultSerializer, 404: None},
+    summary="Get a queued game result",
+    description=(
+        "Ingestion state of a result queued with `Prefer: respond-async`: `queued`, `recorded` "
+        "(with the id of the game) or `rejected` (with the reason in `detail`)."
+    ),
+)
+@api_view(["GET"])
+def queued_game_result(request, tournament_id: int, queued_id: int):
+    """
+    URL:
+      GET /api/tournaments/<tournament_id>/games/queued/<queued_id>/
+    """
     try:
-        home_participant = TournamentParticipant.objects.get(id=home_id)
-        away_participant = TournamentParticipant.objects.get(id=away_id)
-    except TournamentParticipant.DoesNotExist:
-        return Response({"detail": "One or both participants do not exist."},
+        queued = QueuedGameResult.objects.get(id=queued_id, tournament_id=tournament_id)
+    except QueuedGameResult.DoesNotExist:
+        return Response({"detail": "Queued game result not found."},
                         status=status.HTTP_404_NOT_FOUND)
+    return Response(QueuedGameResultSerializer(queued).data, status=status.HTTP_200_OK)
 
-    # 4. Cannot play against themselves
-    if home_id == away_id:
-        return Response({"detail": "A participant cannot play against themselves."},
-                        status=status.HTTP_400_BAD_REQUEST)
 
-    # 5. Validate participants belong to this tournament
-    if home_participant.tournament_id != tournament.id or away_participant.tournament_id != tournament.id:
-        return Response(
-            {"detail": "Both participants must belong to this tournament."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+@extend_schema(
+    responses={
+        200: STATUS_RESPONSE_SCHEMA,
+        400: None,
+        404: None,
+    },
+    parameters=[
+        TOP_PARAMETER,
+        OpenApiParameter(
+            "around_player",
+            int,
+            description="Only return the entries ranked around this player (cannot be combined with `top`).",
+        ),
+        OpenApiParameter("window", int, description="Places above and below `around_player` to return (default 2)."),
+        FIELDS_PARAMETER,
+    ],
+    summary="Get tournament status and leaderboard",
+    description="Returns the current status of a tournament (in_planning, started, or finished) along with the leaderboard showing all participants sorted by points, then by the tournament's tiebreak order. Once finished, the standings are frozen and no further participants or games can be added.",
+)
+@api_view(["GET"])
+def tournament_status(request, tournament_id: int):
+    """
+    Return the status of a tournament and its leaderboard.
 
-    # 6. Validate winner is one of the participants or null
-    if winner not in (None, home_participant.player_id, away_participant.player_id):
-        return Response(
-            {"detail": "Winner must be one of the participants or null for draw."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+    URL:
+      GET /api/tournaments/<tournament_id>/status/
+      GET /api/tournaments/<tournament_id>/status/?top=3&fields=rank,player_name,points
+      GET /api/tournaments/<tournament_id>/status/?around_player=<player_id>&window=2
 
-    # 7. Only one game per pair
-    if Game.objects.filter(
-        tournament=tournament,
-        home_participant=home_participant,
-        away_participant=away_participant,
-    ).exists() or Game.objects.filter(
-        tournament=tournament,
-        home_participant=away_participant,
-        away_participant=home_participant,
-    ).exists():
-        return Response(
-            {"detail": "A game between these participants already exists for this tournament."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+    Status:
+      - in_planning: participants exist, 0 games
+      - started:     some games played, but not all
+      - finished:    everybody has played everybody once
 
-    # 8. Convert winner into internal scores
-    if winner is None:
-        home_score, away_score = 1, 1
-    elif winner == home_participant.player_id:
-        home_score, away_score = 2, 0
-    else:  # winner == away participant
-        home_score, away_score = 0, 2
-
-    # 9. Create the game
-    game = Game.objects.create(
-        tournament=tournament,
-        home_participant=home_participant,
-        away_participant=away_participant,
-        home_score=home_score,
-        away_score=away_score,
-    )
+    Returns both status and leaderboard (participants sorted by points descending,
+    ties broken by the tournament's tiebreak order and finally by name).
+    """
+    # 1. Parse the leaderboard selection
+    try:
+        selection, fields = _leaderboard_selection(request.query_params)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response(GameSerializer(game).data, status=status.HTTP_201_CREATED)
+    # 2. Tournament must exist
+    try:
+        tournament = Tournament.objects.select_related("final_standings").get(id=tournament_id)
+    except Tournament.DoesNotExist:
+        return Response({"detail": "Tournament not found."},
+                        status=status.HTTP_404_NOT_FOUND)
+
+    # 3. Compute the status and the selected part of the leaderboard
+    #    (finished tournaments are served from their frozen final standings)
+    try:
+        payload = current_status(tournament, **selection)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if fields is not None:
+        payload["leaderboard"] = select_fields(payload["leaderboard"], fields)
+    return Response(payload, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    responses={
+        200: {
+            **STATUS_RESPONSE_SCHEMA,
+            "properties": {
+                **STATUS_RESPONSE_SCHEMA["properties"],
+                "as_of": {
+                    "type": "object",
+                    "properties": {
+                        "sequence": {"type": "integer"},
+                        "played_at": {"type": "string", "format": "date-time", "nullable": True},
+                    },
+                },
+            },
+        },
+        400: None,
+        404: None,
+    },
+    parameters=[
+        OpenApiParameter("sequence", int, description="Include the games up to this game sequence number."),
+        OpenApiParameter(
+            "at", OpenApiTypes.DATETIME, description="Include the games played at or before this time (ISO 8601)."
+        ),
+        TOP_PARAMETER,
+        OpenApiParameter(
+            "around_player",
+            int,
+            description="Only return the entries ranked around this player (cannot be combined with `top`).",
+        ),
+        OpenApiParameter("window", int, description="Places above and below `around_player` to return (default 2)."),
+        FIELDS_PARAMETER,
+    ],
+    summary="Get the tournament status at an earlier point",
+    description=(
+        "The status and leaderboard of a tournament as they were after the game with the given `sequence` "
+        "number, or at the given time `at` (exactly one of the two). `as_of` holds the sequence number "
+        "and time of the last game included. The leaderboard lists the current participants. Answered "
+        "from the latest standings checkpoint before that point and the games recorded since."
+    ),
+)
+@api_view(["GET"])
+def tournament_status_as_of(request, tournament_id: int):
+    """
+    Return the status of a tournament as of an earlier game or time.
+
+    URL:
+      GET /api/tournaments/<tournament_id>/status/as-of/?sequence=<n>
+      GET /api/tournaments/<tournament_id>/status/as-of/?at=2026-05-01T18:00:00Z&top=3
+    """
+    # 1. Parse the point in time and the leaderboard selection
+    params = request.query_params
+    try:
+        if ("sequence" in params) == ("at" in params):
+            raise ValueError("Exactly one of sequence and at is required.")
+        sequence = at = None
+        if "sequence" in params:
+            sequence = _non_negative_int(params, "sequence")
+        else:
+            at = parse_datetime(params["at"])
+            if at is None:
+                raise ValueError("at must be an ISO 8601 date and time.")
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        selection, fields = _leaderboard_selection(params)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 2. Tournament must exist
+    try:
+        tournament = Tournament.objects.get(id=tournament_id)
+    except Tournament.DoesNotExist:
+        return Response({"detail": "Tournament not found."},
+                        status=status.HTTP_404_NOT_FOUND)
+
+    # 3. Rebuild the standings from the checkpoint before that point
+    try:
+        payload = status_as_of(tournament, sequence=sequence, at=at, **selection)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if fields is not None:
+        payload["leaderboard"] = select_fields(payload["leaderboard"], fields)
+    return Response(payload, status=status.HTTP_200_OK)
+
+
+def _non_negative_int(params, name):
+    value = params[name]
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer.")
+    if number < 0:
+        raise ValueError(f"{name} must not be negative.")
+    return number
+
+
+def _leaderboard_selection(params):
+    """
+    Parse `top`, `around_player`, `window` and `fields` of a status request.
+    Returns (selection arguments for `current_status`, fields or None).
+    """
+    selection = {}
+    if "top" in params:
+        selection["top"] = _non_negative_int(params, "top")
+    if "around_player" in params:
+        if "top" in selection:
+            raise ValueError("top and around_player cannot be combined.")
+        selection["around_player"] = _non_negative_int(params, "around_player")
+        selection["window"] = _non_negative_int(params, "window") if "window" in params else 2
+    elif "window" in params:
+        raise ValueError("window requires around_player.")
+
+    fields = None
+    if "fields" in params:
+        fields = [field.strip() for field in params["fields"].split(",") if field.strip()]
+        unknown = [field for field in fields if field not in LEADERBOARD_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"fields must be one or more of: {', '.join(LEADERBOARD_FIELDS)}.")
+    return selection, fields
+
+
+RANK_ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "dense_rank": {"type": "integer"},
+        **STATUS_RESPONSE_SCHEMA["properties"]["leaderboard"]["items"]["properties"],
+    },
+}
 
 
 @extend_schema(
@@ -186,47 +543,101 @@ def add_game_result(request, tournament_id: int):
             "type": "object",
             "properties": {
                 "tournament_id": {"type": "integer"},
-                "tournament_name": {"type": "string"},
-                "participants_count": {"type": "integer"},
-                "total_required_games": {"type": "integer"},
-                "games_played": {"type": "integer"},
-                "status": {"type": "string", "enum": ["in_planning", "started", "finished"]},
-                "leaderboard": {
+                "player": RANK_ENTRY_SCHEMA,
+                "above": {"type": "array", "items": RANK_ENTRY_SCHEMA},
+                "below": {"type": "array", "items": RANK_ENTRY_SCHEMA},
+            },
+        },
+        400: None,
+        404: None,
+    },
+    parameters=[
+        OpenApiParameter(
+            "window", int, description=f"Participants to return above and below (default 2, max {MAX_WINDOW})."
+        ),
+    ],
+    summary="Get a player's rank in a tournament",
+    description=(
+        "The player's leaderboard entry with the participants directly above and below, ranked in the "
+        "database by points and the tournament's tiebreak order. Participants equal on all of them share "
+        "a rank (`rank` counts the participants ahead, `dense_rank` the distinct results ahead) and are "
+        "listed by name, as on the leaderboard."
+    ),
+)
+@api_view(["GET"])
+def tournament_player_rank(request, tournament_id: int, player_id: int):
+    """
+    Return a player's rank in a tournament and the participants around it.
+
+    URL:
+      GET /api/tournaments/<tournament_id>/players/<player_id>/rank/?window=2
+    """
+    # 1. Parse the window
+    try:
+        window = _non_negative_int(request.query_params, "window") if "window" in request.query_params else 2
+        if window > MAX_WINDOW:
+            raise ValueError(f"window must not be greater than {MAX_WINDOW}.")
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 2. Tournament must exist
+    try:
+        tournament = Tournament.objects.get(id=tournament_id)
+    except Tournament.DoesNotExist:
+        return Response({"detail": "Tournament not found."},
+                        status=status.HTTP_404_NOT_FOUND)
+
+    # 3. Rank the participants in the database and keep the ones around the player
+    ranked = tournament_rank(tournament, player_id, window)
+    if ranked is None:
+        return Response({"detail": "Player is not a participant of this tournament."},
+                        status=status.HTTP_404_NOT_FOUND)
+    return Response({"tournament_id": tournament.id, **ranked}, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "tournament_id": {"type": "integer"},
+                "revision": {"type": "integer"},
+                "size": {"type": "integer"},
+                "participants": {
                     "type": "array",
                     "items": {
                         "type": "object",
                         "properties": {
+                            "participant_id": {"type": "integer"},
                             "player_id": {"type": "integer"},
                             "player_name": {"type": "string"},
-                            "points": {"type": "integer"},
-                            "wins": {"type": "integer"},
-                            "draws": {"type": "integer"},
-                            "losses": {"type": "integer"},
-                            "games_played": {"type": "integer"},
                         },
                     },
                 },
+                "results": {"type": "array", "items": {"type": "integer", "nullable": True}},
             },
         },
+        304: None,
         404: None,
     },
-    summary="Get tournament status and leaderboard",
-    description="Returns the current status of a tournament (in_planning, started, or finished) along with the leaderboard showing all participants sorted by points.",
+    summary="Get the tournament crosstable",
+    description=(
+        "Returns the n x n result grid of a tournament. `participants` is the index header and "
+        "`results` the grid in row-major order: cell i * size + j holds the points participant i "
+        "scored against participant j (2 win, 1 draw, 0 loss) or null if they have not played. "
+        "Responses carry an ETag per tournament revision."
+    ),
 )
 @api_view(["GET"])
-def tournament_status(request, tournament_id: int):
+def tournament_crosstable(request, tournament_id: int):
     """
-    Return the status of a tournament and its leaderboard.
+    Return the crosstable (results matrix) of a tournament.
 
     URL:
-      GET /api/tournaments/<tournament_id>/status/
-
-    Status:
-      - in_planning: participants exist, 0 games
-      - started:     some games played, but not all
-      - finished:    everybody has played everybody once
+      GET /api/tournaments/<tournament_id>/crosstable/
 
-    Returns both status and leaderboard (participants sorted by points descending).
+    The payload only changes when the tournament revision does, so it is cached
+    per revision and conditional requests are answered with 304.
     """
     try:
         tournament = Tournament.objects.get(id=tournament_id)
@@ -234,86 +645,40 @@ def tournament_status(request, tournament_id: int):
         return Response({"detail": "Tournament not found."},
                         status=status.HTTP_404_NOT_FOUND)
 
-    participants = TournamentParticipant.objects.select_related("player").filter(tournament=tournament)
-    games = Game.objects.select_related(
-        "home_participant__player",
-        "away_participant__player",
-    ).filter(tournament=tournament)
-
-    n = participants.count()
-    games_played = games.count()
-    # Round-robin: each participant plays every other participant once
-    # Formula: n * (n - 1) / 2 (only valid for n >= 2)
-    total_required_games = n * (n - 1) // 2 if n >= 2 else 0
-
-    # Determine tournament status
-    if games_played == 0:
-        status_str = "in_planning"
-    elif games_played < total_required_games:
-        status_str = "started"
-    else:
-        status_str = "finished"
-
-    # Calculate leaderboard
-    stats = defaultdict(lambda: {
-        "points": 0,
-        "wins": 0,
-        "draws": 0,
-        "losses": 0,
-        "games_played": 0,
-    })
-
-    for p in participants:
-        stats[p.player_id]
-
-    for g in games:
-        home_player = g.home_participant.player
-        away_player = g.away_participant.player
-
-        stats[home_player.id]["games_played"] += 1
-        stats[away_player.id]["games_played"] += 1
-
-        if g.home_score > g.away_score:
-            stats[home_player.id]["points"] += 2
-            stats[home_player.id]["wins"] += 1
-            stats[away_player.id]["losses"] += 1
-        elif g.home_score < g.away_score:
-            stats[away_player.id]["points"] += 2
-            stats[away_player.id]["wins"] += 1
-            stats[home_player.id]["losses"] += 1
-        else:
-            stats[home_player.id]["points"] += 1
-            stats[away_player.id]["points"] += 1
-            stats[home_player.id]["draws"] += 1
-            stats[away_player.id]["draws"] += 1
-
-    leaderboard = []
-    for p in participants:
-        s = stats[p.player_id]
-        leaderboard.append(
-            {
-                "player_id": p.player_id,
-                "player_name": p.player.name,
-                "points": s["points"],
-                "wins": s["wins"],
-                "draws": s["draws"],
-                "losses": s["losses"],
-                "games_played": s["games_played"],
-            }
-        )
+    etag = f'"crosstable-{tournament.id}-{tournament.revision}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    # Sort by points desc, then name for deterministic order
-    leaderboard.sort(key=lambda e: (-e["points"], e["player_name"]))
+    cache_key = f"crosstable:{tournament.id}:{tournament.revision}"
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = compute_crosstable(tournament)
+        cache.set(cache_key, payload, settings.CROSSTABLE_CACHE_TIMEOUT)
 
-    return Response(
-        {
-            "tournament_id": tournament.id,
-            "tournament_name": tournament.name,
-            "participants_count": n,
-            "total_required_games": total_required_games,
-            "games_played": games_played,
-            "status": status_str,
-            "leaderboard": leaderboard,
-        },
-        status=status.HTTP_200_OK,
-    )
\ No newline at end of file
+    return Response(payload, status=status.HTTP_200_OK, headers={"ETag": etag})
+
+
+
+@require_GET
+async def tournament_stream(request, tournament_id: int):
+    """
+    Stream the leaderboard of a tournament as Server-Sent Events.
+
+    URL:
+      GET /api/tournaments/<tournament_id>/stream/
+
+    Events:
+      - leaderboard: full status payload, sent once on connect
+      - diff:        changed entries and new order after every write
+      - deleted:     the tournament was removed; the stream ends
+
+    The event id is the tournament revision. This is an async view and must be
+    served through the ASGI application (tournament_service.asgi).
+    """
+    if not await Tournament.objects.filter(id=tournament_id).aexists():
+        return JsonResponse({"detail": "Tournament not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(hub.subscribe(tournament_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response